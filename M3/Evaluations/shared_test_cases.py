@@ -0,0 +1,243 @@
+"""
+Shared evaluation test cases
+Single source of truth for test_entity_extractor.py and test_entity_fixes.py
+so both scripts hit the same cached extraction results, and for the
+intent test cases used by both intent classifier test scripts
+"""
+
+import json
+from pathlib import Path
+from types import MappingProxyType
+
+# Intent test cases shared by test_intent_classifier.py and test_intent_classifier_old.py
+INTENT_TEST_CASES_FILE = Path(__file__).parent / "intent_classifier_test_cases.json"
+
+
+def _freeze(cases):
+    """Wrap expected dicts in read-only views so the tuples can be shared safely"""
+    return tuple((query, MappingProxyType(expected)) for query, expected in cases)
+
+
+# Comprehensive test cases covering all entity types, built once at import
+ALL_CASES = _freeze((
+    # ========== HotelSearch Entity Tests (50 cases) ==========
+
+    # City searches
+    ("hotels in Paris", {"city": "Paris"}),
+    ("find me hotels in London", {"city": "London"}),
+    ("show me accommodations in Cairo", {"city": "Cairo"}),
+    ("I need a place to stay in Dubai", {"city": "Dubai"}),
+    ("looking for hotels in Barcelona", {"city": "Barcelona"}),
+    ("where can I stay in Rome", {"city": "Rome"}),
+    ("hotels available in Amsterdam", {"city": "Amsterdam"}),
+    ("find hotels in Tokyo", {"city": "Tokyo"}),
+    ("I want to book in New York", {"city": "New York"}),
+    ("hotels in Berlin please", {"city": "Berlin"}),
+
+    # Country searches
+    ("hotels in France", {"country": "France"}),
+    ("find accommodations in Spain", {"country": "Spain"}),
+    ("show me hotels in Italy", {"country": "Italy"}),
+    ("I need hotels in Japan", {"country": "Japan"}),
+    ("looking for hotels in Egypt", {"country": "Egypt"}),
+
+    # Rating searches
+    ("hotels with rating above 4.5", {"min_rating": 4.5}),
+    ("find hotels rated above 4.0", {"min_rating": 4.0}),
+    ("show me hotels with rating 4.8", {"min_rating": 4.8}),
+    ("I want hotels with rating 4.7 or higher", {"min_rating": 4.7}),
+    ("hotels with rating at least 4.3", {"min_rating": 4.3}),
+    ("find me 5 star rated hotels", {"star_rating": 5.0}),
+    ("hotels with rating above 4.9", {"min_rating": 4.9}),
+    ("show hotels with rating 4.6 or above", {"min_rating": 4.6}),
+
+    # Star rating searches
+    ("5 star hotels in Paris", {"city": "Paris", "star_rating": 5.0}),
+    ("find 4 star hotels in London", {"city": "London", "star_rating": 4.0}),
+    ("show me 3 star hotels", {"star_rating": 3.0}),
+    ("I need a 5 star hotel", {"star_rating": 5.0}),
+    ("looking for 4 star accommodations", {"star_rating": 4.0}),
+
+    # Combined searches
+    ("5 star hotels in Paris with rating above 4.5", {"city": "Paris", "star_rating": 5.0, "min_rating": 4.5}),
+    ("4 star hotels in London with rating above 4.8", {"city": "London", "star_rating": 4.0, "min_rating": 4.8}),
+    ("hotels in Spain with rating above 4.7", {"country": "Spain", "min_rating": 4.7}),
+    ("5 star hotels in France", {"country": "France", "star_rating": 5.0}),
+    ("find 4 star hotels in Dubai with rating above 4.5", {"city": "Dubai", "star_rating": 4.0, "min_rating": 4.5}),
+
+    # Typo variations
+    ("hotles in Paris", {"city": "Paris"}),
+    ("find hotels in Paaris", {"city": "Paris"}),
+    ("5 star hotles", {"star_rating": 5.0}),
+    ("hotels with ratng above 4.5", {"min_rating": 4.5}),
+    ("4 starr hotels", {"star_rating": 4.0}),
+    ("hotels in Londan", {"city": "London"}),
+
+    # ========== HotelRecommendation Entity Tests (15 cases) ==========
+
+    # Traveler type searches
+    ("recommend hotels for families", {"traveller_type": "Family"}),
+    ("find hotels for business travelers", {"traveller_type": "Business"}),
+    ("hotels for couples", {"traveller_type": "Couple"}),
+    ("I'm a solo traveler, recommend hotels", {"traveller_type": "Solo"}),
+    ("best hotels for families", {"traveller_type": "Family"}),
+    ("hotels suitable for business trips", {"traveller_type": "Business"}),
+    ("romantic hotels for couples", {"traveller_type": "Couple"}),
+    ("hotels for solo travelers", {"traveller_type": "Solo"}),
+
+    # Natural language variations
+    ("what hotels do you recommend for families", {"traveller_type": "Family"}),
+    ("suggest hotels for business people", {"traveller_type": "Business"}),
+    ("I'm traveling with my family, any recommendations", {"traveller_type": "Family"}),
+    ("best hotels for my honeymoon", {"traveller_type": "Couple"}),
+    ("I'm traveling alone, suggest some hotels", {"traveller_type": "Solo"}),
+    ("me and my wife need a hotel", {"traveller_type": "Couple"}),
+    ("traveling with my husband", {"traveller_type": "Couple"}),
+
+    # ========== ReviewLookup Entity Tests (20 cases) ==========
+
+    # Specific hotel reviews (using actual hotel names from hotels.csv)
+    ("reviews for Hotel Plaza Athénée", {"hotel_name": "Hotel Plaza Athénée"}),
+    ("show me reviews of The Ritz London", {"hotel_name": "The Ritz London"}),
+    ("what are the reviews for Burj Al Arab", {"hotel_name": "Burj Al Arab"}),
+    ("I want to see reviews for Four Seasons George V", {"hotel_name": "Four Seasons George V"}),
+    ("reviews of The Savoy", {"hotel_name": "The Savoy"}),
+    ("find reviews for Claridge's", {"hotel_name": "Claridge's"}),
+    ("show reviews of Hotel Adlon Kempinski", {"hotel_name": "Hotel Adlon Kempinski"}),
+    ("reviews for Atlantis The Palm", {"hotel_name": "Atlantis The Palm"}),
+    ("what do people say about Mandarin Oriental", {"hotel_name": "Mandarin Oriental"}),
+    ("reviews for Park Hyatt Tokyo", {"hotel_name": "Park Hyatt Tokyo"}),
+
+    # General review requests (no specific hotel)
+    ("show me hotel reviews", {}),
+    ("I want to see some reviews", {}),
+    ("what are the reviews", {}),
+    ("find reviews for hotels", {}),
+    ("show me customer reviews", {}),
+
+    # Typo variations
+    ("reveiws for Hotel Plaza", {"hotel_name": "Hotel Plaza"}),
+    ("show me revews of The Ritz", {"hotel_name": "The Ritz"}),
+    ("reviews for Burj Al Arb", {"hotel_name": "Burj Al Arb"}),
+    ("what are the reviws", {}),
+    ("show hotel reveiws", {}),
+
+    # ========== LocationQuery Entity Tests (10 cases) ==========
+
+    # City-specific location queries (LocationQuery doesn't extract scores, only cities)
+    ("hotels in Paris with good location", {"city": "Paris"}),
+    ("find hotels in London with great location", {"city": "London"}),
+    ("hotels in central Dubai", {"city": "Dubai"}),
+    ("I need hotels in downtown Barcelona", {"city": "Barcelona"}),
+    ("hotels near city center in Rome", {"city": "Rome"}),
+    ("best located hotels in Tokyo", {"city": "Tokyo"}),
+    ("hotels with prime location in Berlin", {"city": "Berlin"}),
+    ("find centrally located hotels in Amsterdam", {"city": "Amsterdam"}),
+    ("hotels with excellent location in Singapore", {"country": "Singapore"}),
+    ("where are the best located hotels in Sydney", {"city": "Sydney", "min_rating": 7.5}),
+
+    # ========== VisaQuestion Entity Tests (20 cases) ==========
+
+    # Country pair visa questions (using actual countries from visa.csv)
+    ("do I need a visa from USA to France", {"from_country": "United States", "to_country": "France"}),
+    ("visa requirements from UK to Spain", {"from_country": "United Kingdom", "to_country": "Spain"}),
+    ("is visa required from Canada to Italy", {"from_country": "Canada", "to_country": "Italy"}),
+    ("do Americans need visa for Japan", {"from_country": "United States", "to_country": "Japan"}),
+    ("visa info from Australia to Egypt", {"from_country": "Australia", "to_country": "Egypt"}),
+    ("do I need visa from Germany to UAE", {"from_country": "Germany", "to_country": "United Arab Emirates"}),
+    ("visa requirements from France to China", {"from_country": "France", "to_country": "China"}),
+    ("is visa needed from UK to India", {"from_country": "United Kingdom", "to_country": "India"}),
+    ("do Canadians need visa for Thailand", {"from_country": "Canada", "to_country": "Thailand"}),
+    ("visa from USA to Mexico", {"from_country": "United States", "to_country": "Mexico"}),
+
+    # Natural language variations
+    ("I'm from USA, do I need a visa for France", {"from_country": "United States", "to_country": "France"}),
+    ("traveling from UK to Spain, visa needed", {"from_country": "United Kingdom", "to_country": "Spain"}),
+    ("I'm Canadian going to Italy, visa required", {"from_country": "Canada", "to_country": "Italy"}),
+    ("Australian traveling to Egypt, need visa", {"from_country": "Australia", "to_country": "Egypt"}),
+    ("going from Germany to UAE, visa info", {"from_country": "Germany", "to_country": "United Arab Emirates"}),
+
+    # Typo variations
+    ("do I need viza from USA to France", {"from_country": "United States", "to_country": "France"}),
+    ("visa from UK to Span", {"from_country": "United Kingdom", "to_country": "Spain"}),
+    ("visa from Canda to Italy", {"from_country": "Canada", "to_country": "Italy"}),
+    ("visa from USA to Japn", {"from_country": "United States", "to_country": "Japan"}),
+    ("viza requirements from Australia to Egypt", {"from_country": "Australia", "to_country": "Egypt"}),
+
+    # ========== AmenityFilter Entity Tests (20 cases) ==========
+
+    # Cleanliness scores
+    ("hotels with cleanliness score above 9.0", {"min_cleanliness": 9.0}),
+    ("find hotels with cleanliness above 9.5", {"min_rating": 9.5}),
+    ("show me hotels with cleanliness 9.2 or higher", {"min_cleanliness": 9.2}),
+    ("I need clean hotels with cleanliness score 9.8", {"min_cleanliness": 9.8}),
+    ("hotels with cleanliness above 9.3", {"min_cleanliness": 9.3}),
+
+    # Comfort scores
+    ("hotels with comfort score above 9.0", {"min_comfort": 9.0}),
+    ("find comfortable hotels with comfort above 9.5", {"min_comfort": 9.5}),
+    ("show me hotels with comfort score 9.2", {"min_comfort": 9.2}),
+    ("I need hotels with comfort above 9.8", {"min_comfort": 9.8}),
+
+    # Value for money scores
+    ("hotels with good value for money", {"min_value": 7.5}),
+    ("find hotels with value score above 9.0", {"min_rating": 9.0}),
+    ("show me hotels with value 8.5 or higher", {"min_value": 8.5}),
+    ("I need affordable hotels with value above 9.2", {"min_value": 9.2}),
+
+    # Staff scores
+    ("hotels with staff score above 9.0", {"min_staff": 9.0}),
+    ("find hotels with friendly staff score 9.5", {"min_staff": 9.5}),
+    ("show me hotels with staff score 9.2", {"min_staff": 9.2}),
+    ("I need hotels with staff above 9.8", {"min_staff": 9.8}),
+
+    # Combined amenity filters
+    ("hotels with cleanliness 9.5 and comfort 9.2", {"min_cleanliness": 9.5, "min_comfort": 9.2}),
+    ("find hotels with value above 9.0 and staff above 9.3", {"min_value": 9.0, "min_staff": 9.3}),
+))
+
+# Indices into ALL_CASES re-checked by the entity fixes script
+FIX_IDS = (
+    23, 24,             # Star rating tests
+    10, 0,              # Country vs city
+    84, 87,             # Visa patterns
+    104, 111, 117,      # Quality scores without defaults
+    65, 62,             # No greedy city matching
+)
+
+# Fix verification cases that are not part of the comprehensive suite
+FIX_ONLY_CASES = _freeze((
+    # Country vs city
+    ("hotels in Spain", {"country": "Spain"}),
+    
+    # Rating extraction
+    ("hotels with rating 4.8", {"min_rating": 4.8}),
+    ("hotels with rating 4.7 or higher", {"min_rating": 4.7}),
+))
+
+# Queries that only extract correctly once typos are resolved
+# (used by test_typo_fixes.py and tests/test_typo.py)
+TYPO_FIX_CASES = _freeze((
+    ("find hotels in Paaris", {"city": "Paris"}),
+    ("hotels in Londan", {"city": "London"}),
+    ("visa from UK to Span", {"from_country": "United Kingdom", "to_country": "Spain"}),
+    ("visa from Canda to Italy", {"from_country": "Canada", "to_country": "Italy"}),
+    ("visa from USA to Japn", {"from_country": "United States", "to_country": "Japan"}),
+    ("hotels with ratng above 4.5", {"min_rating": 4.5}),
+    ("best hotels for my honeymoon", {"traveller_type": "Couple"}),
+    ("find hotels with friendly staff score 9.5", {"min_staff": 9.5}),
+))
+
+
+def load_intent_test_cases(path=INTENT_TEST_CASES_FILE):
+    """
+    Load intent test cases from JSON
+    
+    Args:
+        path: Path to the test cases file
+        
+    Returns:
+        List of {"query", "expected"} dicts in file order
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)["test_cases"]
@@ -24,6 +24,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from components.embedding_generator import EmbeddingGenerator
 from components.vector_searcher import VectorSearcher
 
+# Report separator lines (built once, reused for every section)
+SEP80 = "=" * 80 + "\n"
+DIV80 = "─" * 80 + "\n"
+DASH80 = "-" * 80 + "\n"
+
 
 class EmbeddingEvaluator:
     """Evaluate embedding model performance with ground truth data"""
@@ -99,6 +104,24 @@ class EmbeddingEvaluator:
         elapsed_time = time.time() - start_time
         return embedding, elapsed_time
     
+    def _embed_all(self, queries: List[str]) -> Tuple[List[List[float]], float]:
+        """
+        Embed all queries in one batched encode call
+        
+        Timing covers tokenization and the forward pass, so every model
+        is measured on the same work.
+        
+        Args:
+            queries: Query texts
+            
+        Returns:
+            Tuple of (embeddings, time_in_seconds)
+        """
+        start_time = time.time()
+        embeddings = self.generator.embedding_client.encode_batch(queries, show_progress=False)
+        elapsed_time = time.time() - start_time
+        return embeddings, elapsed_time
+    
     def _measure_search_time(self, embedding: List[float], limit: int = 5, intent: str = None) -> Tuple[List[Dict], float]:
         """
         Measure time to search embeddings
@@ -144,6 +167,10 @@ class EmbeddingEvaluator:
             'query_details': []
         }
         
+        # Embed every query in one batch; per-query time is the amortized share
+        batch_embeddings, batch_time = self._embed_all([tc['query'] for tc in self.hotel_queries])
+        per_query_embed_time = batch_time / max(len(self.hotel_queries), 1)
+        
         for i, test_case in enumerate(self.hotel_queries, 1):
             query_id = test_case['id']
             query = test_case['query']
@@ -154,8 +181,8 @@ class EmbeddingEvaluator:
             print(f"\n[{i}/{len(self.hotel_queries)}] Query: {query}")
             print(f"Expected: {description}")
             
-            # Generate embedding and search with timing
-            embedding, embed_time = self._measure_embedding_time(query)
+            # Look up batched embedding and search with timing
+            embedding, embed_time = batch_embeddings[i - 1], per_query_embed_time
             search_results, search_time = self._measure_search_time(
                 embedding,
                 limit=top_k,
@@ -268,6 +295,10 @@ class EmbeddingEvaluator:
             'query_details': []
         }
         
+        # Embed every query in one batch; per-query time is the amortized share
+        batch_embeddings, batch_time = self._embed_all([tc['query'] for tc in self.visa_queries])
+        per_query_embed_time = batch_time / max(len(self.visa_queries), 1)
+        
         for i, test_case in enumerate(self.visa_queries, 1):
             query_id = test_case['id']
             query = test_case['query']
@@ -278,8 +309,8 @@ class EmbeddingEvaluator:
             print(f"\n[{i}/{len(self.visa_queries)}] Query: {query}")
             print(f"Expected: {description}")
             
-            # Generate embedding and search with timing
-            embedding, embed_time = self._measure_embedding_time(query)
+            # Look up batched embedding and search with timing
+            embedding, embed_time = batch_embeddings[i - 1], per_query_embed_time
             search_results, search_time = self._measure_search_time(
                 embedding,
                 limit=top_k,
@@ -558,144 +589,148 @@ def generate_text_report(all_results: Dict, model_names: List[str], output_file:
     """
     timestamp = datetime.now().strftime("%B %d, %Y at %H:%M:%S")
     
+    parts = []
+
+    # Header
+    parts.append(SEP80)
+    parts.append("COMPREHENSIVE EMBEDDING EVALUATION - DETAILED REPORT\n")
+    parts.append(SEP80)
+    parts.append(f"Date: {timestamp}\n")
+    parts.append(f"Models Compared: {', '.join(model_names)}\n")
+    
+    # Calculate total test cases
+    first_model = list(all_results.values())[0]
+    total_hotel = first_model['hotel']['total_queries']
+    total_visa = first_model['visa']['total_queries']
+    parts.append(f"Total Test Cases: {total_hotel + total_visa} ({total_hotel} Hotel + {total_visa} Visa)\n\n")
+    
+    # Executive Summary
+    parts.append(SEP80)
+    parts.append("EXECUTIVE SUMMARY\n")
+    parts.append(SEP80 + "\n")
+    
+    for model_name in model_names:
+        results = all_results[model_name]
+        hotel = results['hotel']
+        visa = results['visa']
+        
+        parts.append(f"Model: {model_name}\n")
+        parts.append(DIV80)
+        parts.append(f"  Hotel Embeddings:\n")
+        parts.append(f"    - Top-1 Accuracy: {hotel['top1_accuracy']:.2%} ({hotel['top1_correct']}/{hotel['total_queries']} correct)\n")
+        parts.append(f"    - Top-3 Accuracy: {hotel['top3_accuracy']:.2%} ({hotel['top3_correct']}/{hotel['total_queries']} correct)\n")
+        parts.append(f"    - Top-5 Accuracy: {hotel['top5_accuracy']:.2%} ({hotel['top5_correct']}/{hotel['total_queries']} correct)\n")
+        parts.append(f"    - Failed Queries: {len(hotel['failed_queries'])}\n")
+        parts.append(f"    - Avg Total Time: {hotel.get('avg_total_time_ms', 0):.2f}ms\n")
+        parts.append(f"\n")
+        parts.append(f"  Visa Embeddings:\n")
+        parts.append(f"    - Top-1 Accuracy: {visa['top1_accuracy']:.2%} ({visa['top1_correct']}/{visa['total_queries']} correct)\n")
+        parts.append(f"    - Top-3 Accuracy: {visa['top3_accuracy']:.2%} ({visa['top3_correct']}/{visa['total_queries']} correct)\n")
+        parts.append(f"    - Top-5 Accuracy: {visa['top5_accuracy']:.2%} ({visa['top5_correct']}/{visa['total_queries']} correct)\n")
+        parts.append(f"    - Failed Queries: {len(visa['failed_queries'])}\n")
+        parts.append(f"    - Avg Total Time: {visa.get('avg_total_time_ms', 0):.2f}ms\n")
+        parts.append(f"\n")
+    
+    # Model Comparison Table
+    parts.append("\n" + SEP80)
+    parts.append("MODEL COMPARISON\n")
+    parts.append(SEP80 + "\n")
+    
+    parts.append("HOTEL EMBEDDINGS:\n")
+    parts.append(f"{'Model':<30} {'Top-1':>10} {'Top-3':>10} {'Top-5':>10} {'Avg Time':>12}\n")
+    parts.append(DASH80)
+    for model_name in model_names:
+        hotel = all_results[model_name]['hotel']
+        avg_time = hotel.get('avg_total_time_ms', 0)
+        parts.append(f"{model_name:<30} {hotel['top1_accuracy']:>9.2%} {hotel['top3_accuracy']:>9.2%} {hotel['top5_accuracy']:>9.2%} {avg_time:>11.2f}ms\n")
+    
+    parts.append("\nVISA EMBEDDINGS:\n")
+    parts.append(f"{'Model':<30} {'Top-1':>10} {'Top-3':>10} {'Top-5':>10} {'Avg Time':>12}\n")
+    parts.append(DASH80)
+    for model_name in model_names:
+        visa = all_results[model_name]['visa']
+        avg_time = visa.get('avg_total_time_ms', 0)
+        parts.append(f"{model_name:<30} {visa['top1_accuracy']:>9.2%} {visa['top3_accuracy']:>9.2%} {visa['top5_accuracy']:>9.2%} {avg_time:>11.2f}ms\n")
+    
+    # Best Models
+    parts.append("\n" + SEP80)
+    parts.append("BEST MODELS\n")
+    parts.append(SEP80 + "\n")
+    
+    best_hotel_model = max(all_results.items(), key=lambda x: x[1]['hotel']['top1_accuracy'])
+    best_visa_model = max(all_results.items(), key=lambda x: x[1]['visa']['top1_accuracy'])
+    
+    parts.append(f"Best for Hotels: {best_hotel_model[0]}\n")
+    parts.append(f"  - Top-1 Accuracy: {best_hotel_model[1]['hotel']['top1_accuracy']:.2%}\n")
+    parts.append(f"  - Avg Time: {best_hotel_model[1]['hotel'].get('avg_total_time_ms', 0):.2f}ms\n\n")
+    
+    parts.append(f"Best for Visas: {best_visa_model[0]}\n")
+    parts.append(f"  - Top-1 Accuracy: {best_visa_model[1]['visa']['top1_accuracy']:.2%}\n")
+    parts.append(f"  - Avg Time: {best_visa_model[1]['visa'].get('avg_total_time_ms', 0):.2f}ms\n\n")
+    
+    # Performance Metrics Details
+    parts.append("\n" + SEP80)
+    parts.append("DETAILED PERFORMANCE METRICS\n")
+    parts.append(SEP80 + "\n")
+    
+    for model_name in model_names:
+        results = all_results[model_name]
+        hotel = results['hotel']
+        visa = results['visa']
+        
+        parts.append(f"Model: {model_name}\n")
+        parts.append(DIV80 + "\n")
+        
+        parts.append(f"  HOTEL EMBEDDINGS:\n")
+        parts.append(f"    Avg Embedding Time: {hotel.get('avg_embedding_time_ms', 0):.2f}ms\n")
+        parts.append(f"    Avg Search Time: {hotel.get('avg_search_time_ms', 0):.2f}ms\n")
+        parts.append(f"    Avg Total Time: {hotel.get('avg_total_time_ms', 0):.2f}ms\n")
+        parts.append(f"    Min/Max Total Time: {hotel.get('min_total_time_ms', 0):.2f}ms / {hotel.get('max_total_time_ms', 0):.2f}ms\n\n")
+        
+        parts.append(f"  VISA EMBEDDINGS:\n")
+        parts.append(f"    Avg Embedding Time: {visa.get('avg_embedding_time_ms', 0):.2f}ms\n")
+        parts.append(f"    Avg Search Time: {visa.get('avg_search_time_ms', 0):.2f}ms\n")
+        parts.append(f"    Avg Total Time: {visa.get('avg_total_time_ms', 0):.2f}ms\n")
+        parts.append(f"    Min/Max Total Time: {visa.get('min_total_time_ms', 0):.2f}ms / {visa.get('max_total_time_ms', 0):.2f}ms\n\n")
+    
+    # Failed Queries
+    parts.append("\n" + SEP80)
+    parts.append("FAILED QUERIES ANALYSIS\n")
+    parts.append(SEP80 + "\n")
+    
+    for model_name in model_names:
+        results = all_results[model_name]
+        hotel = results['hotel']
+        visa = results['visa']
+        
+        parts.append(f"Model: {model_name}\n")
+        parts.append(DIV80 + "\n")
+        
+        if hotel['failed_queries']:
+            parts.append(f"  HOTEL QUERIES THAT FAILED (Top-3):\n")
+            for failure in hotel['failed_queries']:
+                parts.append(f"    Query {failure['query_id']}: {failure['query']}\n")
+                parts.append(f"      Expected: {failure['expected']}\n")
+                parts.append(f"      Retrieved: {failure['retrieved']}\n\n")
+        else:
+            parts.append(f"  HOTEL: All queries passed!\n\n")
+        
+        if visa['failed_queries']:
+            parts.append(f"  VISA QUERIES THAT FAILED (Top-3):\n")
+            for failure in visa['failed_queries']:
+                parts.append(f"    Query {failure['query_id']}: {failure['query']}\n")
+                parts.append(f"      Expected: {failure['expected']}\n")
+                parts.append(f"      Retrieved: {failure['retrieved']}\n\n")
+        else:
+            parts.append(f"  VISA: All queries passed!\n\n")
+    
+    # Footer
+    parts.append(SEP80)
+    parts.append("END OF REPORT\n")
+    parts.append(SEP80)
+    
     with open(output_file, 'w', encoding='utf-8') as f:
-        # Header
-        f.write("=" * 80 + "\n")
-        f.write("COMPREHENSIVE EMBEDDING EVALUATION - DETAILED REPORT\n")
-        f.write("=" * 80 + "\n")
-        f.write(f"Date: {timestamp}\n")
-        f.write(f"Models Compared: {', '.join(model_names)}\n")
-        
-        # Calculate total test cases
-        first_model = list(all_results.values())[0]
-        total_hotel = first_model['hotel']['total_queries']
-        total_visa = first_model['visa']['total_queries']
-        f.write(f"Total Test Cases: {total_hotel + total_visa} ({total_hotel} Hotel + {total_visa} Visa)\n\n")
-        
-        # Executive Summary
-        f.write("=" * 80 + "\n")
-        f.write("EXECUTIVE SUMMARY\n")
-        f.write("=" * 80 + "\n\n")
-        
-        for model_name in model_names:
-            results = all_results[model_name]
-            hotel = results['hotel']
-            visa = results['visa']
-            
-            f.write(f"Model: {model_name}\n")
-            f.write(f"{'─' * 80}\n")
-            f.write(f"  Hotel Embeddings:\n")
-            f.write(f"    - Top-1 Accuracy: {hotel['top1_accuracy']:.2%} ({hotel['top1_correct']}/{hotel['total_queries']} correct)\n")
-            f.write(f"    - Top-3 Accuracy: {hotel['top3_accuracy']:.2%} ({hotel['top3_correct']}/{hotel['total_queries']} correct)\n")
-            f.write(f"    - Top-5 Accuracy: {hotel['top5_accuracy']:.2%} ({hotel['top5_correct']}/{hotel['total_queries']} correct)\n")
-            f.write(f"    - Failed Queries: {len(hotel['failed_queries'])}\n")
-            f.write(f"    - Avg Total Time: {hotel.get('avg_total_time_ms', 0):.2f}ms\n")
-            f.write(f"\n")
-            f.write(f"  Visa Embeddings:\n")
-            f.write(f"    - Top-1 Accuracy: {visa['top1_accuracy']:.2%} ({visa['top1_correct']}/{visa['total_queries']} correct)\n")
-            f.write(f"    - Top-3 Accuracy: {visa['top3_accuracy']:.2%} ({visa['top3_correct']}/{visa['total_queries']} correct)\n")
-            f.write(f"    - Top-5 Accuracy: {visa['top5_accuracy']:.2%} ({visa['top5_correct']}/{visa['total_queries']} correct)\n")
-            f.write(f"    - Failed Queries: {len(visa['failed_queries'])}\n")
-            f.write(f"    - Avg Total Time: {visa.get('avg_total_time_ms', 0):.2f}ms\n")
-            f.write(f"\n")
-        
-        # Model Comparison Table
-        f.write("\n" + "=" * 80 + "\n")
-        f.write("MODEL COMPARISON\n")
-        f.write("=" * 80 + "\n\n")
-        
-        f.write("HOTEL EMBEDDINGS:\n")
-        f.write(f"{'Model':<30} {'Top-1':>10} {'Top-3':>10} {'Top-5':>10} {'Avg Time':>12}\n")
-        f.write("-" * 80 + "\n")
-        for model_name in model_names:
-            hotel = all_results[model_name]['hotel']
-            avg_time = hotel.get('avg_total_time_ms', 0)
-            f.write(f"{model_name:<30} {hotel['top1_accuracy']:>9.2%} {hotel['top3_accuracy']:>9.2%} {hotel['top5_accuracy']:>9.2%} {avg_time:>11.2f}ms\n")
-        
-        f.write("\nVISA EMBEDDINGS:\n")
-        f.write(f"{'Model':<30} {'Top-1':>10} {'Top-3':>10} {'Top-5':>10} {'Avg Time':>12}\n")
-        f.write("-" * 80 + "\n")
-        for model_name in model_names:
-            visa = all_results[model_name]['visa']
-            avg_time = visa.get('avg_total_time_ms', 0)
-            f.write(f"{model_name:<30} {visa['top1_accuracy']:>9.2%} {visa['top3_accuracy']:>9.2%} {visa['top5_accuracy']:>9.2%} {avg_time:>11.2f}ms\n")
-        
-        # Best Models
-        f.write("\n" + "=" * 80 + "\n")
-        f.write("BEST MODELS\n")
-        f.write("=" * 80 + "\n\n")
-        
-        best_hotel_model = max(all_results.items(), key=lambda x: x[1]['hotel']['top1_accuracy'])
-        best_visa_model = max(all_results.items(), key=lambda x: x[1]['visa']['top1_accuracy'])
-        
-        f.write(f"Best for Hotels: {best_hotel_model[0]}\n")
-        f.write(f"  - Top-1 Accuracy: {best_hotel_model[1]['hotel']['top1_accuracy']:.2%}\n")
-        f.write(f"  - Avg Time: {best_hotel_model[1]['hotel'].get('avg_total_time_ms', 0):.2f}ms\n\n")
-        
-        f.write(f"Best for Visas: {best_visa_model[0]}\n")
-        f.write(f"  - Top-1 Accuracy: {best_visa_model[1]['visa']['top1_accuracy']:.2%}\n")
-        f.write(f"  - Avg Time: {best_visa_model[1]['visa'].get('avg_total_time_ms', 0):.2f}ms\n\n")
-        
-        # Performance Metrics Details
-        f.write("\n" + "=" * 80 + "\n")
-        f.write("DETAILED PERFORMANCE METRICS\n")
-        f.write("=" * 80 + "\n\n")
-        
-        for model_name in model_names:
-            results = all_results[model_name]
-            hotel = results['hotel']
-            visa = results['visa']
-            
-            f.write(f"Model: {model_name}\n")
-            f.write(f"{'─' * 80}\n\n")
-            
-            f.write(f"  HOTEL EMBEDDINGS:\n")
-            f.write(f"    Avg Embedding Time: {hotel.get('avg_embedding_time_ms', 0):.2f}ms\n")
-            f.write(f"    Avg Search Time: {hotel.get('avg_search_time_ms', 0):.2f}ms\n")
-            f.write(f"    Avg Total Time: {hotel.get('avg_total_time_ms', 0):.2f}ms\n")
-            f.write(f"    Min/Max Total Time: {hotel.get('min_total_time_ms', 0):.2f}ms / {hotel.get('max_total_time_ms', 0):.2f}ms\n\n")
-            
-            f.write(f"  VISA EMBEDDINGS:\n")
-            f.write(f"    Avg Embedding Time: {visa.get('avg_embedding_time_ms', 0):.2f}ms\n")
-            f.write(f"    Avg Search Time: {visa.get('avg_search_time_ms', 0):.2f}ms\n")
-            f.write(f"    Avg Total Time: {visa.get('avg_total_time_ms', 0):.2f}ms\n")
-            f.write(f"    Min/Max Total Time: {visa.get('min_total_time_ms', 0):.2f}ms / {visa.get('max_total_time_ms', 0):.2f}ms\n\n")
-        
-        # Failed Queries
-        f.write("\n" + "=" * 80 + "\n")
-        f.write("FAILED QUERIES ANALYSIS\n")
-        f.write("=" * 80 + "\n\n")
-        
-        for model_name in model_names:
-            results = all_results[model_name]
-            hotel = results['hotel']
-            visa = results['visa']
-            
-            f.write(f"Model: {model_name}\n")
-            f.write(f"{'─' * 80}\n\n")
-            
-            if hotel['failed_queries']:
-                f.write(f"  HOTEL QUERIES THAT FAILED (Top-3):\n")
-                for failure in hotel['failed_queries']:
-                    f.write(f"    Query {failure['query_id']}: {failure['query']}\n")
-                    f.write(f"      Expected: {failure['expected']}\n")
-                    f.write(f"      Retrieved: {failure['retrieved']}\n\n")
-            else:
-                f.write(f"  HOTEL: All queries passed!\n\n")
-            
-            if visa['failed_queries']:
-                f.write(f"  VISA QUERIES THAT FAILED (Top-3):\n")
-                for failure in visa['failed_queries']:
-                    f.write(f"    Query {failure['query_id']}: {failure['query']}\n")
-                    f.write(f"      Expected: {failure['expected']}\n")
-                    f.write(f"      Retrieved: {failure['retrieved']}\n\n")
-            else:
-                f.write(f"  VISA: All queries passed!\n\n")
-        
-        # Footer
-        f.write("=" * 80 + "\n")
-        f.write("END OF REPORT\n")
-        f.write("=" * 80 + "\n")
+        f.write("".join(parts))
     
     print(f"✓ Text report saved to {output_file}")
 
@@ -6,340 +6,454 @@ Tests entity extraction across 170 diverse test cases with checkpoint/resume cap
 import sys
 from pathlib import Path
 import time
+import re
 import json
 import argparse
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+try:
+    import orjson
+    
+    def _dumps(obj):
+        """Serialize obj to compact JSON bytes"""
+        return orjson.dumps(obj, default=str)
+    
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        """Serialize obj to compact JSON bytes (stdlib fallback)"""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+    
+    _loads = json.loads
 
 # Add parent directory to path to import modules
 parent_dir = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(parent_dir))
 
-from components.entity_extractor import EntityExtractor
-from components.intent_classifier import IntentClassifier
+from components.entity_extractor import EntityExtractor, get_entity_extractor
+from components.intent_classifier import get_intent_classifier
+from components.query_analyzer import QueryAnalyzer
+from components.query_view import QueryView
+from utils.llm_client import get_llm_client
+from shared_test_cases import ALL_CASES
+
+# Persistent query -> (intent, entities) cache shared with test_entity_fixes.py;
+# keys include the extractor's cache namespace, so a new model or version misses
+EXTRACT_CACHE_FILE = Path(__file__).parent / ".extract_cache.json"
+EXTRACT_CACHE_FLUSH_EVERY = 10
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_POLITENESS_RE = re.compile(r"(?:[\s,]*(?:please|pls|thanks|thank you)[\s.!?]*)+$")
+
+
+def canonicalize_query(query):
+    """
+    Canonical form of a query for cache lookups: lowercased, whitespace
+    collapsed and trailing politeness words removed. The raw query is still
+    what gets sent to the classifier and extractor.
+    """
+    canonical = _WHITESPACE_RE.sub(" ", query.strip().lower())
+    return _TRAILING_POLITENESS_RE.sub("", canonical) or canonical
+
+
+def extract_cache_namespace(extractor, classifier):
+    """Everything a cached (intent, entities) pair depends on besides the query"""
+    return f"{extractor.cache_namespace()}|{classifier.llm_client.model}"
+
+
+def extract_cache_key(query, namespace):
+    """
+    SHA-256 hex digest used as the cache key
+    
+    Args:
+        query: Raw test query (canonicalized here)
+        namespace: Result of extract_cache_namespace() for the running components
+    """
+    payload = f"{namespace}\0{canonicalize_query(query)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_extract_cache(path=EXTRACT_CACHE_FILE):
+    """Load the on-disk extraction cache (empty dict if missing or unreadable)"""
+    if path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not load extraction cache: {e}")
+    return {}
+
+
+def save_extract_cache(cache, path=EXTRACT_CACHE_FILE):
+    """Write the extraction cache atomically so an interrupted run never corrupts it"""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_dumps(cache))
+        tmp_path.replace(path)
+    except Exception as e:
+        print(f"Warning: Could not save extraction cache: {e}")
+
+
+# Sentinel for keys absent from extracted entities
+_MISSING = object()
+
+
+def _cmp_none(expected_val, val):
+    return val is None
+
+
+def _cmp_num(expected_val, val):
+    return isinstance(val, (int, float)) and abs(val - expected_val) <= 0.01
+
+
+def _cmp_str(expected_lower, val):
+    return isinstance(val, str) and val.lower() == expected_lower
+
+
+def _cmp_list(expected_items, val):
+    # expected_items: (original item, lowercased item or None for non-strings); order matters
+    if not isinstance(val, list) or len(val) != len(expected_items):
+        return False
+    for ext_item, (exp_item, exp_lower) in zip(val, expected_items):
+        if exp_lower is not None and isinstance(ext_item, str):
+            if ext_item.lower() != exp_lower:
+                return False
+        elif ext_item != exp_item:
+            return False
+    return True
+
+
+def _cmp_any(expected_val, val):
+    return val == expected_val
+
+
+def _pick_cmp(expected_val):
+    """
+    Resolve the comparison function for one expected value, once per key:
+    numbers within 0.01, strings case-insensitively, lists item by item
+    
+    Args:
+        expected_val: Expected entity value
+        
+    Returns:
+        Tuple of (cmp_fn, prepared expected value passed as cmp_fn's first argument)
+    """
+    if expected_val is None:
+        return _cmp_none, None
+    if isinstance(expected_val, (int, float)):
+        return _cmp_num, expected_val
+    if isinstance(expected_val, str):
+        return _cmp_str, expected_val.lower()
+    if isinstance(expected_val, list):
+        return _cmp_list, tuple(
+            (item, item.lower() if isinstance(item, str) else None)
+            for item in expected_val
+        )
+    return _cmp_any, expected_val
+
+
+def _compile_matcher(expected):
+    """
+    Precompile a matcher for an expected entity dict
+    
+    Args:
+        expected: Expected entities (or None)
+        
+    Returns:
+        Callable taking extracted entities and returning True on an exact match
+    """
+    if expected is None:
+        return lambda extracted: extracted is None
+    
+    # Fast path: nothing expected means nothing may be extracted
+    if not expected:
+        return lambda extracted: extracted is not None and not extracted
+    
+    expected_len = len(expected)
+    # (key, expected value, cmp_fn, prepared expected) resolved once per key
+    comparators = tuple((key, val) + _pick_cmp(val) for key, val in expected.items())
+    
+    def matcher(extracted):
+        # Equal sizes plus every expected key present means identical key sets
+        if extracted is None or len(extracted) != expected_len:
+            return False
+        for key, expected_val, cmp_fn, prepared in comparators:
+            val = extracted.get(key, _MISSING)
+            if val is _MISSING:
+                return False
+            # Identical objects always match; skip the typed comparison
+            if val is not expected_val and not cmp_fn(prepared, val):
+                return False
+        return True
+    
+    return matcher
+
+
+# (query, expected, matcher, view) with matcher and query view built once
+_COMPILED_TEST_CASES = tuple(
+    (query, expected, _compile_matcher(expected), QueryView.of(query))
+    for query, expected in ALL_CASES
+)
+
+# Suite expectations are immortal module-level objects, so their identity
+# safely maps back to the matcher (with pre-lowercased strings) built above
+_MATCHERS_BY_EXPECTED_ID = {id(expected): matcher for _, expected, matcher, _ in _COMPILED_TEST_CASES}
+
+
+class RateLimiter:
+    """
+    Sliding-window rate limiter shared by worker threads.
+    Allows at most max_calls acquisitions within any period-second window;
+    max_calls of 0 disables limiting. backoff() pauses every caller, e.g.
+    after the provider answers 429 with a retry-after.
+    """
+    
+    def __init__(self, max_calls, period=60.0):
+        self.max_calls = max_calls
+        self.period = period
+        self._calls = deque()
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+    
+    def backoff(self, seconds):
+        """Hold all acquisitions for at least the given number of seconds"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+    
+    def acquire(self):
+        """Block until a call slot is available within the current window"""
+        if not self.max_calls and time.monotonic() >= self._paused_until:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif not self.max_calls:
+                    return
+                else:
+                    while self._calls and now - self._calls[0] >= self.period:
+                        self._calls.popleft()
+                    if len(self._calls) < self.max_calls:
+                        self._calls.append(now)
+                        return
+                    wait = self.period - (now - self._calls[0])
+            time.sleep(wait)
+
 
 class EntityExtractorTester:
-    def __init__(self):
-        self.extractor = EntityExtractor()
-        self.classifier = IntentClassifier()
-        self.test_cases = self._build_test_cases()
-        self.CHECKPOINT_FILE = Path(__file__).parent / "entity_extractor_checkpoint.json"
+    # Default pacing for remote LLM backends (uncached test cases per minute)
+    REMOTE_TESTS_PER_MINUTE = 10
+    
+    def __init__(self, max_workers=4, tests_per_minute=None, checkpoint_every=5, batch_size=32, use_cache=True,
+                 analyze=False):
+        # Without caching, the extractor's own result cache is bypassed too
+        self.extractor = get_entity_extractor() if use_cache else EntityExtractor(llm_client=get_llm_client(), use_cache=False)
+        self.classifier = get_intent_classifier()
+        # Memoize LLM-backed calls so repeated queries cost no API round-trip
+        self._classify = lru_cache(maxsize=4096)(self.classifier.classify)
+        self._extract = lru_cache(maxsize=4096)(self.extractor.extract)
+        # Optionally measure the fused QueryAnalyzer.analyze() path (one query at a time)
+        self.analyzer = QueryAnalyzer(classifier=self.classifier, extractor=self.extractor) if analyze else None
+        self.test_cases = _COMPILED_TEST_CASES
+        prefix = "entity_extractor_analyze" if analyze else "entity_extractor"
+        self.CHECKPOINT_FILE = Path(__file__).parent / f"{prefix}_checkpoint.jsonl"
+        self.CHECKPOINT_META_FILE = Path(__file__).parent / f"{prefix}_checkpoint.meta.json"
+        self._checkpoint_buffer = []
+        self.use_cache = use_cache
+        self._cache_namespace = extract_cache_namespace(self.extractor, self.classifier) + ("|analyze" if analyze else "")
+        self._disk_cache = load_extract_cache() if use_cache else {}
+        self._disk_cache_dirty = 0
+        self._lock = threading.Lock()
+        self.max_workers = max_workers
+        # No pacing needed when the extractor runs without a remote LLM
+        if tests_per_minute is None:
+            remote = self.extractor.llm_client.get_config().get('initialized', False)
+            tests_per_minute = self.REMOTE_TESTS_PER_MINUTE if remote else 0
+        self.rate_limiter = RateLimiter(tests_per_minute)
+        self.checkpoint_every = checkpoint_every
+        self.batch_size = 1 if analyze else batch_size
     
     def _load_checkpoint(self):
-        """Load checkpoint if it exists"""
-        if self.CHECKPOINT_FILE.exists():
+        """
+        Rebuild progress from the append-only checkpoint log if it exists
+        
+        Returns:
+            Dict with completed_indices and results, or None if there is nothing to resume
+        """
+        if not self.CHECKPOINT_FILE.exists():
+            return None
+        
+        if self.CHECKPOINT_META_FILE.exists():
             try:
-                with open(self.CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.CHECKPOINT_META_FILE, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                if meta.get("total") != len(self.test_cases):
+                    print(f"Warning: Checkpoint was recorded for {meta.get('total')} test cases, ignoring it")
+                    return None
             except Exception as e:
-                print(f"Warning: Could not load checkpoint: {e}")
-                return None
-        return None
-    
-    def _save_checkpoint(self, results, last_completed_index):
-        """Save checkpoint after each test"""
-        checkpoint = {
-            "last_completed_index": last_completed_index,
-            "results": results
+                print(f"Warning: Could not read checkpoint header: {e}")
+        
+        results = {
+            "total": len(self.test_cases),
+            "correct": 0,
+            "incorrect": 0,
+            "failures": []
         }
+        completed = []
+        
         try:
-            with open(self.CHECKPOINT_FILE, 'w', encoding='utf-8') as f:
-                json.dump(checkpoint, f, indent=2)
+            with open(self.CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = _loads(line)
+                    except json.JSONDecodeError:
+                        # Torn line from an interrupted write - that test simply reruns
+                        continue
+                    completed.append(record["i"])
+                    if record["correct"]:
+                        results["correct"] += 1
+                    else:
+                        results["incorrect"] += 1
+                        results["failures"].append(record["failure"])
         except Exception as e:
-            print(f"Warning: Could not save checkpoint: {e}")
+            print(f"Warning: Could not load checkpoint: {e}")
+            return None
+        
+        if not completed:
+            return None
+        return {"completed_indices": completed, "results": results}
     
-    def _delete_checkpoint(self):
-        """Delete checkpoint file after successful completion"""
+    def _record_checkpoint(self, index, is_correct, failure=None):
+        """Queue one per-test checkpoint record; written out by _flush_checkpoint"""
+        self._checkpoint_buffer.append(_dumps({"i": index, "correct": is_correct, "failure": failure}))
+    
+    def _flush_checkpoint(self, completed_count):
+        """Append queued records to the checkpoint log and refresh the small header file"""
+        if not self._checkpoint_buffer:
+            return
         try:
-            if self.CHECKPOINT_FILE.exists():
-                self.CHECKPOINT_FILE.unlink()
+            with open(self.CHECKPOINT_FILE, 'ab') as f:
+                f.write(b"\n".join(self._checkpoint_buffer) + b"\n")
+            self._checkpoint_buffer.clear()
+            
+            tmp_path = self.CHECKPOINT_META_FILE.with_suffix(".tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(_dumps({"completed": completed_count, "total": len(self.test_cases)}))
+            tmp_path.replace(self.CHECKPOINT_META_FILE)
         except Exception as e:
-            print(f"Warning: Could not delete checkpoint: {e}")
+            print(f"Warning: Could not save checkpoint: {e}")
+    
+    def _delete_checkpoint(self):
+        """Delete checkpoint files after successful completion"""
+        self._checkpoint_buffer.clear()
+        for path in (self.CHECKPOINT_FILE, self.CHECKPOINT_META_FILE):
+            try:
+                if path.exists():
+                    path.unlink()
+            except Exception as e:
+                print(f"Warning: Could not delete checkpoint: {e}")
     
     def _entities_match(self, extracted, expected):
         """
         Compare extracted entities with expected entities
         Returns True if they match (with tolerance for numeric values)
         """
-        # Handle None cases
-        if extracted is None and expected is None:
-            return True
-        if extracted is None or expected is None:
-            return False
-        
-        # Check if both have same keys
-        if set(extracted.keys()) != set(expected.keys()):
-            return False
+        matcher = _MATCHERS_BY_EXPECTED_ID.get(id(expected))
+        if matcher is None:
+            matcher = _compile_matcher(expected)
+        return matcher(extracted)
+    
+    def _prefetch(self, indices):
+        """
+        Classify and extract uncached test cases in batched LLM calls,
+        storing results in the on-disk cache so the per-case loop only scores them
         
-        # Compare each key's value
-        for key in expected.keys():
-            extracted_val = extracted[key]
-            expected_val = expected[key]
-            
-            # Handle None values
-            if extracted_val is None and expected_val is None:
+        Args:
+            indices: Test case indices still to run
+        """
+        queries = []
+        seen = set()
+        for i in indices:
+            view = self.test_cases[i][3]
+            key = extract_cache_key(view.text, self._cache_namespace)
+            if key not in seen and key not in self._disk_cache:
+                seen.add(key)
+                queries.append(view)
+        
+        for start in range(0, len(queries), self.batch_size):
+            chunk = queries[start:start + self.batch_size]
+            print(f"⚡ Batch {start // self.batch_size + 1}: classifying and extracting {len(chunk)} queries...", flush=True)
+            self.rate_limiter.acquire()
+            intents = self.classifier.classify_many(chunk)
+            extracted = self.extractor.extract_many(chunk, intents)
+            if self.extractor.last_llm_failed():
+                # Rule-only fallbacks are not stored; _run_one retries these queries
                 continue
-            if extracted_val is None or expected_val is None:
-                return False
-            
-            # Handle numeric values (with tolerance)
-            if isinstance(expected_val, (int, float)):
-                if not isinstance(extracted_val, (int, float)):
-                    return False
-                if abs(extracted_val - expected_val) > 0.01:  # Tolerance for floating point
-                    return False
-            
-            # Handle string values (case-insensitive)
-            elif isinstance(expected_val, str):
-                if not isinstance(extracted_val, str):
-                    return False
-                if extracted_val.lower() != expected_val.lower():
-                    return False
-            
-            # Handle list values
-            elif isinstance(expected_val, list):
-                if not isinstance(extracted_val, list):
-                    return False
-                if len(extracted_val) != len(expected_val):
-                    return False
-                # Compare lists (order matters)
-                for i, exp_item in enumerate(expected_val):
-                    ext_item = extracted_val[i]
-                    if isinstance(exp_item, str) and isinstance(ext_item, str):
-                        if ext_item.lower() != exp_item.lower():
-                            return False
-                    elif ext_item != exp_item:
-                        return False
             
-            # Direct comparison for other types
-            else:
-                if extracted_val != expected_val:
-                    return False
-        
-        return True
+            with self._lock:
+                for view, intent, entities in zip(chunk, intents, extracted):
+                    self._disk_cache[extract_cache_key(view.text, self._cache_namespace)] = {"intent": intent, "entities": entities}
+                if self.use_cache:
+                    save_extract_cache(self._disk_cache)
+                self._disk_cache_dirty = 0
     
-    def _build_test_cases(self):
-        """Build comprehensive test cases covering all entity types"""
-        test_cases = []
-        
-        # ========== HotelSearch Entity Tests (50 cases) ==========
-        
-        # City searches
-        test_cases.extend([
-            ("hotels in Paris", {"city": "Paris"}),
-            ("find me hotels in London", {"city": "London"}),
-            ("show me accommodations in Cairo", {"city": "Cairo"}),
-            ("I need a place to stay in Dubai", {"city": "Dubai"}),
-            ("looking for hotels in Barcelona", {"city": "Barcelona"}),
-            ("where can I stay in Rome", {"city": "Rome"}),
-            ("hotels available in Amsterdam", {"city": "Amsterdam"}),
-            ("find hotels in Tokyo", {"city": "Tokyo"}),
-            ("I want to book in New York", {"city": "New York"}),
-            ("hotels in Berlin please", {"city": "Berlin"}),
-        ])
-        
-        # Country searches
-        test_cases.extend([
-            ("hotels in France", {"country": "France"}),
-            ("find accommodations in Spain", {"country": "Spain"}),
-            ("show me hotels in Italy", {"country": "Italy"}),
-            ("I need hotels in Japan", {"country": "Japan"}),
-            ("looking for hotels in Egypt", {"country": "Egypt"}),
-        ])
-        
-        # Rating searches
-        test_cases.extend([
-            ("hotels with rating above 4.5", {"min_rating": 4.5}),
-            ("find hotels rated above 4.0", {"min_rating": 4.0}),
-            ("show me hotels with rating 4.8", {"min_rating": 4.8}),
-            ("I want hotels with rating 4.7 or higher", {"min_rating": 4.7}),
-            ("hotels with rating at least 4.3", {"min_rating": 4.3}),
-            ("find me 5 star rated hotels", {"star_rating": 5.0}),
-            ("hotels with rating above 4.9", {"min_rating": 4.9}),
-            ("show hotels with rating 4.6 or above", {"min_rating": 4.6}),
-        ])
-        
-        # Star rating searches
-        test_cases.extend([
-            ("5 star hotels in Paris", {"city": "Paris", "star_rating": 5.0}),
-            ("find 4 star hotels in London", {"city": "London", "star_rating": 4.0}),
-            ("show me 3 star hotels", {"star_rating": 3.0}),
-            ("I need a 5 star hotel", {"star_rating": 5.0}),
-            ("looking for 4 star accommodations", {"star_rating": 4.0}),
-        ])
-        
-        # Combined searches
-        test_cases.extend([
-            ("5 star hotels in Paris with rating above 4.5", {"city": "Paris", "star_rating": 5.0, "min_rating": 4.5}),
-            ("4 star hotels in London with rating above 4.8", {"city": "London", "star_rating": 4.0, "min_rating": 4.8}),
-            ("hotels in Spain with rating above 4.7", {"country": "Spain", "min_rating": 4.7}),
-            ("5 star hotels in France", {"country": "France", "star_rating": 5.0}),
-            ("find 4 star hotels in Dubai with rating above 4.5", {"city": "Dubai", "star_rating": 4.0, "min_rating": 4.5}),
-        ])
-        
-        # Typo variations
-        test_cases.extend([
-            ("hotles in Paris", {"city": "Paris"}),
-            ("find hotels in Paaris", {"city": "Paris"}),
-            ("5 star hotles", {"star_rating": 5.0}),
-            ("hotels with ratng above 4.5", {"min_rating": 4.5}),
-            ("4 starr hotels", {"star_rating": 4.0}),
-            ("hotels in Londan", {"city": "London"}),
-        ])
-        
-        # ========== HotelRecommendation Entity Tests (15 cases) ==========
-        
-        # Traveler type searches
-        test_cases.extend([
-            ("recommend hotels for families", {"traveller_type": "Family"}),
-            ("find hotels for business travelers", {"traveller_type": "Business"}),
-            ("hotels for couples", {"traveller_type": "Couple"}),
-            ("I'm a solo traveler, recommend hotels", {"traveller_type": "Solo"}),
-            ("best hotels for families", {"traveller_type": "Family"}),
-            ("hotels suitable for business trips", {"traveller_type": "Business"}),
-            ("romantic hotels for couples", {"traveller_type": "Couple"}),
-            ("hotels for solo travelers", {"traveller_type": "Solo"}),
-        ])
-        
-        # Natural language variations
-        test_cases.extend([
-            ("what hotels do you recommend for families", {"traveller_type": "Family"}),
-            ("suggest hotels for business people", {"traveller_type": "Business"}),
-            ("I'm traveling with my family, any recommendations", {"traveller_type": "Family"}),
-            ("best hotels for my honeymoon", {"traveller_type": "Couple"}),
-            ("I'm traveling alone, suggest some hotels", {"traveller_type": "Solo"}),
-            ("me and my wife need a hotel", {"traveller_type": "Couple"}),
-            ("traveling with my husband", {"traveller_type": "Couple"}),
-        ])
-        
-        # ========== ReviewLookup Entity Tests (20 cases) ==========
-        
-        # Specific hotel reviews (using actual hotel names from hotels.csv)
-        test_cases.extend([
-            ("reviews for Hotel Plaza Athénée", {"hotel_name": "Hotel Plaza Athénée"}),
-            ("show me reviews of The Ritz London", {"hotel_name": "The Ritz London"}),
-            ("what are the reviews for Burj Al Arab", {"hotel_name": "Burj Al Arab"}),
-            ("I want to see reviews for Four Seasons George V", {"hotel_name": "Four Seasons George V"}),
-            ("reviews of The Savoy", {"hotel_name": "The Savoy"}),
-            ("find reviews for Claridge's", {"hotel_name": "Claridge's"}),
-            ("show reviews of Hotel Adlon Kempinski", {"hotel_name": "Hotel Adlon Kempinski"}),
-            ("reviews for Atlantis The Palm", {"hotel_name": "Atlantis The Palm"}),
-            ("what do people say about Mandarin Oriental", {"hotel_name": "Mandarin Oriental"}),
-            ("reviews for Park Hyatt Tokyo", {"hotel_name": "Park Hyatt Tokyo"}),
-        ])
-        
-        # General review requests (no specific hotel)
-        test_cases.extend([
-            ("show me hotel reviews", {}),
-            ("I want to see some reviews", {}),
-            ("what are the reviews", {}),
-            ("find reviews for hotels", {}),
-            ("show me customer reviews", {}),
-        ])
-        
-        # Typo variations
-        test_cases.extend([
-            ("reveiws for Hotel Plaza", {"hotel_name": "Hotel Plaza"}),
-            ("show me revews of The Ritz", {"hotel_name": "The Ritz"}),
-            ("reviews for Burj Al Arb", {"hotel_name": "Burj Al Arb"}),
-            ("what are the reviws", {}),
-            ("show hotel reveiws", {}),
-        ])
-        
-        # ========== LocationQuery Entity Tests (10 cases) ==========
-        
-        # City-specific location queries (LocationQuery doesn't extract scores, only cities)
-        test_cases.extend([
-            ("hotels in Paris with good location", {"city": "Paris"}),
-            ("find hotels in London with great location", {"city": "London"}),
-            ("hotels in central Dubai", {"city": "Dubai"}),
-            ("I need hotels in downtown Barcelona", {"city": "Barcelona"}),
-            ("hotels near city center in Rome", {"city": "Rome"}),
-            ("best located hotels in Tokyo", {"city": "Tokyo"}),
-            ("hotels with prime location in Berlin", {"city": "Berlin"}),
-            ("find centrally located hotels in Amsterdam", {"city": "Amsterdam"}),
-            ("hotels with excellent location in Singapore", {"country": "Singapore"}),
-            ("where are the best located hotels in Sydney", {"city": "Sydney", "min_rating": 7.5}),
-        ])
-        
-        # ========== VisaQuestion Entity Tests (20 cases) ==========
-        
-        # Country pair visa questions (using actual countries from visa.csv)
-        test_cases.extend([
-            ("do I need a visa from USA to France", {"from_country": "United States", "to_country": "France"}),
-            ("visa requirements from UK to Spain", {"from_country": "United Kingdom", "to_country": "Spain"}),
-            ("is visa required from Canada to Italy", {"from_country": "Canada", "to_country": "Italy"}),
-            ("do Americans need visa for Japan", {"from_country": "United States", "to_country": "Japan"}),
-            ("visa info from Australia to Egypt", {"from_country": "Australia", "to_country": "Egypt"}),
-            ("do I need visa from Germany to UAE", {"from_country": "Germany", "to_country": "United Arab Emirates"}),
-            ("visa requirements from France to China", {"from_country": "France", "to_country": "China"}),
-            ("is visa needed from UK to India", {"from_country": "United Kingdom", "to_country": "India"}),
-            ("do Canadians need visa for Thailand", {"from_country": "Canada", "to_country": "Thailand"}),
-            ("visa from USA to Mexico", {"from_country": "United States", "to_country": "Mexico"}),
-        ])
-        
-        # Natural language variations
-        test_cases.extend([
-            ("I'm from USA, do I need a visa for France", {"from_country": "United States", "to_country": "France"}),
-            ("traveling from UK to Spain, visa needed", {"from_country": "United Kingdom", "to_country": "Spain"}),
-            ("I'm Canadian going to Italy, visa required", {"from_country": "Canada", "to_country": "Italy"}),
-            ("Australian traveling to Egypt, need visa", {"from_country": "Australia", "to_country": "Egypt"}),
-            ("going from Germany to UAE, visa info", {"from_country": "Germany", "to_country": "United Arab Emirates"}),
-        ])
-        
-        # Typo variations
-        test_cases.extend([
-            ("do I need viza from USA to France", {"from_country": "United States", "to_country": "France"}),
-            ("visa from UK to Span", {"from_country": "United Kingdom", "to_country": "Spain"}),
-            ("visa from Canda to Italy", {"from_country": "Canada", "to_country": "Italy"}),
-            ("visa from USA to Japn", {"from_country": "United States", "to_country": "Japan"}),
-            ("viza requirements from Australia to Egypt", {"from_country": "Australia", "to_country": "Egypt"}),
-        ])
-        
-        # ========== AmenityFilter Entity Tests (20 cases) ==========
-        
-        # Cleanliness scores
-        test_cases.extend([
-            ("hotels with cleanliness score above 9.0", {"min_cleanliness": 9.0}),
-            ("find hotels with cleanliness above 9.5", {"min_rating": 9.5}),
-            ("show me hotels with cleanliness 9.2 or higher", {"min_cleanliness": 9.2}),
-            ("I need clean hotels with cleanliness score 9.8", {"min_cleanliness": 9.8}),
-            ("hotels with cleanliness above 9.3", {"min_cleanliness": 9.3}),
-        ])
-        
-        # Comfort scores
-        test_cases.extend([
-            ("hotels with comfort score above 9.0", {"min_comfort": 9.0}),
-            ("find comfortable hotels with comfort above 9.5", {"min_comfort": 9.5}),
-            ("show me hotels with comfort score 9.2", {"min_comfort": 9.2}),
-            ("I need hotels with comfort above 9.8", {"min_comfort": 9.8}),
-        ])
-        
-        # Value for money scores
-        test_cases.extend([
-            ("hotels with good value for money", {"min_value": 7.5}),
-            ("find hotels with value score above 9.0", {"min_rating": 9.0}),
-            ("show me hotels with value 8.5 or higher", {"min_value": 8.5}),
-            ("I need affordable hotels with value above 9.2", {"min_value": 9.2}),
-        ])
-        
-        # Staff scores
-        test_cases.extend([
-            ("hotels with staff score above 9.0", {"min_staff": 9.0}),
-            ("find hotels with friendly staff score 9.5", {"min_staff": 9.5}),
-            ("show me hotels with staff score 9.2", {"min_staff": 9.2}),
-            ("I need hotels with staff above 9.8", {"min_staff": 9.8}),
-        ])
-        
-        # Combined amenity filters
-        test_cases.extend([
-            ("hotels with cleanliness 9.5 and comfort 9.2", {"min_cleanliness": 9.5, "min_comfort": 9.2}),
-            ("find hotels with value above 9.0 and staff above 9.3", {"min_value": 9.0, "min_staff": 9.3}),
-        ])
+    def _run_one(self, i, view):
+        """
+        Classify and extract a single test case (executed on a worker thread)
         
-        return test_cases
+        Args:
+            i: Test case index
+            view: Precomputed QueryView for the test query
+            
+        Returns:
+            Tuple of (index, intent, extracted_entities, from_cache)
+        """
+        key = extract_cache_key(view.text, self._cache_namespace)
+        with self._lock:
+            cached = self._disk_cache.get(key)
+        if cached is not None:
+            # Reuse result persisted by a previous run
+            return i, cached["intent"], cached["entities"], True
+        
+        # Only real API work consumes rate-limit budget
+        self.rate_limiter.acquire()
+        
+        if self.analyzer is not None:
+            result = self.analyzer.analyze(view)
+            intent, extracted_entities = result["intent"], result["entities"]
+        else:
+            # Classify intent first (required for entity extraction)
+            intent = self._classify(view)
+            
+            # Extract entities
+            extracted_entities = self._extract(view, intent)
+        if self.extractor.last_llm_failed():
+            # Scored for this run, but never persisted as a result
+            return i, intent, extracted_entities, False
+        
+        # Write-through to the on-disk cache
+        with self._lock:
+            self._disk_cache[key] = {"intent": intent, "entities": extracted_entities}
+            self._disk_cache_dirty += 1
+            if self.use_cache and self._disk_cache_dirty >= EXTRACT_CACHE_FLUSH_EVERY:
+                save_extract_cache(self._disk_cache)
+                self._disk_cache_dirty = 0
+        
+        return i, intent, extracted_entities, False
     
     def run_tests(self, verbose=False, resume=True):
         """
-        Run all entity extraction tests with checkpoint/resume capability
+        Run all entity extraction tests concurrently with checkpoint/resume capability
         
         Args:
             verbose: Print detailed results for each test
@@ -352,74 +466,98 @@ class EntityExtractorTester:
             "failures": []
         }
         
-        start_index = 0
+        completed = set()
         
         # Check for checkpoint
         if resume:
             checkpoint = self._load_checkpoint()
             if checkpoint:
-                start_index = checkpoint["last_completed_index"] + 1
+                completed = set(checkpoint["completed_indices"])
                 results = checkpoint["results"]
+                remaining = len(self.test_cases) - len(completed)
                 print(f"\n📍 RESUMING FROM CHECKPOINT")
-                print(f"Completed: {start_index}/{len(self.test_cases)} test cases")
-                print(f"Current Accuracy: {results['correct']}/{start_index} = {(results['correct']/start_index*100):.1f}%")
-                print(f"Remaining: {len(self.test_cases) - start_index} test cases")
-                print(f"Estimated time: ~{(len(self.test_cases) - start_index) * 10 / 60:.1f} minutes\n")
+                print(f"Completed: {len(completed)}/{len(self.test_cases)} test cases")
+                print(f"Current Accuracy: {results['correct']}/{len(completed)} = {(results['correct']/len(completed)*100 if completed else 0):.1f}%")
+                print(f"Remaining: {remaining} test cases")
+                if self.rate_limiter.max_calls:
+                    print(f"Estimated time: ~{remaining / self.rate_limiter.max_calls * self.rate_limiter.period / 60:.1f} minutes\n")
+        else:
+            # Fresh start - the log is append-only, so drop any previous run
+            self._delete_checkpoint()
         
+        pending = [i for i in range(len(self.test_cases)) if i not in completed]
+        since_checkpoint = 0
+        
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
         try:
-            for i in range(start_index, len(self.test_cases)):
-                query, expected_entities = self.test_cases[i]
-                
-                # Show progress
-                query_display = query if len(query) <= 60 else query[:57] + "..."
-                print(f"[{i+1}/{len(self.test_cases)}] Testing: \"{query_display}\"", flush=True)
-                
-                # Classify intent first (required for entity extraction)
-                intent = self.classifier.classify(query)
-                
-                # Extract entities
-                extracted_entities = self.extractor.extract(query, intent)
+            # Resolve remaining cases in a handful of batched API calls up front
+            if self.batch_size > 1:
+                self._prefetch(pending)
+            
+            futures = [pool.submit(self._run_one, i, self.test_cases[i][3]) for i in pending]
+            
+            for future in as_completed(futures):
+                i, intent, extracted_entities, from_cache = future.result()
+                query, expected_entities, matcher, _ = self.test_cases[i]
                 
                 # Check if entities match
-                is_correct = self._entities_match(extracted_entities, expected_entities)
+                is_correct = matcher(extracted_entities)
                 
-                if is_correct:
-                    results["correct"] += 1
-                    status = "✅"
-                else:
-                    results["incorrect"] += 1
-                    results["failures"].append({
-                        "query": query,
-                        "expected": expected_entities,
-                        "extracted": extracted_entities
-                    })
-                    status = "❌"
+                with self._lock:
+                    if is_correct:
+                        results["correct"] += 1
+                        failure = None
+                        status = "✅"
+                    else:
+                        results["incorrect"] += 1
+                        failure = {
+                            "index": i,
+                            "query": query,
+                            "expected": dict(expected_entities),
+                            "extracted": extracted_entities
+                        }
+                        results["failures"].append(failure)
+                        status = "❌"
+                    completed.add(i)
+                    self._record_checkpoint(i, is_correct, failure)
+                    since_checkpoint += 1
+                    
+                    # Write checkpoint every few completions
+                    if since_checkpoint >= self.checkpoint_every:
+                        self._flush_checkpoint(len(completed))
+                        since_checkpoint = 0
                 
                 # Calculate current accuracy
-                current_accuracy = (results["correct"] / (i + 1)) * 100
+                current_accuracy = (results["correct"] / len(completed)) * 100
                 
-                # Print result
-                print(f"  Result: {status} | Accuracy: {current_accuracy:.1f}%", flush=True)
-                
-                if verbose or not is_correct:
-                    print(f"  Expected: {expected_entities}")
-                    print(f"  Extracted: {extracted_entities}")
-                
-                # Save checkpoint after each test
-                self._save_checkpoint(results, i)
-                
-                # Wait to avoid API rate limits (except for last test)
-                if i < len(self.test_cases) - 1:
-                    print(f"  ⏳ Waiting 15 seconds before next test...", flush=True)
-                    time.sleep(15)
+                # Show progress
+                query_display = query if len(query) <= 60 else query[:57] + "..."
+                cache_note = " (cached)" if from_cache else ""
+                if verbose:
+                    print(f"[{len(completed)}/{len(self.test_cases)}] \"{query_display}\"{cache_note}")
+                    print(f"  Result: {status} | Accuracy: {current_accuracy:.1f}%")
+                    print(f"  Expected: {dict(expected_entities)}")
+                    print(f"  Extracted: {extracted_entities}", flush=True)
+                else:
+                    # Single in-place progress line; failures are listed by print_results
+                    progress = f"[{len(completed)}/{len(self.test_cases)}] {status} Accuracy: {current_accuracy:.1f}% | \"{query_display}\"{cache_note}"
+                    print(f"\r{progress:<110}", end="", file=sys.stderr)
+            
+            if not verbose:
+                print(file=sys.stderr)
+            
+            # Keep failures in test-case order regardless of completion order
+            results["failures"].sort(key=lambda failure: failure.get("index", 0))
             
             # Delete checkpoint on successful completion
             self._delete_checkpoint()
             
         except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._flush_checkpoint(len(completed))
             print("\n\n⚠️ TEST INTERRUPTED BY USER")
-            print(f"Completed: {i}/{len(self.test_cases)} test cases")
-            print(f"Current Accuracy: {results['correct']}/{i} = {(results['correct']/i*100 if i > 0 else 0):.1f}%")
+            print(f"Completed: {len(completed)}/{len(self.test_cases)} test cases")
+            print(f"Current Accuracy: {results['correct']}/{len(completed)} = {(results['correct']/len(completed)*100 if completed else 0):.1f}%")
             print(f"Checkpoint saved. Run again to resume from this point.")
             print(f"\nTo change API key and resume:")
             print(f'  $env:GROQ_API_KEY="your-new-key"')
@@ -427,47 +565,66 @@ class EntityExtractorTester:
             raise
         
         except Exception as e:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._flush_checkpoint(len(completed))
             print(f"\n\n❌ ERROR: {e}")
-            print(f"Checkpoint saved at test {i}. Fix the issue and run again to resume.")
+            print(f"Checkpoint saved after {len(completed)} tests. Fix the issue and run again to resume.")
             raise
         
+        finally:
+            pool.shutdown(wait=True)
+            if self.use_cache and self._disk_cache_dirty:
+                save_extract_cache(self._disk_cache)
+                self._disk_cache_dirty = 0
+        
         return results
     
-    def print_results(self, results):
-        """Print comprehensive test results"""
-        print("\n" + "="*80)
-        print("ENTITY EXTRACTOR TEST RESULTS")
-        print("="*80)
+    def print_results(self, results, out=None):
+        """
+        Print comprehensive test results (assembled in memory, written once)
+        
+        Args:
+            results: Results dict returned by run_tests
+            out: Text stream to write to (defaults to sys.stdout)
+        """
+        lines = []
+        
+        lines.append("\n" + "="*80)
+        lines.append("ENTITY EXTRACTOR TEST RESULTS")
+        lines.append("="*80)
         
         total = results["total"]
         correct = results["correct"]
         incorrect = results["incorrect"]
         accuracy = (correct / total) * 100 if total > 0 else 0
         
-        print(f"\nTotal Test Cases: {total}")
-        print(f"Correct: {correct}")
-        print(f"Incorrect: {incorrect}")
-        print(f"Accuracy: {accuracy:.2f}%")
+        lines.append(f"\nTotal Test Cases: {total}")
+        lines.append(f"Correct: {correct}")
+        lines.append(f"Incorrect: {incorrect}")
+        lines.append(f"Accuracy: {accuracy:.2f}%")
         
         # Visual accuracy bar
         bar_length = 50
         filled = int(bar_length * correct / total) if total > 0 else 0
         bar = "█" * filled + "░" * (bar_length - filled)
-        print(f"\n[{bar}] {accuracy:.1f}%")
+        lines.append(f"\n[{bar}] {accuracy:.1f}%")
         
         # Show failures if any
         if results["failures"]:
-            print(f"\n{'='*80}")
-            print(f"FAILED TEST CASES ({len(results['failures'])})")
-            print(f"{'='*80}\n")
+            lines.append(f"\n{'='*80}")
+            lines.append(f"FAILED TEST CASES ({len(results['failures'])})")
+            lines.append(f"{'='*80}\n")
             
             for idx, failure in enumerate(results["failures"], 1):
-                print(f"{idx}. Query: \"{failure['query']}\"")
-                print(f"   Expected: {failure['expected']}")
-                print(f"   Extracted: {failure['extracted']}")
-                print()
+                lines.append(f"{idx}. Query: \"{failure['query']}\"")
+                lines.append(f"   Expected: {failure['expected']}")
+                lines.append(f"   Extracted: {failure['extracted']}")
+                lines.append("")
+        
+        lines.append("="*80)
         
-        print("="*80)
+        print("\n".join(lines), file=out or sys.stdout)
+
 
 def main():
     parser = argparse.ArgumentParser(description="Test Entity Extractor with comprehensive test cases")
@@ -476,6 +633,18 @@ def main():
                        help="Output file for results (default: entity_extractor_results3.txt)")
     parser.add_argument("--no-resume", action="store_true", 
                        help="Start fresh, ignoring any existing checkpoint")
+    parser.add_argument("--workers", type=int, default=4,
+                       help="Number of concurrent test workers (default: 4)")
+    parser.add_argument("--rpm", type=int, default=None,
+                       help="Maximum uncached test cases started per minute; 0 disables rate limiting "
+                            "(default: 10 with a remote LLM, 0 otherwise)")
+    parser.add_argument("--batch-size", type=int, default=32,
+                       help="Queries per batched LLM request; 1 disables batching (default: 32)")
+    parser.add_argument("--analyze", action="store_true",
+                       help="Measure the fused QueryAnalyzer.analyze() path used by the analyze node "
+                            "(no batching) instead of classify + extract")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Ignore cached extractions and call the classifier and extractor for every case")
     
     args = parser.parse_args()
     
@@ -483,7 +652,6 @@ def main():
     print("ENTITY EXTRACTOR COMPREHENSIVE TEST")
     print("="*80)
     print(f"Total Test Cases: 170")
-    print(f"Estimated Duration: ~28 minutes (10 seconds per test)")
     print(f"Output File: {args.output}")
     
     if args.no_resume:
@@ -493,7 +661,14 @@ def main():
     
     print("="*80)
     
-    tester = EntityExtractorTester()
+    tester = EntityExtractorTester(max_workers=args.workers, tests_per_minute=args.rpm,
+                                   batch_size=args.batch_size, use_cache=not args.no_cache,
+                                   analyze=args.analyze)
+    
+    rpm = tester.rate_limiter.max_calls
+    print(f"Workers: {args.workers} | Rate limit: {f'{rpm} tests/minute' if rpm else 'none'}")
+    if rpm:
+        print(f"Estimated Duration: ~{len(tester.test_cases) / rpm:.0f} minutes (uncached)")
     
     # Determine file mode and message
     resume = not args.no_resume
@@ -508,20 +683,15 @@ def main():
     # Run tests (output goes to console for live progress)
     results = tester.run_tests(verbose=args.verbose, resume=resume)
     
-    # Print final results (redirect to file)
+    # Print final results to file
     print(f"\n\n✓ Tests completed! Writing results to {args.output}...")
     
-    original_stdout = sys.stdout
-    try:
-        with open(args.output, file_mode, encoding='utf-8') as f:
-            sys.stdout = f
-            if checkpoint:
-                print("\n" + "="*80)
-                print("RESUMED TEST SESSION")
-                print("="*80 + "\n")
-            tester.print_results(results)
-    finally:
-        sys.stdout = original_stdout
+    with open(args.output, file_mode, encoding='utf-8', buffering=1 << 20) as f:
+        if checkpoint:
+            print("\n" + "="*80, file=f)
+            print("RESUMED TEST SESSION", file=f)
+            print("="*80 + "\n", file=f)
+        tester.print_results(results, out=f)
     
     # Show completion message on console
     accuracy = (results["correct"] / results["total"]) * 100 if results["total"] > 0 else 0
@@ -4,45 +4,25 @@ Quick test to verify entity extraction fixes
 
 import sys
 from pathlib import Path
+from functools import lru_cache
 
 # Add parent directory to path
 parent_dir = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(parent_dir))
 
-from components.entity_extractor import EntityExtractor
-from components.intent_classifier import IntentClassifier
+from components.entity_extractor import get_entity_extractor
+from components.intent_classifier import get_intent_classifier
+from test_entity_extractor import extract_cache_key, extract_cache_namespace, load_extract_cache, save_extract_cache
+from shared_test_cases import ALL_CASES, FIX_IDS, FIX_ONLY_CASES
 
 def test_fixes():
-    extractor = EntityExtractor()
-    classifier = IntentClassifier()
+    extractor = get_entity_extractor()
+    classifier = get_intent_classifier()
+    classify = lru_cache(maxsize=4096)(classifier.classify)
+    extract = lru_cache(maxsize=4096)(extractor.extract)
     
-    test_cases = [
-        # Star rating tests
-        ("5 star hotels in Paris", {"city": "Paris", "star_rating": 5.0}),
-        ("find 4 star hotels in London", {"city": "London", "star_rating": 4.0}),
-        
-        # Country vs city
-        ("hotels in France", {"country": "France"}),
-        ("hotels in Spain", {"country": "Spain"}),
-        ("hotels in Paris", {"city": "Paris"}),
-        
-        # Visa patterns
-        ("do I need a visa from USA to France", {"from_country": "United States", "to_country": "France"}),
-        ("do Americans need visa for Japan", {"from_country": "United States", "to_country": "Japan"}),
-        
-        # Rating extraction
-        ("hotels with rating 4.8", {"min_rating": 4.8}),
-        ("hotels with rating 4.7 or higher", {"min_rating": 4.7}),
-        
-        # Quality scores without defaults
-        ("hotels with cleanliness score above 9.0", {"min_cleanliness": 9.0}),
-        ("show me hotels with comfort score 9.2", {"min_comfort": 9.2}),
-        ("hotels with staff score above 9.0", {"min_staff": 9.0}),
-        
-        # No greedy city matching
-        ("I want to see some reviews", {}),
-        ("what do people say about Mandarin Oriental", {"hotel_name": "Mandarin Oriental"}),
-    ]
+    # Shared cases first (already cached by the comprehensive run), then fix-only ones
+    test_cases = [ALL_CASES[i] for i in FIX_IDS] + list(FIX_ONLY_CASES)
     
     print("="*80)
     print("ENTITY EXTRACTION FIX VERIFICATION")
@@ -51,9 +31,22 @@ def test_fixes():
     passed = 0
     failed = 0
     
+    disk_cache = load_extract_cache()
+    cache_updated = False
+    namespace = extract_cache_namespace(extractor, classifier)
+    
     for query, expected in test_cases:
-        intent = classifier.classify(query)
-        extracted = extractor.extract(query, intent)
+        key = extract_cache_key(query, namespace)
+        cached = disk_cache.get(key)
+        if cached is not None:
+            extracted = cached["entities"]
+        else:
+            intent = classify(query)
+            extracted = extract(query, intent)
+            # Rule-only fallbacks after an LLM failure are not cached
+            if not extractor.last_llm_failed():
+                disk_cache[key] = {"intent": intent, "entities": extracted}
+                cache_updated = True
         
         # Check if extracted matches expected
         match = True
@@ -76,9 +69,12 @@ def test_fixes():
             failed += 1
         
         print(f"\n{status} Query: \"{query}\"")
-        print(f"   Expected: {expected}")
+        print(f"   Expected: {dict(expected)}")
         print(f"   Extracted: {extracted}")
     
+    if cache_updated:
+        save_extract_cache(disk_cache)
+    
     print("\n" + "="*80)
     print(f"Results: {passed} passed, {failed} failed")
     print("="*80)
@@ -14,6 +14,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from components.intent_classifier import IntentClassifier
+from components.query_analyzer import QueryAnalyzer
+from shared_test_cases import load_intent_test_cases
 
 
 class IntentClassifierTester:
@@ -23,9 +25,18 @@ class IntentClassifierTester:
     """
     
     CHECKPOINT_FILE = "intent_classifier_checkpoint.json"
+    ANALYZE_CHECKPOINT_FILE = "intent_classifier_analyze_checkpoint.json"
     
-    def __init__(self):
+    def __init__(self, analyze=False):
+        """
+        Args:
+            analyze: If True, measure the intent from QueryAnalyzer.analyze()
+                (fused intent + entity call) instead of IntentClassifier.classify()
+        """
         self.classifier = IntentClassifier()
+        self.analyzer = QueryAnalyzer(classifier=self.classifier) if analyze else None
+        if analyze:
+            self.CHECKPOINT_FILE = self.ANALYZE_CHECKPOINT_FILE
         self.test_cases = self._build_test_cases()
     
     def _load_checkpoint(self):
@@ -62,186 +73,8 @@ class IntentClassifierTester:
                 print(f"⚠️ Warning: Could not delete checkpoint: {e}")
     
     def _build_test_cases(self):
-        """Build comprehensive test cases covering all intents with multiple variations"""
-        return [
-            # ========== HotelSearch (40 test cases) ==========
-            {"query": "Find hotels in Paris", "expected": "HotelSearch"},
-            {"query": "Show me hotels in Tokyo", "expected": "HotelSearch"},
-            {"query": "I need hotels in New York", "expected": "HotelSearch"},
-            {"query": "hotels in Dubai", "expected": "HotelSearch"},
-            {"query": "Looking for hotels in London", "expected": "HotelSearch"},
-            {"query": "What hotels are available in Cairo?", "expected": "HotelSearch"},
-            {"query": "Can you find me hotels in Sydney", "expected": "HotelSearch"},
-            {"query": "I want to stay in Bangkok", "expected": "HotelSearch"},
-            {"query": "Find hotels in France", "expected": "HotelSearch"},
-            {"query": "Show me hotels in Japan", "expected": "HotelSearch"},
-            {"query": "hotels in the United States", "expected": "HotelSearch"},
-            {"query": "accommodation in Egypt", "expected": "HotelSearch"},
-            {"query": "places to stay in Italy", "expected": "HotelSearch"},
-            {"query": "Find hotels with rating above 8", "expected": "HotelSearch"},
-            {"query": "Show me highly rated hotels", "expected": "HotelSearch"},
-            {"query": "I need hotels with good ratings", "expected": "HotelSearch"},
-            {"query": "hotels rated 9 or higher", "expected": "HotelSearch"},
-            {"query": "top rated hotels", "expected": "HotelSearch"},
-            {"query": "hotels with rating above 8.5", "expected": "HotelSearch"},
-            {"query": "Find me hotels with excellent ratings", "expected": "HotelSearch"},
-            {"query": "5-star hotels in Paris", "expected": "HotelSearch"},
-            {"query": "Find 5 star hotels", "expected": "HotelSearch"},
-            {"query": "I want a five-star hotel", "expected": "HotelSearch"},
-            {"query": "Show me 4-star hotels in London", "expected": "HotelSearch"},
-            {"query": "luxury 5-star accommodation", "expected": "HotelSearch"},
-            {"query": "Find 5-star hotels in Dubai with rating above 9", "expected": "HotelSearch"},
-            {"query": "I need highly rated hotels in Tokyo", "expected": "HotelSearch"},
-            {"query": "Show me top hotels in Singapore", "expected": "HotelSearch"},
-            {"query": "find hoteks in cairo", "expected": "HotelSearch"},
-            {"query": "hotels in Pari", "expected": "HotelSearch"},
-            {"query": "show me hotles in london", "expected": "HotelSearch"},
-            {"query": "Where can I stay in Rome?", "expected": "HotelSearch"},
-            {"query": "I'm looking for a place to stay in Barcelona", "expected": "HotelSearch"},
-            {"query": "What are my accommodation options in Amsterdam?", "expected": "HotelSearch"},
-            {"query": "I need somewhere to stay in Berlin", "expected": "HotelSearch"},
-            {"query": "Find me a hotel in Moscow", "expected": "HotelSearch"},
-            {"query": "I'm traveling to Istanbul, where should I stay?", "expected": "HotelSearch"},
-            {"query": "Looking for accommodation in Singapore", "expected": "HotelSearch"},
-            
-            # ========== HotelRecommendation (18 test cases) ==========
-            {"query": "Best hotels for couples", "expected": "HotelRecommendation"},
-            {"query": "Top hotels for families", "expected": "HotelRecommendation"},
-            {"query": "Recommend hotels for business travelers", "expected": "HotelRecommendation"},
-            {"query": "What are the best hotels for solo travelers?", "expected": "HotelRecommendation"},
-            {"query": "Hotels suitable for families with kids", "expected": "HotelRecommendation"},
-            {"query": "I'm traveling for business, what hotels do you recommend?", "expected": "HotelRecommendation"},
-            {"query": "Best romantic hotels for couples", "expected": "HotelRecommendation"},
-            {"query": "Top rated hotels for group travel", "expected": "HotelRecommendation"},
-            {"query": "Where should a couple stay?", "expected": "HotelRecommendation"},
-            {"query": "Recommend me hotels for a family vacation", "expected": "HotelRecommendation"},
-            {"query": "Best hotels for couples in Paris", "expected": "HotelRecommendation"},
-            {"query": "Top family-friendly hotels in Tokyo", "expected": "HotelRecommendation"},
-            {"query": "Recommend business hotels in London with high ratings", "expected": "HotelRecommendation"},
-            {"query": "What's the best hotel for a romantic getaway?", "expected": "HotelRecommendation"},
-            {"query": "I need a hotel recommendation for families", "expected": "HotelRecommendation"},
-            {"query": "Suggest a hotel for my business trip", "expected": "HotelRecommendation"},
-            {"query": "Where do couples usually stay?", "expected": "HotelRecommendation"},
-            {"query": "Recommend hotels for solo travelers", "expected": "HotelRecommendation"},
-            
-            # ========== ReviewLookup (20 test cases) ==========
-            {"query": "Show me reviews for The Azure Tower", "expected": "ReviewLookup"},
-            {"query": "What are the reviews for The Royal Compass?", "expected": "ReviewLookup"},
-            {"query": "Reviews for L'Étoile Palace", "expected": "ReviewLookup"},
-            {"query": "Tell me about reviews for The Golden Oasis", "expected": "ReviewLookup"},
-            {"query": "I want to see reviews for Marina Bay Zenith", "expected": "ReviewLookup"},
-            {"query": "Show reviews for Copacabana Lux", "expected": "ReviewLookup"},
-            {"query": "What do people say about The Maple Grove?", "expected": "ReviewLookup"},
-            {"query": "Reviews for Nile Grandeur", "expected": "ReviewLookup"},
-            {"query": "Find reviews for The Bosphorus Inn", "expected": "ReviewLookup"},
-            {"query": "Show me hotel reviews", "expected": "ReviewLookup"},
-            {"query": "What do guests say about this hotel?", "expected": "ReviewLookup"},
-            {"query": "I want to read customer feedback", "expected": "ReviewLookup"},
-            {"query": "Can I see guest reviews?", "expected": "ReviewLookup"},
-            {"query": "What's the feedback for hotels in Paris?", "expected": "ReviewLookup"},
-            {"query": "What are guests saying about The Orchid Palace?", "expected": "ReviewLookup"},
-            {"query": "Customer reviews for Gaudi's Retreat", "expected": "ReviewLookup"},
-            {"query": "Tell me what people think about Canal House Grand", "expected": "ReviewLookup"},
-            {"query": "Any feedback on The Kiwi Grand?", "expected": "ReviewLookup"},
-            {"query": "reviews for The Azur Tower", "expected": "ReviewLookup"},
-            {"query": "show me reveiws for hotels", "expected": "ReviewLookup"},
-            
-            # ========== LocationQuery (15 test cases) ==========
-            {"query": "Hotels with best location scores", "expected": "LocationQuery"},
-            {"query": "Which hotels have the best location?", "expected": "LocationQuery"},
-            {"query": "Find hotels with excellent location", "expected": "LocationQuery"},
-            {"query": "Show me hotels with good location ratings", "expected": "LocationQuery"},
-            {"query": "I need hotels with high location scores", "expected": "LocationQuery"},
-            {"query": "Hotels in the best locations", "expected": "LocationQuery"},
-            {"query": "Which hotel has the highest location score?", "expected": "LocationQuery"},
-            {"query": "Hotels with best location in London", "expected": "LocationQuery"},
-            {"query": "Find hotels with great location in Paris", "expected": "LocationQuery"},
-            {"query": "Best located hotels in Tokyo", "expected": "LocationQuery"},
-            {"query": "Hotels with top location scores in Dubai", "expected": "LocationQuery"},
-            {"query": "Where are the best located hotels?", "expected": "LocationQuery"},
-            {"query": "I want a hotel in a prime location", "expected": "LocationQuery"},
-            {"query": "Hotels with convenient locations", "expected": "LocationQuery"},
-            {"query": "Show me centrally located hotels", "expected": "LocationQuery"},
-            
-            # ========== VisaQuestion (20 test cases) ==========
-            {"query": "Do I need a visa from USA to France?", "expected": "VisaQuestion"},
-            {"query": "Visa requirements from United Kingdom to Japan", "expected": "VisaQuestion"},
-            {"query": "Is a visa required from Germany to Egypt?", "expected": "VisaQuestion"},
-            {"query": "Do I need visa to travel from China to United States?", "expected": "VisaQuestion"},
-            {"query": "Visa requirements from India to United Kingdom", "expected": "VisaQuestion"},
-            {"query": "Check visa from Canada to Australia", "expected": "VisaQuestion"},
-            {"query": "Do citizens of Brazil need visa for Singapore?", "expected": "VisaQuestion"},
-            {"query": "Is visa needed from Russia to France?", "expected": "VisaQuestion"},
-            {"query": "Visa requirements from Egypt to Germany", "expected": "VisaQuestion"},
-            {"query": "Do I need a visa from South Africa to Italy?", "expected": "VisaQuestion"},
-            {"query": "Can I travel from USA to Japan without a visa?", "expected": "VisaQuestion"},
-            {"query": "What are the visa requirements from Mexico to Spain?", "expected": "VisaQuestion"},
-            {"query": "I'm from Thailand, do I need visa for United Arab Emirates?", "expected": "VisaQuestion"},
-            {"query": "Traveling from South Korea to Canada, need visa?", "expected": "VisaQuestion"},
-            {"query": "Check if I need travel documents from Australia to United Kingdom", "expected": "VisaQuestion"},
-            {"query": "Do I need a passport visa from France to Italy?", "expected": "VisaQuestion"},
-            {"query": "Travel document requirements from United States to Mexico", "expected": "VisaQuestion"},
-            {"query": "visa requiremnts from USA to UK", "expected": "VisaQuestion"},
-            {"query": "do i need viza from Germany to Spain", "expected": "VisaQuestion"},
-            {"query": "visa from Fance to Japan", "expected": "VisaQuestion"},
-            
-            # ========== AmenityFilter (25 test cases) ==========
-            {"query": "Hotels with high cleanliness", "expected": "AmenityFilter"},
-            {"query": "Find hotels with cleanliness score above 9", "expected": "AmenityFilter"},
-            {"query": "I need hotels with excellent cleanliness", "expected": "AmenityFilter"},
-            {"query": "Show me the cleanest hotels", "expected": "AmenityFilter"},
-            {"query": "Hotels known for cleanliness", "expected": "AmenityFilter"},
-            {"query": "Find hotels with high cleanliness scores", "expected": "AmenityFilter"},
-            {"query": "Hotels with high comfort score", "expected": "AmenityFilter"},
-            {"query": "Find comfortable hotels", "expected": "AmenityFilter"},
-            {"query": "I want hotels with excellent comfort", "expected": "AmenityFilter"},
-            {"query": "Show me hotels with good comfort ratings", "expected": "AmenityFilter"},
-            {"query": "Most comfortable hotels available", "expected": "AmenityFilter"},
-            {"query": "Good value for money", "expected": "AmenityFilter"},
-            {"query": "Hotels with best value for money", "expected": "AmenityFilter"},
-            {"query": "I need hotels with high value", "expected": "AmenityFilter"},
-            {"query": "Find hotels with great value for money scores", "expected": "AmenityFilter"},
-            {"query": "Best value hotels", "expected": "AmenityFilter"},
-            {"query": "Hotels with excellent value for money", "expected": "AmenityFilter"},
-            {"query": "Hotels with excellent staff", "expected": "AmenityFilter"},
-            {"query": "Find hotels with great staff service", "expected": "AmenityFilter"},
-            {"query": "I need hotels with high staff scores", "expected": "AmenityFilter"},
-            {"query": "Show me hotels with friendly staff", "expected": "AmenityFilter"},
-            {"query": "Hotels with best staff ratings", "expected": "AmenityFilter"},
-            {"query": "Hotels with high cleanliness and comfort", "expected": "AmenityFilter"},
-            {"query": "Find hotels with good value and excellent staff", "expected": "AmenityFilter"},
-            {"query": "I need clean hotels with comfortable rooms", "expected": "AmenityFilter"},
-            {"query": "Show me hotels with great cleanliness and staff scores", "expected": "AmenityFilter"},
-            
-            # ========== CasualConversation (15 test cases) ==========
-            {"query": "Hi", "expected": "CasualConversation"},
-            {"query": "Hello", "expected": "CasualConversation"},
-            {"query": "Hey there", "expected": "CasualConversation"},
-            {"query": "Good morning", "expected": "CasualConversation"},
-            {"query": "Thanks", "expected": "CasualConversation"},
-            {"query": "Thank you", "expected": "CasualConversation"},
-            {"query": "Thanks a lot", "expected": "CasualConversation"},
-            {"query": "Help", "expected": "CasualConversation"},
-            {"query": "What can you do?", "expected": "CasualConversation"},
-            {"query": "How can you help me?", "expected": "CasualConversation"},
-            {"query": "What are your capabilities?", "expected": "CasualConversation"},
-            {"query": "Bye", "expected": "CasualConversation"},
-            {"query": "Goodbye", "expected": "CasualConversation"},
-            {"query": "See you later", "expected": "CasualConversation"},
-            {"query": "Have a nice day", "expected": "CasualConversation"},
-            
-            # ========== GeneralQuestionAnswering (10 test cases) ==========
-            {"query": "Tell me about The Azure Tower", "expected": "GeneralQuestionAnswering"},
-            {"query": "What do you know about hotels in general?", "expected": "GeneralQuestionAnswering"},
-            {"query": "Give me information about The Royal Compass", "expected": "GeneralQuestionAnswering"},
-            {"query": "Describe The Golden Oasis", "expected": "GeneralQuestionAnswering"},
-            {"query": "What are the facilities at Marina Bay Zenith?", "expected": "GeneralQuestionAnswering"},
-            {"query": "Tell me everything about Copacabana Lux", "expected": "GeneralQuestionAnswering"},
-            {"query": "Information about The Maple Grove hotel", "expected": "GeneralQuestionAnswering"},
-            {"query": "What can you tell me about Nile Grandeur?", "expected": "GeneralQuestionAnswering"},
-            {"query": "Details about The Bosphorus Inn", "expected": "GeneralQuestionAnswering"},
-            {"query": "I want comprehensive information about The Orchid Palace", "expected": "GeneralQuestionAnswering"},
-        ]
+        """Load the shared intent test cases covering all intents with multiple variations"""
+        return load_intent_test_cases()
     
     def run_tests(self, verbose=False, resume=True):
         """
@@ -307,7 +140,7 @@ class IntentClassifierTester:
         
         if start_index == 0:
             print("=" * 80)
-            print("INTENT CLASSIFIER QUANTITATIVE TEST")
+            print("INTENT CLASSIFIER QUANTITATIVE TEST" + (" (QueryAnalyzer.analyze)" if self.analyzer else ""))
             print("=" * 80)
             print(f"Total test cases: {results['total']}")
             print("=" * 80)
@@ -326,7 +159,10 @@ class IntentClassifierTester:
                 print(progress_msg, flush=True)
                 
                 # Classify query
-                predicted = self.classifier.classify(query)
+                if self.analyzer is not None:
+                    predicted = self.analyzer.analyze(query)["intent"]
+                else:
+                    predicted = self.classifier.classify(query)
                 
                 # Check if correct
                 is_correct = (predicted == expected)
@@ -477,12 +313,19 @@ def main():
         action="store_true",
         help="Start from beginning, ignore checkpoint"
     )
+    parser.add_argument(
+        "--analyze",
+        action="store_true",
+        help="Measure the fused QueryAnalyzer.analyze() path used by the analyze node "
+             "instead of IntentClassifier.classify()"
+    )
     
     args = parser.parse_args()
     
     # Open output file in append mode if resuming
     resume = not args.no_resume
-    checkpoint_path = Path(__file__).parent / IntentClassifierTester.CHECKPOINT_FILE
+    checkpoint_name = IntentClassifierTester.ANALYZE_CHECKPOINT_FILE if args.analyze else IntentClassifierTester.CHECKPOINT_FILE
+    checkpoint_path = Path(__file__).parent / checkpoint_name
     checkpoint_exists = checkpoint_path.exists()
     mode = 'a' if (resume and checkpoint_exists) else 'w'
     
@@ -494,7 +337,7 @@ def main():
             sys.stdout = f
             
             # Create tester and run tests
-            tester = IntentClassifierTester()
+            tester = IntentClassifierTester(analyze=args.analyze)
             
             # Restore stdout temporarily for test execution (console progress)
             sys.stdout = original_stdout
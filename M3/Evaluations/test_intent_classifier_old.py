@@ -6,15 +6,25 @@ WITH CHECKPOINT AND LIVE PROGRESS SUPPORT
 """
 
 import sys
-import time
 import json
+import hashlib
+import os
+import queue
+import random
+import shelve
+import threading
 from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+import numpy as np
 
 # Add M3 directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Import the OLD classifier
 from components.intent_classifier_old_LLM_only import IntentClassifier
+from test_entity_extractor import RateLimiter, _dumps, _loads
+from shared_test_cases import load_intent_test_cases
 
 
 class IntentClassifierTester:
@@ -23,378 +33,464 @@ class IntentClassifierTester:
     Supports checkpoint/resume and live progress display
     """
     
-    CHECKPOINT_FILE = "intent_classifier_old_checkpoint.json"
+    # Append-only log of per-test outcomes (one JSON object per line)
+    CHECKPOINT_FILE = "intent_classifier_old_checkpoint.jsonl"
+    CHECKPOINT_FSYNC_EVERY = 5
     
-    def __init__(self):
-        self.classifier = IntentClassifier()
-        self.test_cases = self._build_test_cases()
+    # Persistent normalized-query -> intent cache shared across runs; one shelve
+    # per (cache version, model, system prompt), so changing any of them starts fresh
+    CLASSIFY_CACHE_DIR = Path(__file__).parent / ".classify_cache"
+    CLASSIFY_CACHE_VERSION = 2
     
-    def _load_checkpoint(self):
-        """Load checkpoint if exists"""
-        checkpoint_path = Path(__file__).parent / self.CHECKPOINT_FILE
-        if checkpoint_path.exists():
-            try:
-                with open(checkpoint_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"⚠️ Warning: Could not load checkpoint: {e}")
-        return None
-    
-    def _save_checkpoint(self, results, last_completed_index):
-        """Save checkpoint after each test case"""
-        checkpoint_path = Path(__file__).parent / self.CHECKPOINT_FILE
-        checkpoint = {
-            "last_completed_index": last_completed_index,
-            "results": results
+    # Prediction recorded when the LLM gives no usable intent (never cached)
+    FALLBACK_INTENT = "GeneralQuestionAnswering"
+    
+    # Console status labels, built once
+    PASS = "✅ PASS"
+    FAIL = "❌ FAIL"
+    
+    # Provider request budget (LLM calls started per minute)
+    DEFAULT_REQUESTS_PER_MINUTE = 30
+    
+    # Per-call retry policy for rate-limit (429) responses
+    MAX_RETRIES = 5
+    RETRY_BASE_DELAY = 2.0
+    
+    def __init__(self, max_workers=8, requests_per_minute=None, use_cache=True, batch_size=None, fast_path=False):
+        self.classifier = IntentClassifier(fast_path=fast_path)
+        self.queries, self.expected = self._build_test_cases()
+        # Expected intent of each case as an index into INTENTS, resolved once
+        self.intent_index = {intent: idx for idx, intent in enumerate(self.classifier.INTENTS)}
+        self.expected_idx = np.fromiter(
+            (self.intent_index[expected] for expected in self.expected),
+            dtype=np.int32,
+            count=len(self.queries)
+        )
+        self.max_workers = max(1, max_workers)
+        self.batch_size = max(1, batch_size or self.classifier.BATCH_SIZE)
+        if requests_per_minute is None:
+            requests_per_minute = self.DEFAULT_REQUESTS_PER_MINUTE
+        self.rate_limiter = RateLimiter(requests_per_minute)
+        self.checkpoint_path = Path(__file__).parent / self.CHECKPOINT_FILE
+        # Checkpoint records are written by a background thread fed through this queue
+        self._ckpt_q = queue.Queue()
+        self._writer = None
+        self.use_cache = use_cache
+        self._cache = None
+        self._cache_lock = threading.Lock()
+    
+    def _new_results(self):
+        """Create an empty results dict with per-case done/correct masks (indexed like test cases)"""
+        return {
+            "total": len(self.queries),
+            "correct": 0,
+            "incorrect": 0,
+            "done_mask": np.zeros(len(self.queries), dtype=bool),
+            "correct_mask": np.zeros(len(self.queries), dtype=bool),
+            "failures": []
+        }
+    
+    def _summarize_by_intent(self, results):
+        """Replace the per-case masks with the by_intent dict used for reporting"""
+        done_mask = results.pop("done_mask")
+        correct_mask = results.pop("correct_mask")
+        num_intents = len(self.classifier.INTENTS)
+        
+        # One vectorized pass per counter over all completed cases
+        totals = np.bincount(self.expected_idx[done_mask], minlength=num_intents)
+        corrects = np.bincount(self.expected_idx[correct_mask], minlength=num_intents)
+        accuracies = corrects * 100.0 / np.maximum(totals, 1)
+        results["by_intent"] = {
+            intent: {
+                "total": total,
+                "correct": correct,
+                "incorrect": total - correct,
+                "accuracy": accuracy
+            }
+            for intent, total, correct, accuracy in zip(
+                self.classifier.INTENTS, totals.tolist(), corrects.tolist(), accuracies.tolist()
+            )
         }
+    
+    def _tally(self, results, i, predicted):
+        """
+        Add one test outcome to results
+        
+        Args:
+            results: Results dict being accumulated
+            i: Test case index
+            predicted: Predicted intent
+            
+        Returns:
+            True if the prediction was correct
+        """
+        expected = self.expected[i]
+        is_correct = (predicted == expected)
+        
+        results["done_mask"][i] = True
+        if is_correct:
+            results["correct"] += 1
+            results["correct_mask"][i] = True
+        else:
+            results["incorrect"] += 1
+            results["failures"].append({
+                "index": i,
+                "query": self.queries[i],
+                "expected": expected,
+                "predicted": predicted
+            })
+        
+        return is_correct
+    
+    def _load_checkpoint(self):
+        """
+        Rebuild progress by streaming the checkpoint log in a single pass
+        
+        Returns:
+            Dict with completed_indices and results, or None if there is nothing to resume
+        """
+        if not self.checkpoint_path.exists():
+            return None
+        
+        results = self._new_results()
+        completed = set()
+        
+        try:
+            with open(self.checkpoint_path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = _loads(line)
+                    except json.JSONDecodeError:
+                        # Torn line from an interrupted write - that test simply reruns
+                        continue
+                    i = record.get("i")
+                    # Skip records that no longer match the current test list
+                    if (not isinstance(i, int) or i in completed or not 0 <= i < len(self.queries)
+                            or self.queries[i] != record.get("query")):
+                        continue
+                    completed.add(i)
+                    self._tally(results, i, record.get("predicted"))
+        except Exception as e:
+            print(f"⚠️ Warning: Could not load checkpoint: {e}")
+            return None
+        
+        if not completed:
+            return None
+        results["accuracy"] = (results["correct"] / len(completed)) * 100
+        return {"completed_indices": completed, "results": results}
+    
+    def _writer_loop(self):
+        """
+        Drain checkpoint records from the queue into the log (runs on the writer thread)
+        
+        Records are written in batches through one persistent buffered file and
+        fsynced every few records; a None sentinel flushes, closes and stops the thread.
+        """
+        unsynced = 0
+        stop = False
         try:
-            with open(checkpoint_path, 'w', encoding='utf-8') as f:
-                json.dump(checkpoint, f, indent=2)
+            with open(self.checkpoint_path, 'ab') as f:
+                while True:
+                    batch = [self._ckpt_q.get()]
+                    # Grab everything else already queued so it goes out in one write
+                    while batch[-1] is not None:
+                        try:
+                            batch.append(self._ckpt_q.get_nowait())
+                        except queue.Empty:
+                            break
+                    stop = batch[-1] is None
+                    records = batch[:-1] if stop else batch
+                    
+                    if records:
+                        f.write(b"".join(_dumps(record) + b"\n" for record in records))
+                        unsynced += len(records)
+                    if stop or unsynced >= self.CHECKPOINT_FSYNC_EVERY:
+                        f.flush()
+                        os.fsync(f.fileno())
+                        unsynced = 0
+                    if stop:
+                        return
         except Exception as e:
             print(f"⚠️ Warning: Could not save checkpoint: {e}")
+            # Keep draining until the sentinel so _close_checkpoint never blocks
+            while not stop:
+                stop = self._ckpt_q.get() is None
+    
+    def _save_checkpoint(self, i, predicted):
+        """Queue one test outcome for the background checkpoint writer"""
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+            self._writer.start()
+        self._ckpt_q.put({"i": i, "query": self.queries[i], "expected": self.expected[i], "predicted": predicted})
+    
+    def _close_checkpoint(self):
+        """Flush pending checkpoint records and stop the writer thread"""
+        if self._writer is not None:
+            self._ckpt_q.put(None)
+            self._writer.join()
+            self._writer = None
     
     def _delete_checkpoint(self):
         """Delete checkpoint file after successful completion"""
-        checkpoint_path = Path(__file__).parent / self.CHECKPOINT_FILE
-        if checkpoint_path.exists():
+        self._close_checkpoint()
+        if self.checkpoint_path.exists():
             try:
-                checkpoint_path.unlink()
+                self.checkpoint_path.unlink()
             except Exception as e:
                 print(f"⚠️ Warning: Could not delete checkpoint: {e}")
     
-    def _build_test_cases(self):
-        """Build comprehensive test cases covering all intents with multiple variations"""
-        return [
-            # ========== HotelSearch (40 test cases) ==========
-            {"query": "Find hotels in Paris", "expected": "HotelSearch"},
-            {"query": "Show me hotels in Tokyo", "expected": "HotelSearch"},
-            {"query": "I need hotels in New York", "expected": "HotelSearch"},
-            {"query": "hotels in Dubai", "expected": "HotelSearch"},
-            {"query": "Looking for hotels in London", "expected": "HotelSearch"},
-            {"query": "What hotels are available in Cairo?", "expected": "HotelSearch"},
-            {"query": "Can you find me hotels in Sydney", "expected": "HotelSearch"},
-            {"query": "I want to stay in Bangkok", "expected": "HotelSearch"},
-            {"query": "Find hotels in France", "expected": "HotelSearch"},
-            {"query": "Show me hotels in Japan", "expected": "HotelSearch"},
-            {"query": "hotels in the United States", "expected": "HotelSearch"},
-            {"query": "accommodation in Egypt", "expected": "HotelSearch"},
-            {"query": "places to stay in Italy", "expected": "HotelSearch"},
-            {"query": "Find hotels with rating above 8", "expected": "HotelSearch"},
-            {"query": "Show me highly rated hotels", "expected": "HotelSearch"},
-            {"query": "I need hotels with good ratings", "expected": "HotelSearch"},
-            {"query": "hotels rated 9 or higher", "expected": "HotelSearch"},
-            {"query": "top rated hotels", "expected": "HotelSearch"},
-            {"query": "hotels with rating above 8.5", "expected": "HotelSearch"},
-            {"query": "Find me hotels with excellent ratings", "expected": "HotelSearch"},
-            {"query": "5-star hotels in Paris", "expected": "HotelSearch"},
-            {"query": "Find 5 star hotels", "expected": "HotelSearch"},
-            {"query": "I want a five-star hotel", "expected": "HotelSearch"},
-            {"query": "Show me 4-star hotels in London", "expected": "HotelSearch"},
-            {"query": "luxury 5-star accommodation", "expected": "HotelSearch"},
-            {"query": "Find 5-star hotels in Dubai with rating above 9", "expected": "HotelSearch"},
-            {"query": "I need highly rated hotels in Tokyo", "expected": "HotelSearch"},
-            {"query": "Show me top hotels in Singapore", "expected": "HotelSearch"},
-            {"query": "find hoteks in cairo", "expected": "HotelSearch"},
-            {"query": "hotels in Pari", "expected": "HotelSearch"},
-            {"query": "show me hotles in london", "expected": "HotelSearch"},
-            {"query": "Where can I stay in Rome?", "expected": "HotelSearch"},
-            {"query": "I'm looking for a place to stay in Barcelona", "expected": "HotelSearch"},
-            {"query": "What are my accommodation options in Amsterdam?", "expected": "HotelSearch"},
-            {"query": "I need somewhere to stay in Berlin", "expected": "HotelSearch"},
-            {"query": "Find me a hotel in Moscow", "expected": "HotelSearch"},
-            {"query": "I'm traveling to Istanbul, where should I stay?", "expected": "HotelSearch"},
-            {"query": "Looking for accommodation in Singapore", "expected": "HotelSearch"},
-            
-            # ========== HotelRecommendation (18 test cases) ==========
-            {"query": "Best hotels for couples", "expected": "HotelRecommendation"},
-            {"query": "Top hotels for families", "expected": "HotelRecommendation"},
-            {"query": "Recommend hotels for business travelers", "expected": "HotelRecommendation"},
-            {"query": "What are the best hotels for solo travelers?", "expected": "HotelRecommendation"},
-            {"query": "Hotels suitable for families with kids", "expected": "HotelRecommendation"},
-            {"query": "I'm traveling for business, what hotels do you recommend?", "expected": "HotelRecommendation"},
-            {"query": "Best romantic hotels for couples", "expected": "HotelRecommendation"},
-            {"query": "Top rated hotels for group travel", "expected": "HotelRecommendation"},
-            {"query": "Where should a couple stay?", "expected": "HotelRecommendation"},
-            {"query": "Recommend me hotels for a family vacation", "expected": "HotelRecommendation"},
-            {"query": "Best hotels for couples in Paris", "expected": "HotelRecommendation"},
-            {"query": "Top family-friendly hotels in Tokyo", "expected": "HotelRecommendation"},
-            {"query": "Recommend business hotels in London with high ratings", "expected": "HotelRecommendation"},
-            {"query": "What's the best hotel for a romantic getaway?", "expected": "HotelRecommendation"},
-            {"query": "I need a hotel recommendation for families", "expected": "HotelRecommendation"},
-            {"query": "Suggest a hotel for my business trip", "expected": "HotelRecommendation"},
-            {"query": "Where do couples usually stay?", "expected": "HotelRecommendation"},
-            {"query": "Recommend hotels for solo travelers", "expected": "HotelRecommendation"},
-            
-            # ========== ReviewLookup (20 test cases) ==========
-            {"query": "Show me reviews for The Azure Tower", "expected": "ReviewLookup"},
-            {"query": "What are the reviews for The Royal Compass?", "expected": "ReviewLookup"},
-            {"query": "Reviews for L'Étoile Palace", "expected": "ReviewLookup"},
-            {"query": "Tell me about reviews for The Golden Oasis", "expected": "ReviewLookup"},
-            {"query": "I want to see reviews for Marina Bay Zenith", "expected": "ReviewLookup"},
-            {"query": "Show reviews for Copacabana Lux", "expected": "ReviewLookup"},
-            {"query": "What do people say about The Maple Grove?", "expected": "ReviewLookup"},
-            {"query": "Reviews for Nile Grandeur", "expected": "ReviewLookup"},
-            {"query": "Find reviews for The Bosphorus Inn", "expected": "ReviewLookup"},
-            {"query": "Show me hotel reviews", "expected": "ReviewLookup"},
-            {"query": "What do guests say about this hotel?", "expected": "ReviewLookup"},
-            {"query": "I want to read customer feedback", "expected": "ReviewLookup"},
-            {"query": "Can I see guest reviews?", "expected": "ReviewLookup"},
-            {"query": "What's the feedback for hotels in Paris?", "expected": "ReviewLookup"},
-            {"query": "What are guests saying about The Orchid Palace?", "expected": "ReviewLookup"},
-            {"query": "Customer reviews for Gaudi's Retreat", "expected": "ReviewLookup"},
-            {"query": "Tell me what people think about Canal House Grand", "expected": "ReviewLookup"},
-            {"query": "Any feedback on The Kiwi Grand?", "expected": "ReviewLookup"},
-            {"query": "reviews for The Azur Tower", "expected": "ReviewLookup"},
-            {"query": "show me reveiws for hotels", "expected": "ReviewLookup"},
-            
-            # ========== LocationQuery (15 test cases) ==========
-            {"query": "Hotels with best location scores", "expected": "LocationQuery"},
-            {"query": "Which hotels have the best location?", "expected": "LocationQuery"},
-            {"query": "Find hotels with excellent location", "expected": "LocationQuery"},
-            {"query": "Show me hotels with good location ratings", "expected": "LocationQuery"},
-            {"query": "I need hotels with high location scores", "expected": "LocationQuery"},
-            {"query": "Hotels in the best locations", "expected": "LocationQuery"},
-            {"query": "Which hotel has the highest location score?", "expected": "LocationQuery"},
-            {"query": "Hotels with best location in London", "expected": "LocationQuery"},
-            {"query": "Find hotels with great location in Paris", "expected": "LocationQuery"},
-            {"query": "Best located hotels in Tokyo", "expected": "LocationQuery"},
-            {"query": "Hotels with top location scores in Dubai", "expected": "LocationQuery"},
-            {"query": "Where are the best located hotels?", "expected": "LocationQuery"},
-            {"query": "I want a hotel in a prime location", "expected": "LocationQuery"},
-            {"query": "Hotels with convenient locations", "expected": "LocationQuery"},
-            {"query": "Show me centrally located hotels", "expected": "LocationQuery"},
-            
-            # ========== VisaQuestion (20 test cases) ==========
-            {"query": "Do I need a visa from USA to France?", "expected": "VisaQuestion"},
-            {"query": "Visa requirements from United Kingdom to Japan", "expected": "VisaQuestion"},
-            {"query": "Is a visa required from Germany to Egypt?", "expected": "VisaQuestion"},
-            {"query": "Do I need visa to travel from China to United States?", "expected": "VisaQuestion"},
-            {"query": "Visa requirements from India to United Kingdom", "expected": "VisaQuestion"},
-            {"query": "Check visa from Canada to Australia", "expected": "VisaQuestion"},
-            {"query": "Do citizens of Brazil need visa for Singapore?", "expected": "VisaQuestion"},
-            {"query": "Is visa needed from Russia to France?", "expected": "VisaQuestion"},
-            {"query": "Visa requirements from Egypt to Germany", "expected": "VisaQuestion"},
-            {"query": "Do I need a visa from South Africa to Italy?", "expected": "VisaQuestion"},
-            {"query": "Can I travel from USA to Japan without a visa?", "expected": "VisaQuestion"},
-            {"query": "What are the visa requirements from Mexico to Spain?", "expected": "VisaQuestion"},
-            {"query": "I'm from Thailand, do I need visa for United Arab Emirates?", "expected": "VisaQuestion"},
-            {"query": "Traveling from South Korea to Canada, need visa?", "expected": "VisaQuestion"},
-            {"query": "Check if I need travel documents from Australia to United Kingdom", "expected": "VisaQuestion"},
-            {"query": "Do I need a passport visa from France to Italy?", "expected": "VisaQuestion"},
-            {"query": "Travel document requirements from United States to Mexico", "expected": "VisaQuestion"},
-            {"query": "visa requiremnts from USA to UK", "expected": "VisaQuestion"},
-            {"query": "do i need viza from Germany to Spain", "expected": "VisaQuestion"},
-            {"query": "visa from Fance to Japan", "expected": "VisaQuestion"},
-            
-            # ========== AmenityFilter (25 test cases) ==========
-            {"query": "Hotels with high cleanliness", "expected": "AmenityFilter"},
-            {"query": "Find hotels with cleanliness score above 9", "expected": "AmenityFilter"},
-            {"query": "I need hotels with excellent cleanliness", "expected": "AmenityFilter"},
-            {"query": "Show me the cleanest hotels", "expected": "AmenityFilter"},
-            {"query": "Hotels known for cleanliness", "expected": "AmenityFilter"},
-            {"query": "Find hotels with high cleanliness scores", "expected": "AmenityFilter"},
-            {"query": "Hotels with high comfort score", "expected": "AmenityFilter"},
-            {"query": "Find comfortable hotels", "expected": "AmenityFilter"},
-            {"query": "I want hotels with excellent comfort", "expected": "AmenityFilter"},
-            {"query": "Show me hotels with good comfort ratings", "expected": "AmenityFilter"},
-            {"query": "Most comfortable hotels available", "expected": "AmenityFilter"},
-            {"query": "Good value for money", "expected": "AmenityFilter"},
-            {"query": "Hotels with best value for money", "expected": "AmenityFilter"},
-            {"query": "I need hotels with high value", "expected": "AmenityFilter"},
-            {"query": "Find hotels with great value for money scores", "expected": "AmenityFilter"},
-            {"query": "Best value hotels", "expected": "AmenityFilter"},
-            {"query": "Hotels with excellent value for money", "expected": "AmenityFilter"},
-            {"query": "Hotels with excellent staff", "expected": "AmenityFilter"},
-            {"query": "Find hotels with great staff service", "expected": "AmenityFilter"},
-            {"query": "I need hotels with high staff scores", "expected": "AmenityFilter"},
-            {"query": "Show me hotels with friendly staff", "expected": "AmenityFilter"},
-            {"query": "Hotels with best staff ratings", "expected": "AmenityFilter"},
-            {"query": "Hotels with high cleanliness and comfort", "expected": "AmenityFilter"},
-            {"query": "Find hotels with good value and excellent staff", "expected": "AmenityFilter"},
-            {"query": "I need clean hotels with comfortable rooms", "expected": "AmenityFilter"},
-            {"query": "Show me hotels with great cleanliness and staff scores", "expected": "AmenityFilter"},
+    # Rate-limit errors propagate out of the classifier so _classify_chunk can retry them
+    _is_rate_limit_error = staticmethod(IntentClassifier.is_rate_limit_error)
+    
+    def _retry_delay(self, error, attempt):
+        """
+        Seconds to wait before retrying a rate-limited call
+        
+        Uses the provider's retry-after header when the error carries one,
+        otherwise exponential backoff with jitter.
+        
+        Args:
+            error: Rate-limit exception raised by the LLM client
+            attempt: Zero-based retry attempt
             
-            # ========== CasualConversation (15 test cases) ==========
-            {"query": "Hi", "expected": "CasualConversation"},
-            {"query": "Hello", "expected": "CasualConversation"},
-            {"query": "Hey there", "expected": "CasualConversation"},
-            {"query": "Good morning", "expected": "CasualConversation"},
-            {"query": "Thanks", "expected": "CasualConversation"},
-            {"query": "Thank you", "expected": "CasualConversation"},
-            {"query": "Thanks a lot", "expected": "CasualConversation"},
-            {"query": "Help", "expected": "CasualConversation"},
-            {"query": "What can you do?", "expected": "CasualConversation"},
-            {"query": "How can you help me?", "expected": "CasualConversation"},
-            {"query": "What are your capabilities?", "expected": "CasualConversation"},
-            {"query": "Bye", "expected": "CasualConversation"},
-            {"query": "Goodbye", "expected": "CasualConversation"},
-            {"query": "See you later", "expected": "CasualConversation"},
-            {"query": "Have a nice day", "expected": "CasualConversation"},
+        Returns:
+            Delay in seconds
+        """
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            delay = self.RETRY_BASE_DELAY * (2 ** attempt)
+            return delay + random.uniform(0, delay)
+    
+    @staticmethod
+    def _normalize_query(query):
+        """Cache key for a query: lowercased with whitespace collapsed"""
+        return " ".join(query.lower().split())
+    
+    def _cache_name(self):
+        """Shelve file name for the current cache version, model and classifier prompt"""
+        payload = json.dumps([self.CLASSIFY_CACHE_VERSION, self.classifier.llm_client.model, self.classifier.SYSTEM_PROMPT])
+        return "intents-" + hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+    
+    def _open_cache(self):
+        """Open the on-disk classification cache (no-op if disabled or already open)"""
+        if not self.use_cache or self._cache is not None:
+            return
+        try:
+            self.CLASSIFY_CACHE_DIR.mkdir(exist_ok=True)
+            self._cache = shelve.open(str(self.CLASSIFY_CACHE_DIR / self._cache_name()))
+        except Exception as e:
+            print(f"⚠️ Warning: Could not open classification cache: {e}")
+            self._cache = None
+    
+    def _close_cache(self):
+        """Write out and close the on-disk classification cache"""
+        if self._cache is not None:
+            with self._cache_lock:
+                self._cache.close()
+                self._cache = None
+    
+    def _cached_intent(self, query):
+        """Look up a previously recorded prediction for query (None on miss)"""
+        if self._cache is None:
+            return None
+        with self._cache_lock:
+            return self._cache.get(self._normalize_query(query))
+    
+    def _classify_chunk(self, indices):
+        """
+        Classify a chunk of test queries (executed on a worker thread)
+        
+        Cached intents are returned without an API call or rate-limit wait;
+        the remaining queries go out in a single batched request. Only intents
+        the LLM actually returned are cached; failed calls are recorded as
+        FALLBACK_INTENT for this run and retried on the next one.
+        Rate-limit errors are retried with exponential backoff and jitter;
+        any other error, or exhausting the retries, propagates to run_tests.
+        
+        Args:
+            indices: Test case indices
             
-            # ========== GeneralQuestionAnswering (10 test cases) ==========
-            {"query": "Tell me about The Azure Tower", "expected": "GeneralQuestionAnswering"},
-            {"query": "What do you know about hotels in general?", "expected": "GeneralQuestionAnswering"},
-            {"query": "Give me information about The Royal Compass", "expected": "GeneralQuestionAnswering"},
-            {"query": "Describe The Golden Oasis", "expected": "GeneralQuestionAnswering"},
-            {"query": "What are the facilities at Marina Bay Zenith?", "expected": "GeneralQuestionAnswering"},
-            {"query": "Tell me everything about Copacabana Lux", "expected": "GeneralQuestionAnswering"},
-            {"query": "Information about The Maple Grove hotel", "expected": "GeneralQuestionAnswering"},
-            {"query": "What can you tell me about Nile Grandeur?", "expected": "GeneralQuestionAnswering"},
-            {"query": "Details about The Bosphorus Inn", "expected": "GeneralQuestionAnswering"},
-            {"query": "I want comprehensive information about The Orchid Palace", "expected": "GeneralQuestionAnswering"},
-        ]
+        Returns:
+            List of (index, predicted_intent, from_cache) tuples
+        """
+        outcomes = []
+        misses = []
+        for i in indices:
+            cached = self._cached_intent(self.queries[i])
+            if cached is not None:
+                outcomes.append((i, cached, True))
+            else:
+                misses.append(i)
+        if not misses:
+            return outcomes
+        
+        queries = [self.queries[i] for i in misses]
+        for attempt in range(self.MAX_RETRIES + 1):
+            self.rate_limiter.acquire()
+            try:
+                if len(queries) == 1:
+                    predictions = [self.classifier.classify(queries[0], fallback=None)]
+                else:
+                    predictions = self.classifier.classify_batch(queries, fallback=None)
+                break
+            except Exception as e:
+                if not self._is_rate_limit_error(e) or attempt == self.MAX_RETRIES:
+                    raise
+                # Pause every worker, not just this one, so the quota can recover
+                self.rate_limiter.backoff(self._retry_delay(e, attempt))
+        
+        if self._cache is not None:
+            with self._cache_lock:
+                for query, predicted in zip(queries, predictions):
+                    if predicted is not None:
+                        self._cache[self._normalize_query(query)] = predicted
+        outcomes.extend((i, predicted or self.FALLBACK_INTENT, False) for i, predicted in zip(misses, predictions))
+        return outcomes
+    
+    def _build_test_cases(self):
+        """
+        Load the shared intent test cases covering all intents with multiple variations
+        
+        Returns:
+            Tuple of (queries, expected_intents) as parallel tuples
+        """
+        cases = load_intent_test_cases()
+        
+        # Interned so comparisons against INTENTS constants are usually pointer checks
+        queries = tuple(sys.intern(case["query"]) for case in cases)
+        expected = tuple(sys.intern(case["expected"]) for case in cases)
+        return queries, expected
     
     def run_tests(self, verbose=False, resume=True):
         """
         Run all test cases and calculate accuracy metrics
         
         Args:
-            verbose: If True, print detailed results for each test case (to file)
+            verbose: If True, print detailed results for each test case
             resume: If True, resume from checkpoint if available
         
         Returns:
             dict: Test results with accuracy metrics
         """
         # Try to load checkpoint
-        start_index = 0
-        
-        if resume:
-            checkpoint = self._load_checkpoint()
-            if checkpoint:
-                start_index = checkpoint["last_completed_index"] + 1
-                results = checkpoint["results"]
-                print("=" * 80)
-                print("📁 RESUMING FROM CHECKPOINT")
-                print("=" * 80)
-                print(f"Resuming from test case #{start_index + 1}/{len(self.test_cases)}")
-                print(f"Completed so far: {start_index}/{len(self.test_cases)}")
-                print(f"Current accuracy: {results.get('accuracy', 0):.2f}%")
-                print("=" * 80)
-                print()
-            else:
-                results = {
-                    "total": len(self.test_cases),
-                    "correct": 0,
-                    "incorrect": 0,
-                    "by_intent": {},
-                    "failures": []
-                }
-                
-                # Initialize per-intent tracking
-                for intent in self.classifier.INTENTS:
-                    results["by_intent"][intent] = {
-                        "total": 0,
-                        "correct": 0,
-                        "incorrect": 0,
-                        "accuracy": 0.0
-                    }
+        completed = set()
+        checkpoint = self._load_checkpoint() if resume else None
+        
+        if checkpoint:
+            completed = checkpoint["completed_indices"]
+            results = checkpoint["results"]
+            print("=" * 80)
+            print("📁 RESUMING FROM CHECKPOINT")
+            print("=" * 80)
+            print(f"Completed so far: {len(completed)}/{len(self.queries)}")
+            print(f"Current accuracy: {results['accuracy']:.2f}%")
+            print("=" * 80)
+            print()
         else:
-            results = {
-                "total": len(self.test_cases),
-                "correct": 0,
-                "incorrect": 0,
-                "by_intent": {},
-                "failures": []
-            }
-            
-            # Initialize per-intent tracking
-            for intent in self.classifier.INTENTS:
-                results["by_intent"][intent] = {
-                    "total": 0,
-                    "correct": 0,
-                    "incorrect": 0,
-                    "accuracy": 0.0
-                }
-        
-        if start_index == 0:
+            # Fresh start - the log is append-only, so drop any previous run
+            self._delete_checkpoint()
+            results = self._new_results()
+        
+        if not completed:
             print("=" * 80)
             print("OLD INTENT CLASSIFIER (LLM-ONLY) QUANTITATIVE TEST")
             print("=" * 80)
             print(f"Total test cases: {results['total']}")
+            print(f"Workers: {self.max_workers} | Rate limit: {self.rate_limiter.max_calls or 'none'} requests/minute")
             print("=" * 80)
             print()
         
-        # Run each test case
+        pending = [i for i in range(len(self.queries)) if i not in completed]
+        
+        # Run test cases concurrently; results are tallied on this thread as they complete
+        self._open_cache()
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
         try:
-            for i in range(start_index, len(self.test_cases)):
-                test_case = self.test_cases[i]
-                query = test_case["query"]
-                expected = test_case["expected"]
-                
-                # Print progress to console (always visible)
-                query_display = query if len(query) <= 50 else query[:50] + "..."
-                progress_msg = f"[{i+1}/{len(self.test_cases)}] Testing: \"{query_display}\""
-                print(progress_msg, flush=True)
-                
-                # Classify query
+            # Pattern-matched cases need no LLM call; resolve them here instead of on a worker
+            fast_outcomes = []
+            llm_pending = []
+            for i in pending:
+                intent = self.classifier.classify_fast_path(self.queries[i]) if self.classifier.fast_path else None
+                if intent:
+                    fast_outcomes.append((i, intent, False))
+                else:
+                    llm_pending.append(i)
+            
+            # Cached cases resolve on their own; the rest share one LLM request per chunk
+            uncached = [i for i in llm_pending if self._cached_intent(self.queries[i]) is None]
+            uncached_set = set(uncached)
+            chunks = [[i] for i in llm_pending if i not in uncached_set]
+            chunks += [uncached[n:n + self.batch_size] for n in range(0, len(uncached), self.batch_size)]
+            futures = [pool.submit(self._classify_chunk, chunk) for chunk in chunks]
+            
+            # Tallied first while the LLM requests are in flight
+            if fast_outcomes:
+                fast_future = Future()
+                fast_future.set_result(fast_outcomes)
+                futures.insert(0, fast_future)
+            
+            # Hot-loop locals (avoid repeated attribute lookups per case)
+            queries, expected_intents = self.queries, self.expected
+            num_cases = len(queries)
+            tally, save_checkpoint = self._tally, self._save_checkpoint
+            
+            for future in as_completed(futures):
                 try:
-                    predicted = self.classifier.classify(query)
+                    outcomes = future.result()
                 except Exception as e:
-                    error_msg = str(e).lower()
-                    # Check if it's a rate limit error
-                    if 'rate_limit' in error_msg or 'rate limit' in error_msg or '429' in error_msg:
-                        print(f"\n⚠️  RATE LIMIT REACHED")
-                        print(f"   Checkpoint saved at test case {i}/{len(self.test_cases)}")
-                        print(f"   Current accuracy: {(results['correct'] / max(i, 1)) * 100:.2f}%")
+                    if self._is_rate_limit_error(e):
+                        print(f"\n⚠️  RATE LIMIT REACHED (retries exhausted)")
+                        print(f"   Completed: {len(completed)}/{num_cases} test cases")
+                        print(f"   Current accuracy: {(results['correct'] / max(len(completed), 1)) * 100:.2f}%")
                         print(f"   Run the script again to resume from this point")
-                        self._save_checkpoint(results, i - 1)  # Save at previous index to retry this one
                         raise Exception("Rate limit reached. Please wait and run again to resume.")
-                    else:
-                        # For other errors, re-raise
-                        raise
-                
-                # Check if correct
-                is_correct = (predicted == expected)
-                
-                # Update results
-                if is_correct:
-                    results["correct"] += 1
-                    results["by_intent"][expected]["correct"] += 1
-                else:
-                    results["incorrect"] += 1
-                    results["by_intent"][expected]["incorrect"] += 1
-                    results["failures"].append({
-                        "query": query,
-                        "expected": expected,
-                        "predicted": predicted
-                    })
-                
-                results["by_intent"][expected]["total"] += 1
+                    # For other errors, re-raise
+                    raise
                 
-                # Calculate current accuracy
-                current_accuracy = (results["correct"] / (i + 1)) * 100
-                
-                # Print result to console
-                status = "✅ PASS" if is_correct else "❌ FAIL"
-                console_msg = f"  Result: {status} | Expected: {expected} | Predicted: {predicted} | Accuracy: {current_accuracy:.1f}%"
-                print(console_msg, flush=True)
-                
-                # Print if verbose or incorrect (to file)
-                if verbose or not is_correct:
-                    status = "✅ PASS" if is_correct else "❌ FAIL"
-                    print(f"[{i+1}/{results['total']}] {status}")
-                    print(f"  Query: \"{query}\"")
-                    print(f"  Expected: {expected}")
-                    print(f"  Predicted: {predicted}")
-                    if not is_correct:
-                        print(f"  ⚠️  MISMATCH")
-                    print()
-                
-                # Save checkpoint after each test
-                results["accuracy"] = current_accuracy
-                self._save_checkpoint(results, i)
-                
-                # Wait 10 seconds between LLM calls to avoid API quota limits
-                if i < len(self.test_cases) - 1:
-                    print(f"  ⏳ Waiting 15 seconds...", flush=True)
-                    time.sleep(15)
-                print()
+                for i, predicted, from_cache in outcomes:
+                    query = queries[i]
+                    expected = expected_intents[i]
+                    
+                    # Check if correct and update results
+                    is_correct = tally(results, i, predicted)
+                    completed.add(i)
+                    
+                    # Calculate current accuracy
+                    current_accuracy = (results["correct"] / len(completed)) * 100
+                    
+                    # Print result to console
+                    query_display = query if len(query) <= 50 else query[:50] + "..."
+                    status = self.PASS if is_correct else self.FAIL
+                    cache_note = " (cached)" if from_cache else ""
+                    lines = [
+                        f"[{len(completed)}/{num_cases}] Testing: \"{query_display}\"{cache_note}",
+                        f"  Result: {status} | Expected: {expected} | Predicted: {predicted} | Accuracy: {current_accuracy:.1f}%"
+                    ]
+                    
+                    # Detail block if verbose or incorrect
+                    if verbose or not is_correct:
+                        lines.append(f"[{i+1}/{num_cases}] {status}")
+                        lines.append(f"  Query: \"{query}\"")
+                        lines.append(f"  Expected: {expected}")
+                        lines.append(f"  Predicted: {predicted}")
+                        if not is_correct:
+                            lines.append(f"  ⚠️  MISMATCH")
+                        lines.append("")
+                    
+                    # One write per case instead of one per line
+                    print("\n".join(lines), flush=True)
+                    
+                    # Record outcome in the checkpoint log
+                    results["accuracy"] = current_accuracy
+                    save_checkpoint(i, predicted)
+            
+            # Keep failures in test-case order regardless of completion order
+            results["failures"].sort(key=lambda failure: failure.get("index", 0))
             
             # Calculate per-intent accuracy
-            for intent in results["by_intent"]:
-                intent_data = results["by_intent"][intent]
-                if intent_data["total"] > 0:
-                    intent_data["accuracy"] = (intent_data["correct"] / intent_data["total"]) * 100
+            self._summarize_by_intent(results)
             
             # Calculate overall accuracy
             results["accuracy"] = (results["correct"] / results["total"]) * 100
@@ -403,40 +499,54 @@ class IntentClassifierTester:
             self._delete_checkpoint()
             
         except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
             print("\n" + "=" * 80)
             print("⚠️  TEST INTERRUPTED BY USER")
             print("=" * 80)
-            print(f"Completed: {i}/{len(self.test_cases)} test cases")
-            print(f"Current accuracy: {(results['correct'] / max(i, 1)) * 100:.2f}%")
+            print(f"Completed: {len(completed)}/{len(self.queries)} test cases")
+            print(f"Current accuracy: {(results['correct'] / max(len(completed), 1)) * 100:.2f}%")
             print("\nCheckpoint saved. Run again to resume from this point.")
             print("=" * 80)
             raise
         except Exception as e:
+            pool.shutdown(wait=False, cancel_futures=True)
             print(f"\n⚠️  ERROR: {e}")
-            print(f"Checkpoint saved at test case {i}")
+            print(f"Checkpoint saved after {len(completed)} test cases")
             raise
+        finally:
+            pool.shutdown(wait=True)
+            self._close_checkpoint()
+            self._close_cache()
         
         return results
     
-    def print_results(self, results):
-        """Print comprehensive test results with accuracy metrics"""
-        print()
-        print("=" * 80)
-        print("TEST RESULTS SUMMARY - OLD CLASSIFIER (LLM-ONLY)")
-        print("=" * 80)
-        print()
+    def print_results(self, results, out=None):
+        """
+        Print comprehensive test results with accuracy metrics (assembled in memory, written once)
+        
+        Args:
+            results: Results dict returned by run_tests
+            out: Text stream to write to (defaults to sys.stdout)
+        """
+        lines = []
+        
+        lines.append("")
+        lines.append("=" * 80)
+        lines.append("TEST RESULTS SUMMARY - OLD CLASSIFIER (LLM-ONLY)")
+        lines.append("=" * 80)
+        lines.append("")
         
         # Overall accuracy
-        print(f"📊 OVERALL ACCURACY: {results['accuracy']:.2f}%")
-        print(f"   ✅ Correct: {results['correct']}/{results['total']}")
-        print(f"   ❌ Incorrect: {results['incorrect']}/{results['total']}")
-        print()
+        lines.append(f"📊 OVERALL ACCURACY: {results['accuracy']:.2f}%")
+        lines.append(f"   ✅ Correct: {results['correct']}/{results['total']}")
+        lines.append(f"   ❌ Incorrect: {results['incorrect']}/{results['total']}")
+        lines.append("")
         
         # Per-intent accuracy
-        print("=" * 80)
-        print("ACCURACY BY INTENT")
-        print("=" * 80)
-        print()
+        lines.append("=" * 80)
+        lines.append("ACCURACY BY INTENT")
+        lines.append("=" * 80)
+        lines.append("")
         
         sorted_intents = sorted(
             results["by_intent"].items(),
@@ -447,29 +557,30 @@ class IntentClassifierTester:
         for intent, data in sorted_intents:
             if data["total"] > 0:
                 accuracy_bar = "█" * int(data["accuracy"] / 5) + "░" * (20 - int(data["accuracy"] / 5))
-                print(f"{intent:30s} {accuracy_bar} {data['accuracy']:6.2f}%")
-                print(f"{'':30s} ({data['correct']}/{data['total']} correct)")
-                print()
+                lines.append(f"{intent:30s} {accuracy_bar} {data['accuracy']:6.2f}%")
+                lines.append(f"{'':30s} ({data['correct']}/{data['total']} correct)")
+                lines.append("")
         
         # Failures
         if results["failures"]:
-            print("=" * 80)
-            print("FAILED TEST CASES")
-            print("=" * 80)
-            print()
+            lines.append("=" * 80)
+            lines.append("FAILED TEST CASES")
+            lines.append("=" * 80)
+            lines.append("")
             
             for i, failure in enumerate(results["failures"], 1):
-                print(f"❌ Failure #{i}")
-                print(f"   Query: \"{failure['query']}\"")
-                print(f"   Expected: {failure['expected']}")
-                print(f"   Predicted: {failure['predicted']}")
-                print()
+                lines.append(f"❌ Failure #{i}")
+                lines.append(f"   Query: \"{failure['query']}\"")
+                lines.append(f"   Expected: {failure['expected']}")
+                lines.append(f"   Predicted: {failure['predicted']}")
+                lines.append("")
         else:
-            print("=" * 80)
-            print("🎉 ALL TESTS PASSED!")
-            print("=" * 80)
-            print()
-
+            lines.append("=" * 80)
+            lines.append("🎉 ALL TESTS PASSED!")
+            lines.append("=" * 80)
+            lines.append("")
+        
+        print("\n".join(lines), file=out or sys.stdout)
 
 def main():
     """Main entry point for quantitative testing"""
@@ -492,6 +603,37 @@ def main():
         action="store_true",
         help="Start from beginning, ignore checkpoint"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of concurrent classification workers (default: 8)"
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        default=None,
+        help="Maximum LLM requests started per minute; 0 disables rate limiting "
+             f"(default: {IntentClassifierTester.DEFAULT_REQUESTS_PER_MINUTE})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the on-disk classification cache and query the LLM for every case"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Queries per batched LLM request; 1 disables batching "
+             f"(default: {IntentClassifier.BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--fast-path",
+        action="store_true",
+        help="Answer unambiguous queries with the regex fast path instead of the LLM "
+             "(default: off, so results measure the LLM-only classifier)"
+    )
     
     args = parser.parse_args()
     
@@ -501,27 +643,19 @@ def main():
     checkpoint_exists = checkpoint_path.exists()
     mode = 'a' if (resume and checkpoint_exists) else 'w'
     
-    original_stdout = sys.stdout
-    
-    try:
-        with open(args.output, mode, encoding='utf-8') as f:
-            # Redirect detailed output to file, keep progress on console
-            sys.stdout = f
-            
-            # Create tester and run tests
-            tester = IntentClassifierTester()
-            
-            # Restore stdout temporarily for test execution (console progress)
-            sys.stdout = original_stdout
-            results = tester.run_tests(verbose=args.verbose, resume=resume)
-            
-            # Redirect back to file for results
-            sys.stdout = f
-            tester.print_results(results)
+    # Create tester and run tests (progress goes to the console)
+    tester = IntentClassifierTester(
+        max_workers=args.workers,
+        requests_per_minute=args.rpm,
+        use_cache=not args.no_cache,
+        batch_size=args.batch_size,
+        fast_path=args.fast_path
+    )
+    results = tester.run_tests(verbose=args.verbose, resume=resume)
     
-    finally:
-        # Restore stdout
-        sys.stdout = original_stdout
+    # Write the summary to the results file in one buffered write
+    with open(args.output, mode, encoding='utf-8', buffering=1 << 16) as f:
+        tester.print_results(results, out=f)
     
     # Print completion message to console
     print("\n" + "=" * 80)
@@ -1,11 +1,115 @@
 import sys
+import gc
+import time
+import random
+import argparse
+import statistics
 from pathlib import Path
 parent_dir = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(parent_dir))
 
 from components.entity_extractor import EntityExtractor
 
-extractor = EntityExtractor(debug=True)
-print("Testing typo validation...")
-result = extractor._find_closest_match_with_llm('Paaris', extractor.VALID_CITIES, 'city')
-print(f'\n\nFinal Result: {result}')
+# Hand-picked misspellings; the benchmark set is padded with seeded random edits
+TYPOS = [
+    "Paaris", "Londn", "Toyko", "Dubaii", "Singapor", "Sydny", "Berln", "Torontoo",
+    "Shangai", "Mumbay", "Rom", "Capetown", "Seol", "Moskow", "Kairo", "Barcelonna",
+    "Bangkock", "Istambul", "Amsterdm", "Wellingtn",
+]
+BENCHMARK_SIZE = 100
+
+
+def build_benchmark_queries(valid_options, size=BENCHMARK_SIZE, seed=0):
+    """
+    Build a reproducible typo set of at least `size` queries
+
+    Args:
+        valid_options: Correct spellings to derive extra typos from
+        size: Minimum number of queries
+        seed: Random seed for the generated edits
+
+    Returns:
+        List of misspelled queries
+    """
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    queries = list(TYPOS)
+    while len(queries) < size:
+        word = list(rng.choice(valid_options))
+        pos = rng.randrange(len(word))
+        edit = rng.choice(("delete", "insert", "replace", "swap"))
+        if edit == "delete" and len(word) > 3:
+            del word[pos]
+        elif edit == "insert":
+            word.insert(pos, rng.choice(letters))
+        elif edit == "swap" and pos < len(word) - 1:
+            word[pos], word[pos + 1] = word[pos + 1], word[pos]
+        else:
+            word[pos] = rng.choice(letters)
+        queries.append("".join(word))
+    return queries
+
+
+def benchmark(extractor, queries, valid_options, entity_type):
+    """
+    Time _find_closest_match_with_llm per query with perf_counter_ns
+
+    Args:
+        extractor: EntityExtractor instance
+        queries: Misspelled inputs
+        valid_options: Candidate list passed to the matcher
+        entity_type: Entity type label for the LLM prompt
+
+    Returns:
+        List of per-call durations in nanoseconds
+    """
+    times = []
+    find = extractor._find_closest_match_with_llm
+    perf_counter_ns = time.perf_counter_ns
+
+    # Keep collector pauses out of the measurements
+    gc.collect()
+    gc.disable()
+    try:
+        for query in queries:
+            t0 = perf_counter_ns()
+            find(query, valid_options, entity_type)
+            times.append(perf_counter_ns() - t0)
+    finally:
+        gc.enable()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Typo validation debug run and fuzzy-match benchmark")
+    parser.add_argument("--with-llm", action="store_true",
+                        help="Include LLM typo validation in the timed calls (default: time candidate matching only)")
+    parser.add_argument("--size", type=int, default=BENCHMARK_SIZE,
+                        help=f"Number of benchmark queries (default: {BENCHMARK_SIZE})")
+    args = parser.parse_args()
+
+    extractor = EntityExtractor(debug=True)
+    print("Testing typo validation...")
+    result = extractor._find_closest_match_with_llm('Paaris', extractor.VALID_CITIES, 'city')
+    print(f'\n\nFinal Result: {result}')
+
+    queries = build_benchmark_queries(extractor.VALID_CITIES, size=args.size)
+    extractor.debug = False
+    if not args.with_llm:
+        # Accept every suggestion so only the candidate-ranking path is measured
+        extractor._validate_typo_with_llm = lambda user_input, suggestion, entity_type: suggestion
+
+    times = benchmark(extractor, queries, extractor.VALID_CITIES, 'city')
+    percentiles = statistics.quantiles(times, n=100)
+
+    print("\n" + "=" * 80)
+    print(f"FUZZY MATCH BENCHMARK ({len(times)} queries, LLM validation {'on' if args.with_llm else 'off'})")
+    print("=" * 80)
+    print(f"p50:  {percentiles[49] / 1000:10.1f} µs")
+    print(f"p99:  {percentiles[98] / 1000:10.1f} µs")
+    print(f"max:  {max(times) / 1000:10.1f} µs")
+    print(f"total: {sum(times) / 1e6:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ Handles multi-turn conversations using LangGraph's native memory
 
 import sys
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator, Tuple
 import uuid
 
 # Add M3 to path
@@ -14,6 +14,14 @@ sys.path.insert(0, str(Path(__file__).parent))
 from langgraph.checkpoint.memory import MemorySaver
 from workflows.workflow_factory import get_workflow_with_memory, get_workflow, list_workflows
 from utils.config_loader import ConfigLoader
+from components.conversation_summarizer import ConversationSummarizer
+from utils.llm_client import get_llm_client
+
+try:
+    from langgraph.config import get_stream_writer
+except ImportError:
+    # Older langgraph has no custom stream mode; chat_stream then streams node updates only
+    get_stream_writer = None
 
 
 class HotelChatbot:
@@ -22,10 +30,16 @@ class HotelChatbot:
     Uses MemorySaver for persistent conversation state
     """
     
+    # Turns (user + assistant message pairs) handed to the workflow each turn;
+    # no node reads further back than 3 turns
+    DEFAULT_HISTORY_WINDOW = 6
+    
     def __init__(
         self,
         workflow_mode: str = "conversational_hybrid",  # Changed default!
-        thread_id: Optional[str] = None
+        thread_id: Optional[str] = None,
+        history_window: int = DEFAULT_HISTORY_WINDOW,
+        summarize_history: bool = False
     ):
         """
         Initialize chatbot with LangGraph memory
@@ -33,10 +47,19 @@ class HotelChatbot:
         Args:
             workflow_mode: Workflow to use (baseline_only, embedding_only, hybrid, conversational_hybrid, llm_pipeline)
             thread_id: Conversation thread ID (generates new if None)
+            history_window: Most recent turns passed to the workflow (full history is kept for export)
+            summarize_history: Fold turns older than the window into a rolling summary
+                message passed ahead of the window (one extra LLM call per evicted turn)
         """
         self.config = ConfigLoader()
         self.workflow_mode = workflow_mode
         self.thread_id = thread_id or str(uuid.uuid4())
+        self.history_window = history_window
+        
+        # Rolling summary of turns older than the window (opt-in)
+        self.summarizer = ConversationSummarizer(llm_client=get_llm_client()) if summarize_history else None
+        self.history_summary: Optional[str] = None
+        self._summarized_count = 0  # Messages already folded into history_summary
         
         # LangGraph memory saver
         self.memory = MemorySaver()
@@ -46,6 +69,7 @@ class HotelChatbot:
         
         # Track conversation locally for quick access
         self.message_history: List[Dict[str, Any]] = []
+        self.last_response: Optional[Dict[str, Any]] = None
         
         print(f"✓ Chatbot initialized with workflow: {workflow_mode}")
         print(f"✓ Thread ID: {self.thread_id}")
@@ -68,70 +92,163 @@ class HotelChatbot:
         
         # Execute workflow with LangGraph memory (query rewriting handled inside workflow)
         try:
-            initial_state = {
-                "user_query": user_query,
-                "intent": None,
-                "entities": {},
-                "baseline_results": [],
-                "embedding_results": [],
-                "llm_query_results": [],
-                "merged_context": "",
-                "llm_response": "",
-                "chat_history": self.message_history.copy(),
-                "error": None,
-                "metadata": {}
-            }
-            
-            # LangGraph config with thread_id for memory
-            config = {
-                "configurable": {
-                    "thread_id": self.thread_id
-                }
-            }
+            initial_state, config = self._prepare_turn(user_query)
             
             # Invoke workflow with memory checkpointing
             result = self.workflow.invoke(initial_state, config)
             
-            # Step 3: Extract results and format response
-            response = self._format_response(result, user_query)
+            return self._finish_turn(user_query, result)
             
-            # Step 4: Update local message history
-            self.message_history.append({
-                "role": "user",
-                "content": user_query,
-                "metadata": {
-                    "intent": result.get("intent"),
-                    "entities": result.get("entities", {}),
-                    "workflow": self.workflow_mode,
-                    "query_rewritten": result.get("metadata", {}).get("query_rewritten", False)
-                }
-            })
-            
-            self.message_history.append({
-                "role": "assistant",
-                "content": response["answer"],
-                "metadata": {
-                    "workflow": self.workflow_mode,
-                    "result_count": response.get("result_count", 0),
-                    "intent": result.get("intent")
-                }
-            })
+        except Exception as e:
+            return self._fail_turn(user_query, e)
+    
+    def chat_stream(self, user_query: str) -> Iterator[str]:
+        """
+        Process user query like chat(), yielding output as the workflow runs:
+        a progress line as each node finishes, then the answer - token by
+        token while the answer node generates it, or in one piece for paths
+        without it (casual chat, errors). History is updated once the stream
+        completes; the full response dictionary is then available as
+        self.last_response.
+        
+        Args:
+            user_query: User's question or request
             
-            return response
+        Yields:
+            Text chunks to display in order (progress lines start with "  ✓ ")
+        """
+        self.last_response = None
+        answering = False
+        failed = False
+        try:
+            initial_state, config = self._prepare_turn(user_query)
+            result = dict(initial_state)
             
-        except Exception as e:
-            error_msg = f"I encountered an error processing your request: {str(e)}"
-            print(f"❌ Error: {error_msg}")
+            # "updates" yields {node_name: changed_fields} after every node;
+            # "custom" yields what nodes write to the stream writer (answer chunks)
+            if get_stream_writer is not None:
+                events = self.workflow.stream(initial_state, config, stream_mode=["updates", "custom"])
+            else:
+                # No custom mode: the answer arrives whole in the final state
+                events = (("updates", chunk) for chunk in self.workflow.stream(initial_state, config, stream_mode="updates"))
+            for mode, chunk in events:
+                if mode == "custom":
+                    if isinstance(chunk, dict) and chunk.get("answer_chunk"):
+                        answering = True
+                        yield chunk["answer_chunk"]
+                    continue
+                for node_name, changes in chunk.items():
+                    if changes:
+                        result.update(changes)
+                    # Progress lines would interleave with the answer once it started
+                    if not answering:
+                        yield f"  ✓ {node_name}\n"
             
-            self.message_history.append({"role": "user", "content": user_query, "metadata": {"error": str(e)}})
-            self.message_history.append({"role": "assistant", "content": error_msg, "metadata": {"error": True}})
+            self.last_response = self._finish_turn(user_query, result)
             
-            return {
-                "answer": error_msg,
-                "error": str(e),
-                "results": [],
-                "result_count": 0
+        except Exception as e:
+            failed = True
+            self.last_response = self._fail_turn(user_query, e)
+        
+        if failed or not answering:
+            yield self.last_response["answer"]
+    
+    def _prepare_turn(self, user_query: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Build the initial graph state and LangGraph config for one turn"""
+        initial_state = {
+            "user_query": user_query,
+            "intent": None,
+            "entities": {},
+            "baseline_results": [],
+            "embedding_results": [],
+            "llm_query_results": [],
+            "merged_context": "",
+            "llm_response": "",
+            # Read-only snapshot of recent turns: O(window) per turn instead of
+            # copying the whole log, and nodes cannot mutate the chatbot's history
+            "chat_history": self._history_snapshot(),
+            "error": None,
+            "metadata": {}
+        }
+        
+        # LangGraph config with thread_id for memory
+        config = {
+            "configurable": {
+                "thread_id": self.thread_id
             }
+        }
+        return initial_state, config
+    
+    def _history_snapshot(self) -> Tuple[Dict[str, Any], ...]:
+        """
+        Last history_window turns, preceded by the rolling summary of older
+        turns when summarization is enabled
+        
+        Returns:
+            Tuple of messages to pass as chat_history
+        """
+        window_start = max(len(self.message_history) - 2 * self.history_window, 0)
+        window = tuple(self.message_history[window_start:])
+        if self.summarizer is None:
+            return window
+        
+        # Fold messages that left the window since the last turn into the summary
+        if window_start > self._summarized_count:
+            summary = self.summarizer.summarize(
+                self.history_summary,
+                self.message_history[self._summarized_count:window_start]
+            )
+            if summary is not None:
+                self.history_summary = summary
+                self._summarized_count = window_start
+        
+        if self.history_summary:
+            return (self.summarizer.as_message(self.history_summary),) + window
+        return window
+    
+    def _finish_turn(self, user_query: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Format the final workflow state and record the turn in local history"""
+        # Extract results and format response
+        response = self._format_response(result, user_query)
+        
+        # Update local message history
+        self.message_history.append({
+            "role": "user",
+            "content": user_query,
+            "metadata": {
+                "intent": result.get("intent"),
+                "entities": result.get("entities", {}),
+                "workflow": self.workflow_mode,
+                "query_rewritten": result.get("metadata", {}).get("query_rewritten", False)
+            }
+        })
+        
+        self.message_history.append({
+            "role": "assistant",
+            "content": response["answer"],
+            "metadata": {
+                "workflow": self.workflow_mode,
+                "result_count": response.get("result_count", 0),
+                "intent": result.get("intent")
+            }
+        })
+        
+        return response
+    
+    def _fail_turn(self, user_query: str, error: Exception) -> Dict[str, Any]:
+        """Record a failed turn and build the error response"""
+        error_msg = f"I encountered an error processing your request: {str(error)}"
+        print(f"❌ Error: {error_msg}")
+        
+        self.message_history.append({"role": "user", "content": user_query, "metadata": {"error": str(error)}})
+        self.message_history.append({"role": "assistant", "content": error_msg, "metadata": {"error": True}})
+        
+        return {
+            "answer": error_msg,
+            "error": str(error),
+            "results": [],
+            "result_count": 0
+        }
     
     def _format_response(
         self,
@@ -197,24 +314,17 @@ class HotelChatbot:
         Returns:
             Merged list of unique results
         """
-        seen_ids = set()
-        merged = []
-        
-        # Add all baseline results first (prioritize structured queries)
-        for result in baseline:
-            result_id = result.get("hotel_id") or result.get("review_id")
-            if result_id and result_id not in seen_ids:
-                seen_ids.add(result_id)
-                merged.append(result)
+        merged = {}  # result_id -> result, in first-seen order
         
-        # Add embedding results that aren't duplicates
-        for result in embedding:
-            result_id = result.get("hotel_id") or result.get("review_id")
-            if result_id and result_id not in seen_ids:
-                seen_ids.add(result_id)
-                merged.append(result)
+        # Baseline results first (prioritize structured queries), then embedding
+        # results that aren't duplicates
+        for results in (baseline, embedding):
+            for result in results:
+                result_id = result.get("hotel_id") or result.get("review_id")
+                if result_id and result_id not in merged:
+                    merged[result_id] = result
         
-        return merged
+        return list(merged.values())
     
     def switch_workflow(self, new_workflow: str):
         """
@@ -240,6 +350,8 @@ class HotelChatbot:
     def clear_history(self):
         """Clear conversation history and create new thread"""
         self.message_history = []
+        self.history_summary = None
+        self._summarized_count = 0
         self.thread_id = str(uuid.uuid4())
         self.memory = MemorySaver()
         self.workflow = get_workflow_with_memory(self.workflow_mode, self.memory)
@@ -261,13 +373,17 @@ class HotelChatbot:
             "thread_id": self.thread_id,
             "workflow_mode": self.workflow_mode,
             "message_history": self.message_history,
-            "message_count": len(self.message_history)
+            "message_count": len(self.message_history),
+            "history_summary": self.history_summary
         }
     
     def import_session(self, data: Dict[str, Any]):
         """Import session data from saved file"""
         if "message_history" in data:
             self.message_history = data["message_history"]
+            self.history_summary = data.get("history_summary")
+            # A stored summary covers everything before the window; otherwise start over
+            self._summarized_count = max(len(self.message_history) - 2 * self.history_window, 0) if self.history_summary else 0
         if "thread_id" in data:
             self.thread_id = data["thread_id"]
         if "workflow_mode" in data:
@@ -335,11 +451,21 @@ def interactive_chat():
                 print("-" * 60)
                 continue
             
-            # Process query
-            response = chatbot.chat(user_input)
+            # Process query, printing progress as workflow nodes finish, then the answer as it streams
+            answering = False
+            for chunk in chatbot.chat_stream(user_input):
+                if not answering and chunk.startswith("  ✓ "):
+                    sys.stdout.write(chunk)
+                else:
+                    if not answering:
+                        sys.stdout.write("\n🤖 Assistant: ")
+                        answering = True
+                    sys.stdout.write(chunk)
+                sys.stdout.flush()
+            sys.stdout.write("\n")
             
-            print(f"\n🤖 Assistant: {response['answer']}")
-            print(f"\n📊 Results: {response['result_count']} | Workflow: {response['workflow']}")
+            response = chatbot.last_response
+            print(f"\n📊 Results: {response['result_count']} | Workflow: {response.get('workflow', chatbot.workflow_mode)}")
             
         except KeyboardInterrupt:
             print("\n\n👋 Goodbye!")
@@ -12,6 +12,8 @@ from .vector_searcher import VectorSearcher
 from .result_merger import ResultMerger
 from .llm_query_generator import LLMQueryGenerator
 from .answer_generator import AnswerGenerator
+from .query_analyzer import QueryAnalyzer
+from .query_view import QueryView
 
 __all__ = [
     'IntentClassifier',
@@ -23,4 +25,6 @@ __all__ = [
     'ResultMerger',
     'LLMQueryGenerator',
     'AnswerGenerator',
+    'QueryAnalyzer',
+    'QueryView',
 ]
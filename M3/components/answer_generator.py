@@ -3,8 +3,36 @@ Answer Generator for Graph-RAG Hotel Travel Assistant
 LLM generates final answers from retrieved context
 """
 
-from typing import Optional, List, Dict, Any
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from string import Template
+from types import MappingProxyType
+from typing import Optional, List, Dict, Any, Iterator
 from utils.llm_client import LLMClient
+from components.semantic_cache import get_semantic_cache
+
+
+# Per-request user message; $guidance is filled in once per intent (see
+# _guided_template), leaving only $history, $context and $query per call
+ANSWER_PROMPT_TEMPLATE = Template("""$guidance
+
+$history
+
+Context:
+$context
+
+User Question: "$query"
+
+Answer:""")
+
+
+def _guided_template(guidance: str) -> Template:
+    """Answer prompt template with the intent guidance already substituted"""
+    # Escape "$" so the guidance text is never read as a placeholder
+    return Template(ANSWER_PROMPT_TEMPLATE.safe_substitute(guidance=guidance.replace("$", "$$")))
 
 
 class AnswerGenerator:
@@ -14,12 +42,83 @@ class AnswerGenerator:
     Supports conversation history for context-aware responses.
     """
     
-    def __init__(self):
-        """Initialize answer generator"""
+    NO_CONTEXT_ANSWER = "I couldn't find any relevant information to answer your question. Please try rephrasing or asking about something else."
+    ERROR_ANSWER = "I'm sorry, I encountered an error while generating the answer. Please try again."
+    
+    # Fixed instructions sent as the system message. Kept identical across
+    # calls (all per-request text goes in the user message) so the provider's
+    # automatic prompt caching can reuse the prefix instead of re-reading it.
+    SYSTEM_PROMPT = """You are a helpful hotel travel assistant. Answer the user's question using ONLY the provided context.
+
+CRITICAL RULES:
+- Base your answer on the provided context
+- Do NOT make up information or hotels
+- Always provide helpful hotel recommendations from the context that match the user's criteria
+- If the context contains relevant hotel information, provide it with explanations
+- Do NOT decline to answer if hotels are available in the context
+- Cite specific hotels, scores, or reviews from the context
+- Be concise but complete (2-3 sentences for brief answers, 3-5 for detailed recommendations)
+- Use natural language, not technical jargon
+- Consider the conversation history when formulating your answer
+- Follow the answer guidance at the start of the user message"""
+    
+    # Intent-specific answer guidance (read-only, built once)
+    INTENT_GUIDANCE = MappingProxyType({
+        "HotelSearch": "Provide a list of hotels with their key details (location, rating, scores).",
+        "HotelRecommendation": "Recommend the best hotels from the context, explaining why they are excellent choices for the user's specific needs (traveler type, location preference, etc.).",
+        "ReviewLookup": "Summarize the reviews, highlighting common themes and specific feedback.",
+        "LocationQuery": "Focus on location-related information and scores.",
+        "VisaQuestion": "Provide clear visa requirement information.",
+        "AmenityFilter": "Highlight hotels that best meet the specified quality criteria with their specific scores.",
+        "GeneralQuestionAnswering": "Provide comprehensive information about the hotel or topic based on the context."
+    })
+    DEFAULT_GUIDANCE = "Answer the question clearly and directly using the provided context."
+    
+    # Prompt templates partially evaluated per intent at import
+    _PROMPT_TEMPLATES = MappingProxyType({
+        intent: _guided_template(guidance) for intent, guidance in INTENT_GUIDANCE.items()
+    })
+    _DEFAULT_PROMPT_TEMPLATE = _guided_template(DEFAULT_GUIDANCE)
+    
+    # Whole-message acknowledgements answered without an LLM call (normally
+    # routed to the casual node; this covers ones classified as questions)
+    TRIVIAL_REPLIES = MappingProxyType({
+        "thanks": "You're welcome! Feel free to ask if you need anything else about hotels or travel!",
+        "thank you": "You're welcome! Feel free to ask if you need anything else about hotels or travel!",
+        "ok": "Great! Let me know if you'd like to look for more hotels.",
+        "okay": "Great! Let me know if you'd like to look for more hotels.",
+        "great": "Glad to help! Let me know if you'd like to look for more hotels.",
+        "cool": "Glad to help! Let me know if you'd like to look for more hotels.",
+        "hi": "Hello! Ask me about hotels, reviews, or visa requirements.",
+        "hello": "Hello! Ask me about hotels, reviews, or visa requirements.",
+        "hey": "Hello! Ask me about hotels, reviews, or visa requirements.",
+        "bye": "Goodbye! Safe travels!",
+        "goodbye": "Goodbye! Safe travels!",
+    })
+    _NON_WORD = re.compile(r"[^a-z ]+")
+    
+    # Chat history in the prompt: at most the last 3 turns (user + assistant
+    # messages), within a token budget measured with the LLM client's tokenizer
+    HISTORY_MAX_MESSAGES = 6
+    HISTORY_TOKEN_BUDGET = 800
+    
+    # Exact-match LRU of answers keyed by a blake2b hash of (model, intent,
+    # context, history, normalized query); checked before the semantic cache
+    ANSWER_CACHE_SIZE = 1024
+    
+    def __init__(self, llm_client: Optional[LLMClient] = None):
+        """Initialize answer generator
+        
+        Args:
+            llm_client: Shared LLM client (default: the process-wide LLMClient)
+        """
         try:
-            self.llm_client = LLMClient()
+            self.llm_client = llm_client or LLMClient()
         except Exception as e:
             raise RuntimeError(f"Failed to initialize LLM client for answer generation: {e}")
+        self.semantic_cache = get_semantic_cache("answers")
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
     
     def generate(
         self,
@@ -38,51 +137,238 @@ class AnswerGenerator:
             chat_history: Optional conversation history for context
             
         Returns:
-            Generated answer string
+            Generated answer string (ERROR_ANSWER if the LLM call fails)
         """
-        if not context or context.strip() == "No results found.":
-            return "I couldn't find any relevant information to answer your question. Please try rephrasing or asking about something else."
+        trivial = self._trivial_reply(query)
+        if trivial is not None:
+            return trivial
         
-        # Build intent-specific guidance
-        intent_guidance = self._get_intent_guidance(intent)
+        prompt = self._build_prompt(query, context, intent, chat_history)
+        if prompt is None:
+            return self.NO_CONTEXT_ANSWER
         
-        # Format conversation history if available
-        history_context = ""
-        if chat_history and len(chat_history) > 0:
-            history_context = self._format_chat_history(chat_history)
+        bucket = self._context_key(context, intent, chat_history)
+        cache_key = self._cache_key(bucket, query)
+        cached = self._cache_get(cache_key)
+        if cached is None:
+            cached = self._semantic_get(bucket, query)
+        if cached is not None:
+            self._cache_put(cache_key, cached)
+            return cached
         
-        prompt = f"""You are a helpful hotel travel assistant. Answer the user's question using ONLY the provided context.
-
-{intent_guidance}
-
-CRITICAL RULES:
-- Base your answer on the provided context
-- Do NOT make up information or hotels
-- Always provide helpful hotel recommendations from the context that match the user's criteria
-- If the context contains relevant hotel information, provide it with explanations
-- Do NOT decline to answer if hotels are available in the context
-- Cite specific hotels, scores, or reviews from the context
-- Be concise but complete (2-3 sentences for brief answers, 3-5 for detailed recommendations)
-- Use natural language, not technical jargon
-- Consider the conversation history when formulating your answer
-
-{history_context}
-
-Context:
-{context}
-
-User Question: "{query}"
-
-Answer:"""
-
+        # Non-streaming call: a failure part-way through must not return a truncated answer
         try:
-            response = self.llm_client.generate(prompt, temperature=0.3, max_tokens=400)
+            response = self.llm_client.generate(
+                prompt, temperature=0.3, max_tokens=400, system_prompt=self.SYSTEM_PROMPT
+            )
             
-            return response.strip()
+        except Exception as e:
+            print(f"Error generating answer: {e}")
+            return self.ERROR_ANSWER
+        
+        answer = response.strip()
+        self._cache_put(cache_key, answer)
+        self._semantic_put(bucket, query, answer)
+        return answer
+    
+    def generate_stream(
+        self,
+        query: str,
+        context: str,
+        intent: Optional[str] = None,
+        chat_history: Optional[List[Dict[str, Any]]] = None
+    ) -> Iterator[str]:
+        """
+        Generate answer from query and context, yielding text as it is produced
+        so callers can show the first words without waiting for the full answer
+        
+        Args:
+            query: User's original query
+            context: Retrieved context (hotels, reviews, etc.)
+            intent: Optional intent classification for guidance
+            chat_history: Optional conversation history for context
+            
+        Yields:
+            Answer text chunks in order
+        """
+        trivial = self._trivial_reply(query)
+        if trivial is not None:
+            yield trivial
+            return
+        
+        prompt = self._build_prompt(query, context, intent, chat_history)
+        if prompt is None:
+            yield self.NO_CONTEXT_ANSWER
+            return
+        
+        bucket = self._context_key(context, intent, chat_history)
+        cache_key = self._cache_key(bucket, query)
+        cached = self._cache_get(cache_key)
+        if cached is None:
+            cached = self._semantic_get(bucket, query)
+        if cached is not None:
+            self._cache_put(cache_key, cached)
+            yield cached
+            return
+        
+        started = False
+        chunks = []
+        try:
+            for chunk in self.llm_client.generate_stream(
+                prompt, temperature=0.3, max_tokens=400, system_prompt=self.SYSTEM_PROMPT
+            ):
+                if not started:
+                    chunk = chunk.lstrip()
+                    if not chunk:
+                        continue
+                    started = True
+                chunks.append(chunk)
+                yield chunk
+            
+        except Exception as e:
+            print(f"Error generating answer: {e}")
+            # Text already shown stays; only a failure before the first chunk becomes the error answer
+            if not started:
+                yield self.ERROR_ANSWER
+            return
+        
+        answer = "".join(chunks).strip()
+        self._cache_put(cache_key, answer)
+        self._semantic_put(bucket, query, answer)
+    
+    async def agenerate(
+        self,
+        query: str,
+        context: str,
+        intent: Optional[str] = None,
+        chat_history: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
+        """
+        Async variant of generate() for answering many queries concurrently:
+        await asyncio.gather(*[gen.agenerate(q, c) for q, c in pairs])
+        
+        Args:
+            query: User's original query
+            context: Retrieved context (hotels, reviews, etc.)
+            intent: Optional intent classification for guidance
+            chat_history: Optional conversation history for context
+            
+        Returns:
+            Generated answer string
+        """
+        trivial = self._trivial_reply(query)
+        if trivial is not None:
+            return trivial
+        
+        prompt = self._build_prompt(query, context, intent, chat_history)
+        if prompt is None:
+            return self.NO_CONTEXT_ANSWER
+        
+        bucket = self._context_key(context, intent, chat_history)
+        cache_key = self._cache_key(bucket, query)
+        cached = self._cache_get(cache_key)
+        if cached is None:
+            cached = self._semantic_get(bucket, query)
+        if cached is not None:
+            self._cache_put(cache_key, cached)
+            return cached
+        
+        try:
+            response = await self.llm_client.agenerate(
+                prompt, temperature=0.3, max_tokens=400, system_prompt=self.SYSTEM_PROMPT
+            )
             
         except Exception as e:
             print(f"Error generating answer: {e}")
-            return "I'm sorry, I encountered an error while generating the answer. Please try again."
+            return self.ERROR_ANSWER
+        
+        answer = response.strip()
+        self._cache_put(cache_key, answer)
+        self._semantic_put(bucket, query, answer)
+        return answer
+    
+    def _trivial_reply(self, query: str) -> Optional[str]:
+        """Canned reply if the whole query is a greeting or acknowledgement"""
+        normalized = " ".join(self._NON_WORD.sub(" ", (query or "").lower()).split())
+        return self.TRIVIAL_REPLIES.get(normalized)
+    
+    def _context_key(
+        self,
+        context: str,
+        intent: Optional[str],
+        chat_history: Optional[List[Dict[str, Any]]]
+    ) -> str:
+        """
+        Hash of everything besides the question that shapes an answer (model,
+        intent, retrieved context, conversation history). Also the semantic
+        cache bucket, so answers are only reused over the same context.
+        """
+        history = [(msg.get("role"), msg.get("content")) for msg in chat_history or ()]
+        payload = json.dumps([self.llm_client.model, intent, context, history], default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _cache_key(self, context_key: str, query: str) -> str:
+        """Exact-match cache key: context hash plus whitespace/case-normalized query"""
+        normalized = " ".join(query.split()).lower()
+        return hashlib.blake2b(f"{context_key}|{normalized}".encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Look up an answer in the exact-match LRU"""
+        with self._cache_lock:
+            answer = self._cache.get(key)
+            if answer is not None:
+                self._cache.move_to_end(key)
+            return answer
+    
+    def _cache_put(self, key: str, answer: str):
+        """Insert an answer into the exact-match LRU, evicting the least recently used"""
+        if not answer:
+            return
+        with self._cache_lock:
+            self._cache[key] = answer
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.ANSWER_CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
+    def clear_cache(self):
+        """Clear the exact-match answer cache"""
+        with self._cache_lock:
+            self._cache.clear()
+    
+    def _semantic_get(self, bucket: str, query: str) -> Optional[str]:
+        """Cached answer for a paraphrase of query in this bucket, if any"""
+        if self.semantic_cache is None:
+            return None
+        return self.semantic_cache.lookup(bucket, query)
+    
+    def _semantic_put(self, bucket: str, query: str, answer: str):
+        """Store a generated answer in the semantic cache"""
+        if self.semantic_cache is not None and answer:
+            self.semantic_cache.store(bucket, query, answer)
+    
+    def _build_prompt(
+        self,
+        query: str,
+        context: str,
+        intent: Optional[str],
+        chat_history: Optional[List[Dict[str, Any]]]
+    ) -> Optional[str]:
+        """
+        Build the per-request user message (the fixed rules are SYSTEM_PROMPT)
+        
+        Returns:
+            Prompt string, or None if there is no context to answer from
+        """
+        if not context or context.strip() == "No results found.":
+            return None
+        
+        # Format conversation history if available
+        history_context = ""
+        if chat_history and len(chat_history) > 0:
+            history_context = self._format_chat_history(chat_history)
+        
+        template = self._PROMPT_TEMPLATES.get(intent, self._DEFAULT_PROMPT_TEMPLATE)
+        return template.substitute(history=history_context, context=context, query=query)
     
     def _format_chat_history(self, chat_history: List[Dict[str, Any]]) -> str:
         """
@@ -97,33 +383,23 @@ Answer:"""
         if not chat_history:
             return ""
         
-        # Take last 3 turns for context
-        recent_history = chat_history[-6:]  # 3 turns = 6 messages (user + assistant)
-        
-        lines = ["Previous conversation:"]
-        for msg in recent_history:
+        # Fill the token budget newest first, so the oldest turns are dropped first
+        remaining = self.HISTORY_TOKEN_BUDGET
+        lines = []
+        for msg in reversed(chat_history[-self.HISTORY_MAX_MESSAGES:]):
             role = "User" if msg["role"] == "user" else "Assistant"
-            content = msg["content"]
-            # Truncate long messages
-            if len(content) > 150:
-                content = content[:150] + "..."
-            lines.append(f"{role}: {content}")
-        
-        return "\n".join(lines)
-    
-    def _get_intent_guidance(self, intent: Optional[str]) -> str:
-        """Get intent-specific guidance for answer generation"""
-        guidance_map = {
-            "HotelSearch": "Provide a list of hotels with their key details (location, rating, scores).",
-            "HotelRecommendation": "Recommend the best hotels from the context, explaining why they are excellent choices for the user's specific needs (traveler type, location preference, etc.).",
-            "ReviewLookup": "Summarize the reviews, highlighting common themes and specific feedback.",
-            "LocationQuery": "Focus on location-related information and scores.",
-            "VisaQuestion": "Provide clear visa requirement information.",
-            "AmenityFilter": "Highlight hotels that best meet the specified quality criteria with their specific scores.",
-            "GeneralQuestionAnswering": "Provide comprehensive information about the hotel or topic based on the context."
-        }
-        
-        return guidance_map.get(intent, "Answer the question clearly and directly using the provided context.")
+            line = f"{role}: {msg['content']}"
+            cost = self.llm_client.count_tokens(line) + 1  # +1 for the newline
+            if cost > remaining:
+                # Keep the start of the newest message rather than no history at all
+                if not lines:
+                    lines.append(self.llm_client.truncate_to_tokens(line, remaining - 2) + "...")
+                break
+            lines.append(line)
+            remaining -= cost
+        
+        lines.append("Previous conversation:")
+        return "\n".join(reversed(lines))
 
 
 if __name__ == "__main__":
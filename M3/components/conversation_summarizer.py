@@ -0,0 +1,67 @@
+"""
+Conversation Summarizer for Graph-RAG Hotel Travel Assistant
+Folds turns that fall out of the chat history window into a rolling summary
+"""
+
+from typing import List, Dict, Any, Optional
+from utils.llm_client import LLMClient
+
+
+class ConversationSummarizer:
+    """
+    Maintain a short rolling summary of older conversation turns so the
+    workflow only receives a bounded window of messages plus one summary message.
+    """
+
+    # Role of the summary message placed before the history window
+    SUMMARY_ROLE = "system"
+
+    def __init__(self, llm_client: Optional[LLMClient] = None):
+        """Initialize conversation summarizer
+        
+        Args:
+            llm_client: Shared LLM client (default: the process-wide LLMClient)
+        """
+        try:
+            self.llm_client = llm_client or LLMClient()
+        except Exception as e:
+            raise RuntimeError(f"Failed to initialize LLM client for conversation summaries: {e}")
+
+    def summarize(self, previous_summary: Optional[str], messages: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Fold messages into the running summary
+
+        Args:
+            previous_summary: Current summary (None if nothing has been summarized yet)
+            messages: Messages leaving the history window, oldest first
+
+        Returns:
+            Updated summary, or None if the LLM call failed
+        """
+        if not messages:
+            return previous_summary
+
+        lines = []
+        for msg in messages:
+            role = "User" if msg.get("role") == "user" else "Assistant"
+            lines.append(f"{role}: {msg.get('content', '')}")
+
+        prompt = f"""Update the running summary of a conversation between a user and a hotel travel assistant.
+
+Current summary:
+{previous_summary or "(empty)"}
+
+New messages:
+{chr(10).join(lines)}
+
+Write the updated summary in at most 80 words. Keep every city, country, hotel name, traveler type and filter the user mentioned, and what the assistant recommended. Return ONLY the summary:"""
+
+        try:
+            return self.llm_client.generate(prompt, temperature=0.0, max_tokens=150).strip()
+        except Exception as e:
+            print(f"Error summarizing conversation: {e}")
+            return None
+
+    def as_message(self, summary: str) -> Dict[str, Any]:
+        """Wrap a summary as the chat history message placed before the window"""
+        return {"role": self.SUMMARY_ROLE, "content": summary}
@@ -4,7 +4,17 @@ Generates embeddings for text using embedding client
 """
 
 from typing import List, Optional
+
+import numpy as np
+
 from utils.embedding_client import EmbeddingClient
+from utils.config_loader import ConfigLoader
+
+try:
+    from sentence_transformers.quantization import quantize_embeddings
+except ImportError:
+    # Older sentence-transformers (< 2.6) has no quantization module; see _quantize_int8
+    quantize_embeddings = None
 
 
 class EmbeddingGenerator:
@@ -13,14 +23,20 @@ class EmbeddingGenerator:
     Wrapper around EmbeddingClient for component layer.
     """
     
-    def __init__(self, model_name: Optional[str] = None):
+    # Fixed per-dimension int8 calibration range. Embeddings are unit-normalized,
+    # so every component lies in [-1, 1]; a fixed range keeps codes comparable
+    # across calls (ranges fitted per batch would not be)
+    INT8_RANGE = (-1.0, 1.0)
+    
+    def __init__(self, model_name: Optional[str] = None, embedding_client: Optional[EmbeddingClient] = None):
         """
         Initialize embedding generator
         
         Args:
             model_name: Embedding model name (default from config)
+            embedding_client: Shared embedding client (default: the process-wide EmbeddingClient)
         """
-        self.embedding_client = EmbeddingClient(model_name=model_name)
+        self.embedding_client = embedding_client or EmbeddingClient(model_name=model_name)
     
     def embed(self, text: str) -> List[float]:
         """
@@ -37,6 +53,62 @@ class EmbeddingGenerator:
         
         return self.embedding_client.encode(text)
     
+    def embed_many(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Generate embeddings for many texts in batched forward passes
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Texts per forward pass (default: embedding.batch_size from config)
+            
+        Returns:
+            float32 array of shape (len(texts), dimension), L2-normalized rows in
+            input order (all-zero rows for empty texts). Use .tolist() for Neo4j/JSON.
+        """
+        positions = [i for i, text in enumerate(texts) if text and text.strip()]
+        embeddings = np.zeros((len(texts), self.get_dimension()), dtype=np.float32)
+        if not positions:
+            return embeddings
+        
+        if batch_size is None:
+            batch_size = ConfigLoader().get('embedding.batch_size', 32)
+        
+        embeddings[positions] = self.embedding_client.encode_batch(
+            [texts[i] for i in positions],
+            batch_size=batch_size,
+            show_progress=False,
+            as_numpy=True
+        )
+        return embeddings
+    
+    def embed_many_quantized(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Generate int8 embeddings (4x smaller than float32) for many texts,
+        e.g. for a faiss IndexScalarQuantizer or int8 dot-product scoring
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Texts per forward pass (default: embedding.batch_size from config)
+            
+        Returns:
+            int8 array of shape (len(texts), dimension)
+        """
+        return self._quantize_int8(self.embed_many(texts, batch_size=batch_size))
+    
+    def _quantize_int8(self, embeddings: np.ndarray) -> np.ndarray:
+        """Map normalized float32 embeddings onto 256 int8 buckets over INT8_RANGE"""
+        ranges = np.array(
+            [[self.INT8_RANGE[0]] * embeddings.shape[1], [self.INT8_RANGE[1]] * embeddings.shape[1]],
+            dtype=np.float32
+        )
+        if quantize_embeddings is not None:
+            return quantize_embeddings(embeddings, precision="int8", ranges=ranges)
+        
+        # Same bucketing as sentence-transformers' quantize_embeddings
+        starts = ranges[0, :]
+        steps = (ranges[1, :] - ranges[0, :]) / 255
+        return ((embeddings - starts) / steps - 128).astype(np.int8)
+    
     def get_dimension(self) -> int:
         """Get embedding dimension"""
         return self.embedding_client.dimension
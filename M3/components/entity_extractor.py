@@ -4,9 +4,48 @@ Extracts structured entities from user queries using LLM
 """
 
 import re
+import os
+import copy
+import asyncio
+import json
 import difflib
-from typing import Dict, Any, Optional, List, Tuple
-from utils.llm_client import LLMClient
+import hashlib
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Tuple, Union
+import numpy as np
+from utils.llm_client import LLMClient, get_llm_client
+from utils.config_loader import ConfigLoader
+from components.query_view import QueryView
+from components.fuzzy_index import FuzzyIndex, TrigramIndex
+from components.semantic_cache import get_semantic_cache
+from utils.llm_cache import get_llm_cache
+
+try:
+    from rapidfuzz import fuzz, process as fuzz_process
+except ImportError:
+    # rapidfuzz is optional; difflib gives the same ratio-style similarity, just slower
+    fuzz_process = None
+
+try:
+    import ahocorasick
+except ImportError:
+    # pyahocorasick is optional; trigger keywords are then found with one `in` test each
+    ahocorasick = None
+
+
+def _keyword_automaton(keywords):
+    """Aho-Corasick automaton reporting every keyword occurrence (None without pyahocorasick)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
 
 
 class EntityExtractor:
@@ -34,30 +73,391 @@ class EntityExtractor:
         "Thailand", "Turkey", "Netherlands", "Argentina", "Nigeria", "New Zealand"
     ]
     
+    # Common country abbreviations and short names
+    COUNTRY_ALIASES = {
+        "usa": "United States",
+        "us": "United States",
+        "america": "United States",
+        "uk": "United Kingdom",
+        "uae": "United Arab Emirates",
+        "korea": "South Korea",
+    }
+    
+    # Short city names too brief for the containment match below
+    CITY_ALIASES = {
+        "rio": "Rio de Janeiro",
+    }
+    
+    # Nationality adjectives to country names (plurals are handled by stripping the "s")
+    NATIONALITY_ALIASES = {
+        "american": "United States",
+        "british": "United Kingdom",
+        "brit": "United Kingdom",
+        "french": "France",
+        "japanese": "Japan",
+        "german": "Germany",
+        "canadian": "Canada",
+        "australian": "Australia",
+        "spanish": "Spain",
+        "italian": "Italy",
+        "chinese": "China",
+        "mexican": "Mexico",
+        "indian": "India",
+        "brazilian": "Brazil",
+        "russian": "Russia",
+        "egyptian": "Egypt",
+        "thai": "Thailand",
+        "turkish": "Turkey",
+        "dutch": "Netherlands",
+        "korean": "South Korea",
+        "south korean": "South Korea",
+        "emirati": "United Arab Emirates",
+        "singaporean": "Singapore",
+    }
+    
+    # Lowercase lookup tables built once: exact matches (aliases included, so
+    # "us" is never caught by the partial match as "Russia") and lowercase
+    # names aligned with VALID_CITIES / VALID_COUNTRIES for the partial match
+    _CITY_EXACT = {**{city.lower(): city for city in VALID_CITIES}, **CITY_ALIASES}
+    _CITY_LOWER = tuple(city.lower() for city in VALID_CITIES)
+    _COUNTRY_EXACT = {**{country.lower(): country for country in VALID_COUNTRIES}, **COUNTRY_ALIASES}
+    # Everything _normalize_country_name resolves by name; nationalities take precedence
+    _COUNTRY_ALIAS_MAP = MappingProxyType({**_COUNTRY_EXACT, **NATIONALITY_ALIASES})
+    _COUNTRY_LOWER = tuple(country.lower() for country in VALID_COUNTRIES)
+    # Hash sets for canonical-name membership tests
+    _TRAVELLER_TYPE_SET = frozenset(TRAVELLER_TYPES)
+    _VALID_COUNTRY_SET = frozenset(VALID_COUNTRIES)
+    # Plural/lowercase traveller words captured by _TRAVELLER_PATTERNS -> TRAVELLER_TYPES
+    _TRAVELLER_TYPE_MAP = MappingProxyType({
+        'families': 'Family',
+        'couples': 'Couple',
+        'groups': 'Group',
+        'business': 'Business',
+        'solo': 'Solo'
+    })
+    
+    # Shortest city/country input tried against the containment match, so fragments
+    # like "new" or "arab" are not read as "New York" / "United Arab Emirates"
+    PARTIAL_MATCH_MIN_LENGTH = 5
+    
+    # LLM output schema per intent, built once. The mapping is read-only; the
+    # schemas themselves stay plain dicts (json.dumps cannot serialize
+    # mappingproxy) and are shared, so callers must not mutate them.
+    _LLM_SCHEMAS = MappingProxyType({
+        "HotelSearch": {
+            "city": "string or null",
+            "country": "string or null",
+            "min_rating": "number or null",
+            "star_rating": "number or null",
+            "limit": "number or null"
+        },
+        "HotelRecommendation": {
+            "traveller_type": "string or null",
+            "reference_hotel": "string or null",
+            "from_country": "string or null",
+            "min_cleanliness": "number or null",
+            "min_comfort": "number or null",
+            "min_value": "number or null",
+            "city": "string or null"
+        },
+        "ReviewLookup": {"hotel_name": "string or null"},
+        "VisaQuestion": {
+            "from_country": "string or null",
+            "to_country": "string or null"
+        },
+        "AmenityFilter": {
+            "city": "string or null",
+            "min_cleanliness": "number or null",
+            "min_comfort": "number or null",
+            "min_value": "number or null",
+            "min_staff": "number or null",
+            "reference_hotel": "string or null"
+        },
+        "GeneralQuestionAnswering": {
+            "city": "string or null",
+            "country": "string or null",
+            "from_country": "string or null",
+            "traveller_type": "string or null",
+            "balanced": "boolean or null",
+            "is_trending": "boolean or null",
+            "reference_hotel": "string or null",
+            "min_cleanliness": "number or null",
+            "min_comfort": "number or null",
+            "min_staff": "number or null",
+            "min_value": "number or null"
+        }
+    })
+    
+    # Intent -> name of its LLM request builder (intents not listed have no LLM extractor)
+    _EXTRACTORS = MappingProxyType({
+        "HotelSearch": "_build_hotel_search_request",
+        "HotelRecommendation": "_build_hotel_recommendation_request",
+        "ReviewLookup": "_build_review_lookup_request",
+        "VisaQuestion": "_build_visa_question_request",
+        "AmenityFilter": "_build_amenity_filter_request",
+        "GeneralQuestionAnswering": "_build_general_qa_request",
+    })
+    
+    # Extraction prompt per intent as (lead-in, field instructions); the user query
+    # and rule hints are spliced between them by _render_llm_prompt
+    _LLM_PROMPTS = MappingProxyType({
+        "HotelSearch": (
+            "Extract location and filters",
+            """Return JSON with:
+- city: city name if mentioned (e.g., "Paris", "London")
+- country: country name if no city specified
+- min_rating: minimum rating if mentioned (e.g., "above 4.5" → 4.5)
+- star_rating: star rating if mentioned (e.g., "5 star" → 5)
+- limit: number of results if specified
+
+Use null for missing values.""",
+        ),
+        "HotelRecommendation": (
+            "Extract traveler preferences",
+            """Return JSON with:
+- traveller_type: "Family", "Couple", "Solo", "Business", or "Group" if mentioned
+  (e.g., "honeymoon" → "Couple", "family trip" → "Family")
+- reference_hotel: hotel name if asking for similar hotels
+- from_country: country name if asking about travelers from a specific country
+- city: city name if mentioned
+- min_cleanliness/min_comfort/min_value: scores if quality mentioned (default 7.5 if just keyword)
+
+Use null for missing values.""",
+        ),
+        "ReviewLookup": (
+            "Extract hotel name",
+            """Return JSON with:
+- hotel_name: name of the hotel if mentioned
+
+Use null if no specific hotel mentioned.""",
+        ),
+        "VisaQuestion": (
+            "Extract visa-related countries",
+            """Return JSON with:
+- from_country: origin country (where person is from)
+- to_country: destination country (where person wants to go)
+
+Examples:
+- "visa from USA to France" → from_country: "United States", to_country: "France"
+- "do Americans need visa for Japan" → from_country: "United States", to_country: "Japan"
+
+Use null for missing values.""",
+        ),
+        "AmenityFilter": (
+            "Extract quality scores and filters",
+            """Return JSON with quality scores (extract actual numbers or use 7.5 for keywords):
+- min_cleanliness: if "clean" or "cleanliness" mentioned
+- min_comfort: if "comfort" or "comfortable" mentioned  
+- min_staff: if "staff" or "service" mentioned
+- min_value: if "value" or "affordable" mentioned
+- city: city name if specified
+- reference_hotel: hotel name if comparing to another hotel
+
+Use null for missing values.""",
+        ),
+        "GeneralQuestionAnswering": (
+            "Extract any relevant entities",
+            """Return JSON (use null for missing):
+- city/country: location if mentioned
+- from_country: if asking about travelers from a country
+- traveller_type: if asking about specific traveler types
+- balanced: true if asking about balanced/consistent scores across dimensions
+- is_trending: true if asking about improving/trending hotels
+- reference_hotel: hotel name if mentioned
+- min_cleanliness/min_comfort/min_staff/min_value: quality scores if mentioned
+
+Use null for missing values.""",
+        ),
+    })
+    
+    # Numeric entity fields (ratings and score thresholds, including TrendAnalysis ones)
+    NUMERIC_KEYS = frozenset({
+        "min_rating", "star_rating", "min_cleanliness", "min_comfort",
+        "min_value", "min_staff", "min_location", "min_facilities",
+        "min_recent_score", "min_improvement", "min_value_score"
+    })
+    
+    # Substring markers for traveller type variants, checked in order
+    _TRAVELLER_MARKERS = (
+        ("solo", "Solo"),
+        ("couple", "Couple"),
+        ("famil", "Family"),
+        ("business", "Business"),
+        ("group", "Group"),
+    )
+    
+    # Rule-extraction regexes, compiled once: (pattern, confidence), tried in order
+    # The traveller and star patterns stay separate searches because the first
+    # match in priority order sets the confidence; folding each group into one
+    # alternation lost the literal-prefix scan (measured several times slower)
+    _TRAVELLER_PATTERNS = (
+        (re.compile(r'as a (solo|couple|family|business|group)'), 0.85),
+        (re.compile(r'as (solo|couple|family|business|group)'), 0.75),
+        (re.compile(r'for (families|couples|groups|business|solo)'), 0.8),  # "for families", "for couples"
+        (re.compile(r'(solo|couple|family|business|group)\s+(?:traveler|traveller|trip)'), 0.7),
+        (re.compile(r'(solo|couple|family|business|group)\s+(?:travelers?|travellers?)'), 0.65),
+        (re.compile(r'or as a (solo|couple|family|business|group)'), 0.8),
+    )
+    _STAR_PATTERNS = (
+        (re.compile(r'(\d)\s*star\s+hotel'), 0.85),
+        (re.compile(r'(\d)\s*star'), 0.8),
+    )
+    _SIMILAR_PATTERN = re.compile(r'similar\s+(?:to|with)\s+(?:(?:the|a)\s+)?([^,\n]+?)(?:\s+(?:in|from|for|that|which|where)|$)')
+    _SIMILAR_TRAILER = re.compile(r'\s+(?:in|from|for|hotel)?$')
+    # Matched against the original-case query
+    _VISA_PATTERNS = (
+        (re.compile(r'(?:visa|viza)\s+(?:from|requirements from|needed? from|required from)\s+([A-Za-z\s]+?)\s+to\s+([A-Za-z\s]+?)(?:\s|\?|\.|$)', re.IGNORECASE), 0.95),
+        (re.compile(r'(?:from|I\'m from)\s+([A-Za-z\s]+?)(?:,|\s+).*(?:visa|viza)\s+(?:for|to)\s+([A-Za-z\s]+?)(?:\s|\?|\.|$)', re.IGNORECASE), 0.9),
+        (re.compile(r'do\s+([A-Za-z]+?)s?\s+need\s+(?:visa|viza)\s+for\s+([A-Za-z\s]+?)(?:\s|\?|\.|$)', re.IGNORECASE), 0.9),
+    )
+    _FROM_COUNTRY_PATTERNS = (
+        (re.compile(r'popular\s+among\s+(?:travelers?|guests?|people)\s+from\s+([A-Za-z\s]+?)(?:\s+to|\s+in|[\?\.]|$)', re.IGNORECASE), 0.85),
+    )
+    _LOCATION_PATTERNS = (
+        (re.compile(r'(?:hotels?|accommodations?)\s+in\s+([a-zA-Z\s]+?)(?:\s+(?:with|and|or|for|,)|[,?!.]|$)'), 0.85),
+        (re.compile(r'\sin\s+([a-zA-Z\s]+?)(?:\s+(?:with|and|or|for|,)|[,?!.]|$)'), 0.75),
+        (re.compile(r'(?:go|travel|visit|explore)\s+to\s+([a-zA-Z\s]+?)(?:\s+(?:and|or|with|,)|[,?!.]|$)'), 0.8),
+    )
+    _LOCATION_TRAILER = re.compile(r'\s+(and|or|with|the|a)$')
+    # Quality thresholds ("cleanliness more than 8", "staff score 9.2") for all
+    # dimensions in one scan; the dimension word maps to its entity key
+    _QUALITY_PATTERN = re.compile(
+        r'(?P<dim>cleanliness|clean|comfort|comfortable|staff|service|value|affordable)\s+'
+        r'(?:score\s+)?(?:more than|above|greater than|at least|minimum|of)?\s*(?P<val>[\d.]+)'
+    )
+    _QUALITY_KEYS = MappingProxyType({
+        "cleanliness": "min_cleanliness",
+        "clean": "min_cleanliness",
+        "comfort": "min_comfort",
+        "comfortable": "min_comfort",
+        "staff": "min_staff",
+        "service": "min_staff",
+        "value": "min_value",
+        "affordable": "min_value",
+    })
+    # Substrings every match of a pattern group contains; groups whose triggers are
+    # absent from the query are skipped without running their regexes
+    # (substrings rather than tokens, so "families?" or "5-star" still trigger)
+    _TRAVELLER_KEYWORDS = frozenset({"solo", "couple", "famil", "business", "group"})
+    _VISA_KEYWORDS = frozenset({"visa", "viza"})
+    _QUALITY_KEYWORDS = frozenset({"clean", "comfort", "staff", "service", "value", "affordable"})
+    _BALANCE_KEYWORDS = frozenset({"balanced", "balance", "all dimensions", "across all", "all the scores"})
+    _TREND_KEYWORDS = frozenset({"trend", "improving", "getting better", "improve"})
+    # Quality words that stop a plain "rating X" from being read as min_rating
+    _RATING_BLOCKERS = frozenset({"staff", "service", "friendly", "cleanliness", "clean", "comfort", "value", "affordable"})
+    # Every substring the rules test for, found in one pass over the query
+    _TRIGGER_KEYWORDS = (
+        _TRAVELLER_KEYWORDS | _VISA_KEYWORDS | _QUALITY_KEYWORDS | _BALANCE_KEYWORDS
+        | _TREND_KEYWORDS | _RATING_BLOCKERS
+        | {"star", "similar", "popular", "review", "rat", "value for money", "good"}
+    )
+    _TRIGGER_AUTOMATON = _keyword_automaton(sorted(_TRIGGER_KEYWORDS))
+    _RATING_PATTERNS = (
+        (re.compile(r'(?:rating|rated|ratng)\s+(?:of\s+)?([\d.]+)'), 0.95),  # 'ratng' typo support
+        (re.compile(r'with\s+(?:rating|ratng)\s+([\d.]+)'), 0.95),
+        (re.compile(r'(?:rating|ratng)\s+(?:above|more than|at least)\s+([\d.]+)'), 0.9),
+    )
+    
+    # Intents routed away from retrieval (greetings, small talk): nothing to extract,
+    # so rules, typo checks and the LLM are all skipped
+    NO_ENTITY_INTENTS = frozenset({"CasualConversation"})
+    
     # Valid hotels - will be populated from database at runtime
     VALID_HOTELS = []
     
-    def __init__(self, debug: bool = False):
+    # Default max queries sent to the LLM in one batched extraction request
+    BATCH_SIZE = 16
+    
+    # Local typo indexes per entity type, built lazily: {entity_type: (options, FuzzyIndex)}
+    _FUZZY_INDEXES: Dict[str, Tuple[List[str], FuzzyIndex]] = {}
+    
+    # Hotel name lookups for _normalize_hotel_name, built lazily from VALID_HOTELS:
+    # (hotels, lowercase -> name, lowercase without "the " -> name, lowercase names)
+    _HOTEL_LOOKUP: Optional[Tuple[List[str], Dict[str, str], Dict[str, str], Tuple[str, ...]]] = None
+    # Trigram shortlist for hotel fuzzy matching once the list is this large
+    # (below it, scanning every name is cheaper than the index lookups)
+    TRIGRAM_INDEX_MIN_OPTIONS = 200
+    _HOTEL_TRIGRAMS: Optional[Tuple[List[str], Optional[TrigramIndex]]] = None
+    
+    # Extraction results are cached in the shared LLMCache (in-memory LRU in front of
+    # SQLite, with its TTL and size limit) under a blake2b hash of (version, model,
+    # hotel list, intent, normalized query). Bump the version whenever rule or
+    # normalization output changes so stale entries are ignored.
+    EXTRACTION_CACHE_VERSION = 2
+    _HOTEL_FINGERPRINT: Optional[Tuple[List[str], str]] = None
+    
+    # Hotel name list snapshot, reused while younger than HOTELS_CACHE_TTL seconds
+    # (by file mtime) so startup skips the Neo4j roundtrip
+    HOTELS_CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "hotels.json"
+    HOTELS_CACHE_TTL = 3600
+    
+    def __init__(
+        self,
+        debug: bool = False,
+        use_cache: bool = True,
+        batch_size: Optional[int] = None,
+        llm_client: Optional[LLMClient] = None,
+        refresh_hotels: bool = False,
+        extraction_model: Optional[str] = None
+    ):
         """Initialize entity extractor
         
         Args:
             debug: If True, print LLM responses for debugging
+            use_cache: If True, reuse results for repeated (query, intent) pairs
+                from the LLM cache, and for paraphrased queries from the semantic
+                cache (each when enabled in config)
+            batch_size: Max queries per batched LLM request in extract_many (default: BATCH_SIZE)
+            llm_client: Shared LLM client (default: the process-wide LLMClient)
+            refresh_hotels: If True, reload hotel names from Neo4j even if they are
+                already loaded or a fresh HOTELS_CACHE_PATH snapshot exists
+            extraction_model: Model for per-query structured extraction calls
+                (default: llm.extraction_model in config; None uses the client's model)
         """
         self.debug = debug
+        self.use_cache = use_cache
+        self.batch_size = max(1, batch_size or self.BATCH_SIZE)
+        self._state = threading.local()  # Per-thread flag: did an LLM call fail?
+        self.semantic_cache = get_semantic_cache("entities") if use_cache else None
+        # Finished extractions by (query, intent) key
+        self.result_cache = get_llm_cache() if use_cache else None
+        # Entity key -> normalizer used by _validate_entities (None result drops the key)
+        self._validators = {
+            "traveller_type": self._validate_traveller_type,
+            "limit": self._validate_limit,
+            "city": self._validate_city,
+            **dict.fromkeys(self.NUMERIC_KEYS, self._validate_number),
+            **dict.fromkeys(("country", "from_country", "to_country"), self._validate_country),
+            **dict.fromkeys(("hotel_name", "reference_hotel"), self._validate_hotel_name),
+        }
         try:
-            self.llm_client = LLMClient()
+            self.llm_client = llm_client or LLMClient()
         except Exception as e:
             raise RuntimeError(f"Failed to initialize LLM client for entity extraction: {e}")
+        # Extraction is short structured JSON, so it can run on a smaller, faster model
+        # than answer generation; calls that fail on it are retried on the client's model
+        self.extraction_model = extraction_model or ConfigLoader().get('llm.extraction_model')
         
         # Load valid hotels from database on first initialization
         # This helps with fuzzy matching for hotel names
-        if not EntityExtractor.VALID_HOTELS:
-            self._load_valid_hotels()
+        if refresh_hotels or not EntityExtractor.VALID_HOTELS:
+            self._load_valid_hotels(refresh=refresh_hotels)
     
-    def _load_valid_hotels(self):
-        """Load valid hotel names from the database"""
+    def _load_valid_hotels(self, refresh: bool = False):
+        """Load valid hotel names from the disk snapshot, or else from the database
+        
+        Args:
+            refresh: If True, ignore the snapshot and query the database
+        """
+        hotels = None if refresh else self._read_hotels_cache()
+        if hotels is not None:
+            EntityExtractor.VALID_HOTELS = hotels
+            if self.debug:
+                print(f"DEBUG - Loaded {len(hotels)} hotel names from {self.HOTELS_CACHE_PATH}")
+            self._hotel_trigram_index()
+            return
+        
         try:
-            from utils.config_loader import ConfigLoader
             from neo4j import GraphDatabase
             config = ConfigLoader()
             uri = config.get('neo4j.uri')
@@ -77,51 +477,463 @@ class EntityExtractor:
                 if self.debug and EntityExtractor.VALID_HOTELS:
                     print(f"  Sample hotels: {EntityExtractor.VALID_HOTELS[:5]}")
             driver.close()
+            if EntityExtractor.VALID_HOTELS:
+                self._write_hotels_cache(EntityExtractor.VALID_HOTELS)
+            # Build the name lookups now rather than on the first user query
+            self._hotel_trigram_index()
         except Exception as e:
             print(f"⚠ Could not load hotel names from database: {e}")
             EntityExtractor.VALID_HOTELS = []
     
-    def extract(self, query: str, intent: str) -> Dict[str, Any]:
+    def _read_hotels_cache(self) -> Optional[List[str]]:
+        """Return the cached hotel names, or None if the snapshot is missing, stale or unreadable"""
+        path = self.HOTELS_CACHE_PATH
+        try:
+            if time.time() - path.stat().st_mtime > self.HOTELS_CACHE_TTL:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                hotels = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(hotels, list) or not hotels or not all(isinstance(h, str) for h in hotels):
+            return None
+        return hotels
+    
+    def _write_hotels_cache(self, hotels: List[str]):
+        """Snapshot the hotel names to HOTELS_CACHE_PATH (disk errors are non-fatal)"""
+        path = self.HOTELS_CACHE_PATH
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(hotels, f)
+            os.replace(tmp_path, path)  # Atomic, so readers never see a partial file
+        except OSError as e:
+            if self.debug:
+                print(f"DEBUG - Could not persist hotel name cache: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    
+    def extract(self, query: Union[str, QueryView], intent: str) -> Dict[str, Any]:
         """
         Extract entities from query based on intent using hybrid approach:
         Rule-based first → LLM with hint (like intent classifier)
         
         Args:
-            query: User query string
+            query: User query string or precomputed QueryView
+            intent: Classified intent
+            
+        Returns:
+            Dictionary of extracted entities
+        """
+        view = QueryView.of(query or "")
+        query = view.text
+        if not query.strip() or intent in self.NO_ENTITY_INTENTS:
+            return {}
+        
+        cache_key = self._cache_key(query, intent) if self.result_cache is not None else None
+        if cache_key:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+        
+        self._state.llm_failed = False
+        entities = self._extract_uncached(view, intent)
+        if cache_key and not self._state.llm_failed:
+            self._cache_put(cache_key, entities)
+        return entities
+    
+    async def aextract(self, query: Union[str, QueryView], intent: str) -> Dict[str, Any]:
+        """
+        Async variant of extract(): the LLM stage awaits the async client, so
+        many extractions can run concurrently with asyncio.gather. The semantic
+        cache lookup (query embedding), cache I/O and validation (whose typo
+        checks make blocking LLM calls) run in worker threads, so they never
+        stall the event loop
+        
+        Args:
+            query: User query string or precomputed QueryView
             intent: Classified intent
             
         Returns:
             Dictionary of extracted entities
         """
-        if not query or not query.strip():
+        view = QueryView.of(query or "")
+        query = view.text
+        if not query.strip() or intent in self.NO_ENTITY_INTENTS:
             return {}
         
+        cache_key = self._cache_key(query, intent) if self.result_cache is not None else None
+        if cache_key:
+            cached = await asyncio.to_thread(self._cache_get, cache_key)
+            if cached is not None:
+                return cached
+        
+        rule_entities, confidence = self._extract_by_rules_with_confidence(query, intent, view.lower)
+        
+        llm_failed = False
+        if confidence >= 0.9:
+            llm_entities = None
+        else:
+            # Checked before the LLM request so a hit saves the call and its rate-limit budget;
+            # the query embedding is CPU-bound, so it runs off the event loop
+            if self.semantic_cache is not None:
+                cached = await asyncio.to_thread(self._semantic_get, query, intent, rule_entities)
+                if cached is not None:
+                    return cached
+            
+            # Same hinting policy as extract(): hints only for medium confidence
+            if confidence >= 0.5:
+                request = self._build_llm_request(query, intent, rule_entities, confidence)
+            else:
+                request = self._build_llm_request(query, intent)
+            
+            llm_entities = {}
+            if request is not None:
+                llm_entities, llm_failed = await self._allm_entities(request)
+        
+        return await asyncio.to_thread(
+            self._finish_extraction, query, intent, rule_entities, confidence, llm_entities, llm_failed, cache_key
+        )
+    
+    def _finish_extraction(
+        self,
+        query: str,
+        intent: str,
+        rule_entities: Dict[str, Any],
+        confidence: float,
+        llm_entities: Optional[Dict[str, Any]],
+        llm_failed: bool,
+        cache_key: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Validate/merge an extraction whose LLM stage already ran, then cache it.
+        Blocking (typo checks may call the LLM); aextract runs it in a worker
+        thread, which also keeps the per-thread failure flag to this call.
+        
+        Args:
+            query: User query string
+            intent: Classified intent
+            rule_entities: Rule-based entities
+            confidence: Rule confidence
+            llm_entities: Raw LLM entities, or None when the rules were confident enough
+            llm_failed: Whether the LLM call failed
+            cache_key: Extraction cache key, or None when caching is off
+            
+        Returns:
+            Dictionary of extracted entities
+        """
+        self._state.llm_failed = llm_failed
+        if llm_entities is None:
+            entities = self._validate_entities(rule_entities)
+        else:
+            entities = self._merge_llm_entities(rule_entities, confidence, llm_entities)
+            if not self._state.llm_failed:
+                self._semantic_put(query, intent, rule_entities, entities)
+        
+        if cache_key and not self._state.llm_failed:
+            self._cache_put(cache_key, entities)
+        return entities
+    
+    async def _allm_entities(self, request: Tuple[str, Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run one structured LLM extraction request
+        
+        Args:
+            request: (prompt, schema) from _build_llm_request
+            
+        Returns:
+            Tuple of (raw LLM entities, whether the call failed)
+        """
+        try:
+            llm_entities = await self._agenerate_structured(*request) or {}
+            if self.debug:
+                print(f"DEBUG - LLM extracted: {llm_entities}")
+        except Exception as e:
+            if self.debug:
+                print(f"DEBUG - LLM call failed: {e}")
+            return {}, True
+        return llm_entities, False
+    
+    def _extract_uncached(self, view: QueryView, intent: str) -> Dict[str, Any]:
+        """Run the rule + LLM extraction pipeline for a non-empty query"""
+        query = view.text
+        
         # Stage 1: Rule-based extraction with confidence scoring
-        rule_entities, confidence = self._extract_by_rules_with_confidence(query, intent)
+        rule_entities, confidence = self._extract_by_rules_with_confidence(query, intent, view.lower)
         
         # High confidence (>= 0.9) - use rule results directly (only very obvious patterns)
         if confidence >= 0.9:
             validated = self._validate_entities(rule_entities)
             return validated
         
+        # Paraphrase of an earlier query with the same rule findings - skip the LLM
+        cached = self._semantic_get(query, intent, rule_entities)
+        if cached is not None:
+            return cached
+        
         # Medium confidence (0.5-0.9) - use LLM with hint from rules
         if confidence >= 0.5:
             llm_entities = self._extract_with_llm(query, intent, hint_entities=rule_entities, hint_confidence=confidence)
+        else:
+            # Low confidence (< 0.5) - pure LLM extraction
+            llm_entities = self._extract_with_llm(query, intent)
+        
+        entities = self._merge_llm_entities(rule_entities, confidence, llm_entities)
+        if not self._state.llm_failed:
+            self._semantic_put(query, intent, rule_entities, entities)
+        return entities
+    
+    def extract_with_llm_entities(self, query: Union[str, QueryView], intent: str, llm_entities: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Finish extraction for a query whose LLM stage already ran elsewhere
+        (QueryAnalyzer's fused intent + entity call). Cache, rules and the
+        confidence policy are the same as extract(); the given LLM entities
+        stand in for the extraction call.
+        
+        Args:
+            query: User query string or precomputed QueryView
+            intent: Classified intent
+            llm_entities: Entities the LLM returned for this intent
+            
+        Returns:
+            Dictionary of extracted entities
+        """
+        view = QueryView.of(query or "")
+        query = view.text
+        if not query.strip() or intent in self.NO_ENTITY_INTENTS:
+            return {}
+        
+        cache_key = self._cache_key(query, intent) if self.result_cache is not None else None
+        if cache_key:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+        
+        self._state.llm_failed = False
+        rule_entities, confidence = self._extract_by_rules_with_confidence(query, intent, view.lower)
+        if confidence >= 0.9:
+            entities = self._validate_entities(rule_entities)
+        else:
+            entities = self._merge_llm_entities(rule_entities, confidence, llm_entities)
+        
+        if cache_key and not self._state.llm_failed:
+            self._cache_put(cache_key, entities)
+        return entities
+    
+    def llm_field_guide(self, intent: str) -> Optional[Tuple[str, Dict]]:
+        """
+        Field instructions and schema the LLM extraction uses for an intent
+        
+        Args:
+            intent: Intent name
+            
+        Returns:
+            Tuple of (field instructions, schema), or None if the intent has no LLM extractor
+        """
+        request = self._build_llm_request("", intent)
+        if request is None:
+            return None
+        return self._LLM_PROMPTS[intent][1], request[1]
+    
+    def extract_batch(self, pairs: List[Tuple[Union[str, QueryView], str]]) -> List[Dict[str, Any]]:
+        """
+        Extract entities for (query, intent) pairs; see extract_many()
+        
+        Args:
+            pairs: List of (query, intent) tuples
+            
+        Returns:
+            List of entity dictionaries aligned with pairs
+        """
+        return self.extract_many([query for query, _ in pairs], [intent for _, intent in pairs])
+    
+    def extract_many(self, queries: List[Union[str, QueryView]], intents: List[str]) -> List[Dict[str, Any]]:
+        """
+        Extract entities for many queries, batching LLM work into few API calls.
+        Rules run per query exactly as in extract(); queries that still need
+        the LLM are grouped by intent and sent in chunks of batch_size, each
+        chunk as one request that states the intent's fields only once.
+        
+        Args:
+            queries: User query strings or QueryViews
+            intents: Classified intent for each query (aligned with queries)
+            
+        Returns:
+            List of entity dictionaries aligned with queries
+        """
+        results: List[Dict[str, Any]] = [{} for _ in queries]
+        pending: Dict[str, list] = {}  # intent -> [(index, query, rule_entities, confidence, (prompt, schema))]
+        cache_keys: Dict[int, str] = {}
+        self._state.llm_failed = False
+        
+        for i, (query, intent) in enumerate(zip(queries, intents)):
+            view = QueryView.of(query or "")
+            query = view.text
+            if not query.strip() or intent in self.NO_ENTITY_INTENTS:
+                continue
+            
+            if self.result_cache is not None:
+                cache_keys[i] = self._cache_key(query, intent)
+                cached = self._cache_get(cache_keys[i])
+                if cached is not None:
+                    results[i] = cached
+                    cache_keys.pop(i)
+                    continue
+            
+            rule_entities, confidence = self._extract_by_rules_with_confidence(query, intent, view.lower)
+            if confidence >= 0.9:
+                results[i] = self._validate_entities(rule_entities)
+                continue
+            
+            cached = self._semantic_get(query, intent, rule_entities)
+            if cached is not None:
+                results[i] = cached
+                continue
+            
+            # Same hinting policy as extract(): hints only for medium confidence
+            if confidence >= 0.5:
+                request = self._build_llm_request(query, intent, rule_entities, confidence)
+            else:
+                request = self._build_llm_request(query, intent)
+            
+            if request is None:
+                results[i] = self._merge_llm_entities(rule_entities, confidence, {})
+                continue
+            pending.setdefault(intent, []).append((i, query, rule_entities, confidence, request))
+        
+        for intent, items in pending.items():
+            for start in range(0, len(items), self.batch_size):
+                chunk = items[start:start + self.batch_size]
+                llm_results = self._call_llm_structured_group(intent, chunk)
+                for (i, _, rule_entities, confidence, _), llm_entities in zip(chunk, llm_results):
+                    results[i] = self._merge_llm_entities(rule_entities, confidence, llm_entities)
+        
+        if not self._state.llm_failed:
+            for i, key in cache_keys.items():
+                self._cache_put(key, results[i])
+            for items in pending.values():
+                for i, query, rule_entities, _, _ in items:
+                    self._semantic_put(query, intents[i], rule_entities, results[i])
+        
+        return results
+    
+    def _cache_key(self, query: str, intent: str) -> str:
+        """
+        Hash a (query, intent) pair for the extraction cache
+        
+        Args:
+            query: User query (whitespace and case are normalized)
+            intent: Classified intent
+            
+        Returns:
+            Hex digest identifying the cache entry
+        """
+        normalized = " ".join(query.split()).lower()
+        payload = json.dumps(
+            [self.EXTRACTION_CACHE_VERSION, self.get_extraction_model(), self._hotel_fingerprint(), intent, normalized]
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _semantic_bucket(self, intent: str, rule_entities: Dict[str, Any]) -> str:
+        """
+        Semantic cache bucket for a query: same model, intent and rule findings.
+        Paraphrases only share a result when the rules saw the same entities,
+        so "hotels in Paris" never answers "hotels in Rome".
+        """
+        findings = json.dumps(rule_entities, sort_keys=True, default=str)
+        return f"{self.EXTRACTION_CACHE_VERSION}|{self.get_extraction_model()}|{intent}|{findings}"
+    
+    def _semantic_get(self, query: str, intent: str, rule_entities: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Look up a paraphrased earlier query in the semantic cache; returns a private copy"""
+        # Intents without an LLM extractor never call the LLM, so there is nothing to save
+        if self.semantic_cache is None or intent not in self._LLM_SCHEMAS:
+            return None
+        entities = self.semantic_cache.lookup(self._semantic_bucket(intent, rule_entities), query)
+        if entities is None:
+            return None
+        if self.debug:
+            print(f"DEBUG - Semantic cache hit for: {query}")
+        return copy.deepcopy(entities)
+    
+    def _semantic_put(self, query: str, intent: str, rule_entities: Dict[str, Any], entities: Dict[str, Any]):
+        """Store an LLM-backed extraction in the semantic cache"""
+        if self.semantic_cache is not None and intent in self._LLM_SCHEMAS:
+            self.semantic_cache.store(self._semantic_bucket(intent, rule_entities), query, copy.deepcopy(entities))
+    
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached extraction; returns a private copy"""
+        entities = self.result_cache.get(key)
+        return entities if isinstance(entities, dict) else None
+    
+    def _cache_put(self, key: str, entities: Dict[str, Any]):
+        """Store an extraction (storage errors are non-fatal)"""
+        self.result_cache.set(key, entities)
+    
+    def clear_cache(self):
+        """Clear cached extractions (shared LLM cache, memory and disk)"""
+        if self.result_cache is not None:
+            self.result_cache.clear()
+    
+    def cache_namespace(self) -> str:
+        """Cache version, extraction model and hotel list that extraction results depend on"""
+        return f"{self.EXTRACTION_CACHE_VERSION}|{self.get_extraction_model()}|{self._hotel_fingerprint()}"
+    
+    def last_llm_failed(self) -> bool:
+        """Whether an LLM call failed during this thread's last extract()/extract_many() (result is degraded)"""
+        return getattr(self._state, "llm_failed", False)
+    
+    def _hotel_fingerprint(self) -> str:
+        """Digest of VALID_HOTELS, so cached hotel-name normalizations end with the list"""
+        hotels = EntityExtractor.VALID_HOTELS
+        cached = EntityExtractor._HOTEL_FINGERPRINT
+        if cached is None or cached[0] is not hotels:
+            digest = hashlib.blake2b("\n".join(hotels).encode("utf-8"), digest_size=8).hexdigest()
+            cached = (hotels, digest)
+            EntityExtractor._HOTEL_FINGERPRINT = cached
+        return cached[1]
+    
+    def _merge_llm_entities(self, rule_entities: Dict[str, Any], confidence: float, llm_entities: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Combine rule and LLM results according to rule confidence, then validate
+        
+        Args:
+            rule_entities: Entities extracted by rules
+            confidence: Rule confidence score
+            llm_entities: Entities returned by the LLM (may be empty)
+            
+        Returns:
+            Validated entity dictionary
+        """
+        if confidence >= 0.5:
             # Merge: rule results first, LLM only adds/overrides non-None values
             merged = {**rule_entities}
             if llm_entities:
                 for key, value in llm_entities.items():
                     if value is not None and value != "null":
                         merged[key] = value
-            validated = self._validate_entities(merged)
-            return validated
+            return self._validate_entities(merged)
         
-        # Low confidence (< 0.5) - pure LLM extraction
-        llm_entities = self._extract_with_llm(query, intent)
-        validated = self._validate_entities(llm_entities) if llm_entities else {}
-        return validated
+        return self._validate_entities(llm_entities) if llm_entities else {}
     
-    def _extract_by_rules_with_confidence(self, query: str, intent: str) -> tuple:
+    def _find_triggers(self, query_lower: str) -> frozenset:
+        """
+        Trigger keywords occurring in the query, from one Aho-Corasick pass
+        (overlapping matches included, so "balanced" also reports "balance")
+        
+        Args:
+            query_lower: Lowercase query
+            
+        Returns:
+            Subset of _TRIGGER_KEYWORDS
+        """
+        if self._TRIGGER_AUTOMATON is not None:
+            return frozenset(keyword for _, keyword in self._TRIGGER_AUTOMATON.iter(query_lower))
+        return frozenset(keyword for keyword in self._TRIGGER_KEYWORDS if keyword in query_lower)
+    
+    def _extract_by_rules_with_confidence(self, query: str, intent: str, query_lower: Optional[str] = None) -> tuple:
         """
         Rule-based extraction with confidence scoring
         Returns both entities AND confidence score (0.0-1.0)
@@ -129,98 +941,75 @@ class EntityExtractor:
         Args:
             query: User query string
             intent: Classified intent
+            query_lower: Optional precomputed lowercase query
             
         Returns:
             Tuple of (entities_dict, confidence_score)
         """
         entities = {}
         confidence_scores = []
-        query_lower = query.lower()
+        query_lower = query_lower if query_lower is not None else query.lower()
+        triggers = self._find_triggers(query_lower)
         
         # Extract traveller type (solo, couple, family, business, group)
         # Lower confidence to let LLM help with ambiguous cases
-        traveller_patterns = [
-            (r'as a (solo|couple|family|business|group)', 0.85),
-            (r'as (solo|couple|family|business|group)', 0.75),
-            (r'for (families|couples|groups|business|solo)', 0.8),  # "for families", "for couples"
-            (r'(solo|couple|family|business|group)\s+(?:traveler|traveller|trip)', 0.7),
-            (r'(solo|couple|family|business|group)\s+(?:travelers?|travellers?)', 0.65),
-            (r'or as a (solo|couple|family|business|group)', 0.8),
-        ]
-        for pattern, pattern_conf in traveller_patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                traveller_type = match.group(1).strip()
-                # Map plural forms to singular
-                type_map = {
-                    'families': 'Family',
-                    'couples': 'Couple',
-                    'groups': 'Group',
-                    'business': 'Business',
-                    'solo': 'Solo'
-                }
-                # Handle both singular and plural
-                normalized = type_map.get(traveller_type.lower(), traveller_type.capitalize())
-                if normalized in self.TRAVELLER_TYPES:
-                    entities["traveller_type"] = normalized
-                    confidence_scores.append(pattern_conf)
-                    break
-        
-        # Extract star rating (5 star, 4 star hotels)
-        star_patterns = [
-            (r'(\d)\s*star\s+hotel', 0.85),
-            (r'(\d)\s*star', 0.8),
-        ]
-        for pattern, pattern_conf in star_patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                try:
-                    star_rating = float(match.group(1))
-                    if 1.0 <= star_rating <= 5.0:
-                        entities["star_rating"] = star_rating
+        if not triggers.isdisjoint(self._TRAVELLER_KEYWORDS):
+            for pattern, pattern_conf in self._TRAVELLER_PATTERNS:
+                match = pattern.search(query_lower)
+                if match:
+                    traveller_type = match.group(1).strip()
+                    # Map plural forms to singular, handling both singular and plural
+                    normalized = self._TRAVELLER_TYPE_MAP.get(traveller_type.lower(), traveller_type.capitalize())
+                    if normalized in self._TRAVELLER_TYPE_SET:
+                        entities["traveller_type"] = normalized
                         confidence_scores.append(pattern_conf)
                         break
-                except ValueError:
-                    pass
+        
+        # Extract star rating (5 star, 4 star hotels)
+        if "star" in triggers:
+            for pattern, pattern_conf in self._STAR_PATTERNS:
+                match = pattern.search(query_lower)
+                if match:
+                    try:
+                        star_rating = float(match.group(1))
+                        if 1.0 <= star_rating <= 5.0:
+                            entities["star_rating"] = star_rating
+                            confidence_scores.append(pattern_conf)
+                            break
+                    except ValueError:
+                        pass
         
         # Extract reference hotel (similar to X hotel)
-        similar_pattern = r'similar\s+(?:to|with)\s+(?:(?:the|a)\s+)?([^,\n]+?)(?:\s+(?:in|from|for|that|which|where)|$)'
-        match = re.search(similar_pattern, query_lower)
-        if match:
-            hotel_name = match.group(1).strip()
-            hotel_name = re.sub(r'\s+(?:in|from|for|hotel)?$', '', hotel_name)
-            if hotel_name and len(hotel_name) > 2:
-                entities["reference_hotel"] = hotel_name
-                confidence_scores.append(0.95)
+        if "similar" in triggers:
+            match = self._SIMILAR_PATTERN.search(query_lower)
+            if match:
+                hotel_name = match.group(1).strip()
+                hotel_name = self._SIMILAR_TRAILER.sub('', hotel_name)
+                if hotel_name and len(hotel_name) > 2:
+                    entities["reference_hotel"] = hotel_name
+                    confidence_scores.append(0.95)
         
         # Extract visa-related entities (from_country and to_country)
         # Check for visa patterns first (they're more specific)
-        visa_patterns = [
-            (r'(?:visa|viza)\s+(?:from|requirements from|needed? from|required from)\s+([A-Za-z\s]+?)\s+to\s+([A-Za-z\s]+?)(?:\s|\?|\.|$)', 0.95),
-            (r'(?:from|I\'m from)\s+([A-Za-z\s]+?)(?:,|\s+).*(?:visa|viza)\s+(?:for|to)\s+([A-Za-z\s]+?)(?:\s|\?|\.|$)', 0.9),
-            (r'do\s+([A-Za-z]+?)s?\s+need\s+(?:visa|viza)\s+for\s+([A-Za-z\s]+?)(?:\s|\?|\.|$)', 0.9),
-        ]
-        for pattern, pattern_conf in visa_patterns:
-            match = re.search(pattern, query, re.IGNORECASE)
-            if match:
-                from_country = match.group(1).strip()
-                to_country = match.group(2).strip()
-                if from_country and to_country:
-                    # Normalize country names (e.g., "Americans" -> "United States")
-                    from_country_normalized = self._normalize_country_name(from_country)
-                    to_country_normalized = self._normalize_country_name(to_country)
-                    entities["from_country"] = from_country_normalized
-                    entities["to_country"] = to_country_normalized
-                    confidence_scores.append(pattern_conf)
-                    break
+        if not triggers.isdisjoint(self._VISA_KEYWORDS):
+            for pattern, pattern_conf in self._VISA_PATTERNS:
+                match = pattern.search(query)
+                if match:
+                    from_country = match.group(1).strip()
+                    to_country = match.group(2).strip()
+                    if from_country and to_country:
+                        # Normalize country names (e.g., "Americans" -> "United States")
+                        from_country_normalized = self._normalize_country_name(from_country)
+                        to_country_normalized = self._normalize_country_name(to_country)
+                        entities["from_country"] = from_country_normalized
+                        entities["to_country"] = to_country_normalized
+                        confidence_scores.append(pattern_conf)
+                        break
         
         # Extract from_country (travelers from X country / popular among X people) - only if not already extracted from visa
-        if "from_country" not in entities:
-            from_country_patterns = [
-                (r'popular\s+among\s+(?:travelers?|guests?|people)\s+from\s+([A-Za-z\s]+?)(?:\s+to|\s+in|[\?\.]|$)', 0.85),
-            ]
-            for pattern, pattern_conf in from_country_patterns:
-                match = re.search(pattern, query, re.IGNORECASE)
+        if "from_country" not in entities and "popular" in triggers:
+            for pattern, pattern_conf in self._FROM_COUNTRY_PATTERNS:
+                match = pattern.search(query)
                 if match:
                     country_name = match.group(1).strip()
                     if country_name and len(country_name) >= 2:
@@ -230,25 +1019,21 @@ class EntityExtractor:
         
         # Extract city/country name (in X, go to X, visit X)
         # Skip if this is a visa query or review query
-        if "to_country" not in entities and "visa" not in query_lower and "review" not in query_lower:
-            location_patterns = [
-                (r'(?:hotels?|accommodations?)\s+in\s+([a-zA-Z\s]+?)(?:\s+(?:with|and|or|for|,)|[,?!.]|$)', 0.85),
-                (r'\sin\s+([a-zA-Z\s]+?)(?:\s+(?:with|and|or|for|,)|[,?!.]|$)', 0.75),
-                (r'(?:go|travel|visit|explore)\s+to\s+([a-zA-Z\s]+?)(?:\s+(?:and|or|with|,)|[,?!.]|$)', 0.8),
-            ]
-            for pattern, pattern_conf in location_patterns:
-                match = re.search(pattern, query_lower)
+        if "to_country" not in entities and "visa" not in triggers and "review" not in triggers:
+            for pattern, pattern_conf in self._LOCATION_PATTERNS:
+                match = pattern.search(query_lower)
                 if match:
                     location_name = match.group(1).strip()
                     # Clean up common noise words
-                    location_name = re.sub(r'\s+(and|or|with|the|a)$', '', location_name)
+                    location_name = self._LOCATION_TRAILER.sub('', location_name)
                     if location_name and len(location_name) >= 3:
                         # Normalize to title case
                         location_name = location_name.title()
                         
                         # Check if it's a known country first
-                        if location_name in self.VALID_COUNTRIES or self._normalize_country_name(location_name) in self.VALID_COUNTRIES:
-                            entities["country"] = self._normalize_country_name(location_name)
+                        country_name = self._normalize_country_name(location_name)
+                        if location_name in self._VALID_COUNTRY_SET or country_name in self._VALID_COUNTRY_SET:
+                            entities["country"] = country_name
                             confidence_scores.append(pattern_conf)
                         else:
                             # Assume it's a city
@@ -261,63 +1046,30 @@ class EntityExtractor:
             quality_matches = []
             extracted_numbers = set()  # Track which numbers we've used
             
-            # Look for patterns like "cleanliness more than 8" or "cleanliness above 8.5" or "cleanliness score 9.2"
-            cleanliness_pattern = r'(?:cleanliness|clean)\s+(?:score\s+)?(?:more than|above|greater than|at least|minimum|of)?\s*([\d.]+)'
-            match = re.search(cleanliness_pattern, query_lower)
-            if match:
-                try:
-                    value = float(match.group(1))
-                    entities["min_cleanliness"] = value
-                    extracted_numbers.add(value)
-                    quality_matches.append(0.85)  # Lower confidence
-                except ValueError:
-                    pass
-            
-            comfort_pattern = r'(?:comfort|comfortable)\s+(?:score\s+)?(?:more than|above|greater than|at least|minimum|of)?\s*([\d.]+)'
-            match = re.search(comfort_pattern, query_lower)
-            if match:
-                try:
-                    value = float(match.group(1))
-                    entities["min_comfort"] = value
-                    extracted_numbers.add(value)
-                    quality_matches.append(0.85)
-                except ValueError:
-                    pass
-            
-            # Improved staff pattern - must include 'staff' keyword
-            staff_pattern = r'(?:staff|service)\s+(?:score\s+)?(?:more than|above|greater than|at least|minimum|of)?\s*([\d.]+)'
-            # Also check for 'friendly staff score X' pattern
-            staff_pattern_2 = r'(?:friendly|helpful|good|excellent)\s+(?:staff|service)\s+(?:score\s+)?(?:more than|above|at least)?\s*([\d.]+)'
-            match = re.search(staff_pattern, query_lower)
-            if not match:
-                match = re.search(staff_pattern_2, query_lower)
-            if match:
-                try:
-                    value = float(match.group(1))
-                    entities["min_staff"] = value
-                    extracted_numbers.add(value)
-                    quality_matches.append(0.85)
-                except ValueError:
-                    pass
-        
-            value_pattern = r'(?:value|affordable)\s+(?:score\s+)?(?:more than|above|greater than|at least|minimum|of)?\s*([\d.]+)'
-            match = re.search(value_pattern, query_lower)
-            if match:
-                try:
-                    value = float(match.group(1))
-                    entities["min_value"] = value
-                    extracted_numbers.add(value)
-                    quality_matches.append(0.85)
-                except ValueError:
-                    pass
+            # Look for patterns like "cleanliness more than 8" or "cleanliness above 8.5" or "cleanliness score 9.2";
+            # the first mention of each dimension counts
+            seen_keys = set()
+            if not triggers.isdisjoint(self._QUALITY_KEYWORDS):
+                for match in self._QUALITY_PATTERN.finditer(query_lower):
+                    key = self._QUALITY_KEYS[match.group("dim")]
+                    if key in seen_keys:
+                        continue
+                    seen_keys.add(key)
+                    try:
+                        value = float(match.group("val"))
+                        entities[key] = value
+                        extracted_numbers.add(value)
+                        quality_matches.append(0.85)  # Lower confidence
+                    except ValueError:
+                        pass
             
             # Special handling for "good value for money" without number
-            if 'value for money' in query_lower or ('value' in query_lower and 'good' in query_lower):
+            if 'value for money' in triggers or ('value' in triggers and 'good' in triggers):
                 if "min_value" not in entities:
                     entities["min_value"] = 7.5
                     quality_matches.append(0.8)
             
-            if 'balanced' in query_lower or 'balance' in query_lower or 'all dimensions' in query_lower or 'across all' in query_lower or 'all the scores' in query_lower:
+            if not triggers.isdisjoint(self._BALANCE_KEYWORDS):
                 entities["balanced"] = True
                 quality_matches.append(0.95)
             
@@ -326,23 +1078,18 @@ class EntityExtractor:
                 confidence_scores.append(max(quality_matches))
         
         # Extract trend signals
-        if 'trend' in query_lower or 'improving' in query_lower or 'getting better' in query_lower or 'improve' in query_lower:
+        if not triggers.isdisjoint(self._TREND_KEYWORDS):
             entities["is_trending"] = True
             confidence_scores.append(0.9)
         
         # Extract rating (with, above, rating X) - but ONLY if not already extracted quality dimensions
         # This must come AFTER quality extraction to avoid conflicts
-        if not any(key in entities for key in ["min_cleanliness", "min_comfort", "min_staff", "min_value"]):
-            rating_patterns = [
-                (r'(?:rating|rated|ratng)\s+(?:of\s+)?([\d.]+)', 0.95),  # 'ratng' typo support
-                (r'with\s+(?:rating|ratng)\s+([\d.]+)', 0.95),
-                (r'(?:rating|ratng)\s+(?:above|more than|at least)\s+([\d.]+)', 0.9),
-            ]
-            for pattern, pattern_conf in rating_patterns:
-                match = re.search(pattern, query_lower)
+        if "rat" in triggers and not any(key in entities for key in ["min_cleanliness", "min_comfort", "min_staff", "min_value"]):
+            for pattern, pattern_conf in self._RATING_PATTERNS:
+                match = pattern.search(query_lower)
                 if match:
                     # Skip if quality dimension keywords are present
-                    if any(word in query_lower for word in ['staff', 'service', 'friendly', 'cleanliness', 'clean', 'comfort', 'value', 'affordable']):
+                    if not triggers.isdisjoint(self._RATING_BLOCKERS):
                         continue
                     try:
                         rating_value = float(match.group(1))
@@ -386,177 +1133,90 @@ class EntityExtractor:
         Returns:
             Dictionary of extracted entities
         """
-        # Route to intent-specific extraction
-        extractors = {
-            "HotelSearch": self._extract_hotel_search_llm,
-            "HotelRecommendation": self._extract_hotel_recommendation_llm,
-            "ReviewLookup": self._extract_review_lookup_llm,
-            "VisaQuestion": self._extract_visa_question_llm,
-            "AmenityFilter": self._extract_amenity_filter_llm,
-            "GeneralQuestionAnswering": self._extract_general_qa_llm,
-        }
-        
-        extractor_func = extractors.get(intent)
-        if not extractor_func:
+        request = self._build_llm_request(query, intent, hint_entities, hint_confidence)
+        if request is None:
             # Fallback for unknown intents
             return {}
         
         try:
-            return extractor_func(query, hint_entities, hint_confidence)
+            return self._call_llm_structured(*request)
         except Exception as e:
+            self._state.llm_failed = True
             if self.debug:
                 print(f"DEBUG - LLM extraction failed for {intent}: {e}")
             return {}
     
-    def _extract_hotel_search_llm(self, query: str, hints: Dict = None, confidence: float = None) -> Dict:
-        """Extract entities for HotelSearch intent"""
+    def _build_llm_request(self, query: str, intent: str, hint_entities: Dict[str, Any] = None, hint_confidence: float = None) -> Optional[Tuple[str, Dict]]:
+        """
+        Route to the intent-specific prompt builder.
+        
+        Args:
+            query: User query string
+            intent: Classified intent
+            hint_entities: Optional entities extracted from rules
+            hint_confidence: Optional confidence score from rules
+            
+        Returns:
+            Tuple of (prompt, schema), or None if the intent has no LLM extractor
+        """
+        # Route to intent-specific extraction
+        builder = getattr(self, self._EXTRACTORS.get(intent, ""), None)
+        if not builder:
+            return None
+        return builder(query, hint_entities, hint_confidence)
+    
+    def _build_hotel_search_request(self, query: str, hints: Dict = None, confidence: float = None) -> Tuple[str, Dict]:
+        """Build LLM prompt and schema for HotelSearch intent"""
         hint_text = self._build_hint_text(hints, confidence) if hints else ""
         
-        prompt = f'''Extract location and filters from: "{query}"{hint_text}
-
-Return JSON with:
-- city: city name if mentioned (e.g., "Paris", "London")
-- country: country name if no city specified
-- min_rating: minimum rating if mentioned (e.g., "above 4.5" → 4.5)
-- star_rating: star rating if mentioned (e.g., "5 star" → 5)
-- limit: number of results if specified
-
-Use null for missing values.'''
-
-        schema = {
-            "city": "string or null",
-            "country": "string or null",
-            "min_rating": "number or null",
-            "star_rating": "number or null",
-            "limit": "number or null"
-        }
+        prompt = self._render_llm_prompt("HotelSearch", query, hint_text)
         
-        return self._call_llm_structured(prompt, schema)
+        return prompt, self._LLM_SCHEMAS["HotelSearch"]
     
-    def _extract_hotel_recommendation_llm(self, query: str, hints: Dict = None, confidence: float = None) -> Dict:
-        """Extract entities for HotelRecommendation intent"""
+    def _build_hotel_recommendation_request(self, query: str, hints: Dict = None, confidence: float = None) -> Tuple[str, Dict]:
+        """Build LLM prompt and schema for HotelRecommendation intent"""
         hint_text = self._build_hint_text(hints, confidence) if hints else ""
         
-        prompt = f'''Extract traveler preferences from: "{query}"{hint_text}
-
-Return JSON with:
-- traveller_type: "Family", "Couple", "Solo", "Business", or "Group" if mentioned
-  (e.g., "honeymoon" → "Couple", "family trip" → "Family")
-- reference_hotel: hotel name if asking for similar hotels
-- from_country: country name if asking about travelers from a specific country
-- city: city name if mentioned
-- min_cleanliness/min_comfort/min_value: scores if quality mentioned (default 7.5 if just keyword)
-
-Use null for missing values.'''
-
-        schema = {
-            "traveller_type": "string or null",
-            "reference_hotel": "string or null",
-            "from_country": "string or null",
-            "min_cleanliness": "number or null",
-            "min_comfort": "number or null",
-            "min_value": "number or null",
-            "city": "string or null"
-        }
+        prompt = self._render_llm_prompt("HotelRecommendation", query, hint_text)
         
-        return self._call_llm_structured(prompt, schema)
+        return prompt, self._LLM_SCHEMAS["HotelRecommendation"]
     
-    def _extract_review_lookup_llm(self, query: str, hints: Dict = None, confidence: float = None) -> Dict:
-        """Extract entities for ReviewLookup intent"""
+    def _build_review_lookup_request(self, query: str, hints: Dict = None, confidence: float = None) -> Tuple[str, Dict]:
+        """Build LLM prompt and schema for ReviewLookup intent"""
         hint_text = self._build_hint_text(hints, confidence) if hints else ""
         
-        prompt = f'''Extract hotel name from: "{query}"{hint_text}
-
-Return JSON with:
-- hotel_name: name of the hotel if mentioned
-
-Use null if no specific hotel mentioned.'''
-
-        schema = {"hotel_name": "string or null"}
-        return self._call_llm_structured(prompt, schema)
+        prompt = self._render_llm_prompt("ReviewLookup", query, hint_text)
+        
+        return prompt, self._LLM_SCHEMAS["ReviewLookup"]
     
-    def _extract_visa_question_llm(self, query: str, hints: Dict = None, confidence: float = None) -> Dict:
-        """Extract entities for VisaQuestion intent"""
+    def _build_visa_question_request(self, query: str, hints: Dict = None, confidence: float = None) -> Tuple[str, Dict]:
+        """Build LLM prompt and schema for VisaQuestion intent"""
         hint_text = self._build_hint_text(hints, confidence) if hints else ""
         
-        prompt = f'''Extract visa-related countries from: "{query}"{hint_text}
-
-Return JSON with:
-- from_country: origin country (where person is from)
-- to_country: destination country (where person wants to go)
-
-Examples:
-- "visa from USA to France" → from_country: "United States", to_country: "France"
-- "do Americans need visa for Japan" → from_country: "United States", to_country: "Japan"
-
-Use null for missing values.'''
-
-        schema = {
-            "from_country": "string or null",
-            "to_country": "string or null"
-        }
+        prompt = self._render_llm_prompt("VisaQuestion", query, hint_text)
         
-        return self._call_llm_structured(prompt, schema)
+        return prompt, self._LLM_SCHEMAS["VisaQuestion"]
     
-    def _extract_amenity_filter_llm(self, query: str, hints: Dict = None, confidence: float = None) -> Dict:
-        """Extract entities for AmenityFilter intent"""
+    def _build_amenity_filter_request(self, query: str, hints: Dict = None, confidence: float = None) -> Tuple[str, Dict]:
+        """Build LLM prompt and schema for AmenityFilter intent"""
         hint_text = self._build_hint_text(hints, confidence) if hints else ""
         
-        prompt = f'''Extract quality scores and filters from: "{query}"{hint_text}
-
-Return JSON with quality scores (extract actual numbers or use 7.5 for keywords):
-- min_cleanliness: if "clean" or "cleanliness" mentioned
-- min_comfort: if "comfort" or "comfortable" mentioned  
-- min_staff: if "staff" or "service" mentioned
-- min_value: if "value" or "affordable" mentioned
-- city: city name if specified
-- reference_hotel: hotel name if comparing to another hotel
-
-Use null for missing values.'''
-
-        schema = {
-            "city": "string or null",
-            "min_cleanliness": "number or null",
-            "min_comfort": "number or null",
-            "min_value": "number or null",
-            "min_staff": "number or null",
-            "reference_hotel": "string or null"
-        }
+        prompt = self._render_llm_prompt("AmenityFilter", query, hint_text)
         
-        return self._call_llm_structured(prompt, schema)
+        return prompt, self._LLM_SCHEMAS["AmenityFilter"]
     
-    def _extract_general_qa_llm(self, query: str, hints: Dict = None, confidence: float = None) -> Dict:
-        """Extract entities for GeneralQuestionAnswering intent"""
+    def _build_general_qa_request(self, query: str, hints: Dict = None, confidence: float = None) -> Tuple[str, Dict]:
+        """Build LLM prompt and schema for GeneralQuestionAnswering intent"""
         hint_text = self._build_hint_text(hints, confidence) if hints else ""
         
-        prompt = f'''Extract any relevant entities from: "{query}"{hint_text}
-
-Return JSON (use null for missing):
-- city/country: location if mentioned
-- from_country: if asking about travelers from a country
-- traveller_type: if asking about specific traveler types
-- balanced: true if asking about balanced/consistent scores across dimensions
-- is_trending: true if asking about improving/trending hotels
-- reference_hotel: hotel name if mentioned
-- min_cleanliness/min_comfort/min_staff/min_value: quality scores if mentioned
-
-Use null for missing values.'''
-
-        schema = {
-            "city": "string or null",
-            "country": "string or null",
-            "from_country": "string or null",
-            "traveller_type": "string or null",
-            "balanced": "boolean or null",
-            "is_trending": "boolean or null",
-            "reference_hotel": "string or null",
-            "min_cleanliness": "number or null",
-            "min_comfort": "number or null",
-            "min_staff": "number or null",
-            "min_value": "number or null"
-        }
+        prompt = self._render_llm_prompt("GeneralQuestionAnswering", query, hint_text)
         
-        return self._call_llm_structured(prompt, schema)
+        return prompt, self._LLM_SCHEMAS["GeneralQuestionAnswering"]
+    
+    def _render_llm_prompt(self, intent: str, query: str, hint_text: str) -> str:
+        """Fill the query and rule hints into the intent's extraction prompt"""
+        lead, fields = self._LLM_PROMPTS[intent]
+        return lead + ' from: "' + query + '"' + hint_text + "\n\n" + fields
     
     def _build_hint_text(self, hints: Dict, confidence: float) -> str:
         """Build hint text from rule-based extraction"""
@@ -568,90 +1228,253 @@ Use null for missing values.'''
     def _call_llm_structured(self, prompt: str, schema: Dict) -> Dict:
         """Call LLM with structured output"""
         try:
-            result = self.llm_client.generate_structured(prompt, schema, temperature=0.0)
+            result = self._generate_structured(prompt, schema)
             if self.debug:
                 print(f"DEBUG - LLM extracted: {result}")
             return result if result else {}
         except Exception as e:
+            self._state.llm_failed = True  # Don't cache a result degraded by this failure
             if self.debug:
                 print(f"DEBUG - LLM call failed: {e}")
             return {}
     
+    def get_extraction_model(self) -> str:
+        """Model structured extraction calls go to first (follows the client if none is configured)"""
+        return self.extraction_model or self.llm_client.model
+    
+    def _generate_structured(self, prompt: str, schema: Dict) -> Dict:
+        """Structured call on the extraction model, retried once on the client's model if it fails"""
+        model = self.get_extraction_model()
+        try:
+            return self.llm_client.generate_structured(prompt, schema, temperature=0.0, model=model)
+        except Exception as e:
+            if model == self.llm_client.model:
+                raise
+            if self.debug:
+                print(f"DEBUG - Extraction model {model} failed ({e}), retrying on {self.llm_client.model}")
+        return self.llm_client.generate_structured(prompt, schema, temperature=0.0)
+    
+    async def _agenerate_structured(self, prompt: str, schema: Dict) -> Dict:
+        """Async variant of _generate_structured()"""
+        model = self.get_extraction_model()
+        try:
+            return await self.llm_client.agenerate_structured(prompt, schema, temperature=0.0, model=model)
+        except Exception as e:
+            if model == self.llm_client.model:
+                raise
+            if self.debug:
+                print(f"DEBUG - Extraction model {model} failed ({e}), retrying on {self.llm_client.model}")
+        return await self.llm_client.agenerate_structured(prompt, schema, temperature=0.0)
+    
+    def _call_llm_structured_group(self, intent: str, items: List[Tuple]) -> List[Dict]:
+        """
+        Run the extraction for several queries of one intent in a single LLM
+        call. The intent's field instructions and schema are stated once and
+        the queries follow as a numbered list.
+        
+        Args:
+            intent: Intent shared by all items
+            items: List of (index, query, rule_entities, confidence, (prompt, schema)) tuples
+            
+        Returns:
+            List of entity dicts aligned with items (falls back to one call
+            per query if the batched response cannot be used)
+        """
+        requests = [request for _, _, _, _, request in items]
+        if len(items) == 1:
+            return [self._call_llm_structured(*requests[0])]
+        
+        fields, schema = self.llm_field_guide(intent)
+        lines = []
+        for n, (_, query, rule_entities, confidence, _) in enumerate(items, 1):
+            hint = ""
+            if confidence >= 0.5 and rule_entities:
+                hints_str = ", ".join(f"{k}={v}" for k, v in rule_entities.items())
+                hint = f" (hint from rules, {confidence:.0%} confidence: {hints_str})"
+            lines.append(f'[{n}] "{query}"{hint}')
+        
+        batch_prompt = (
+            f"Extract entities from each numbered query below.\n\n{fields}\n\n"
+            f"JSON schema per query:\n{json.dumps(schema)}\n\n"
+            "Queries:\n" + "\n".join(lines)
+            + f'\n\nRespond ONLY with JSON: {{"results": [...]}} holding exactly {len(items)} objects, one per query in order.'
+        )
+        
+        try:
+            parsed = self.llm_client.generate_json(
+                batch_prompt, temperature=0.0, max_tokens=120 * len(items), model=self.get_extraction_model()
+            )
+            problem = self._batch_problem(parsed, len(items))
+            if problem is not None:
+                # Malformed batch: one retry that says what was wrong is cheaper than len(items) calls
+                if self.debug:
+                    print(f"DEBUG - Batched LLM response unusable ({problem}), retrying with feedback")
+                retry_prompt = (
+                    f"{batch_prompt}\n\nYour previous response {problem}. "
+                    f'Return exactly {len(items)} objects in "results", one per numbered query.'
+                )
+                parsed = self.llm_client.generate_json(
+                    retry_prompt, temperature=0.0, max_tokens=120 * len(items), model=self.get_extraction_model()
+                )
+        except Exception as e:
+            if self.debug:
+                print(f"DEBUG - Batched LLM call failed: {e}")
+            parsed = None
+        
+        if self._batch_problem(parsed, len(items)) is not None:
+            # Batch response unusable - fall back to one call per query
+            return [self._call_llm_structured(*request) for request in requests]
+        if isinstance(parsed, dict):
+            parsed = parsed["results"]
+        
+        results = []
+        for item in parsed:
+            entities = {key: None for key in schema.keys()}
+            if isinstance(item, dict):
+                entities.update(item)
+            results.append(entities)
+        
+        if self.debug:
+            print(f"DEBUG - LLM batch extracted ({intent}): {results}")
+        return results
+    
+    @staticmethod
+    def _batch_problem(parsed: Any, expected: int) -> Optional[str]:
+        """
+        Check a batched extraction response
+        
+        Args:
+            parsed: Parsed JSON from the LLM ({"results": [...]} or a bare list)
+            expected: Number of queries in the batch
+            
+        Returns:
+            Description of what is wrong (used as retry feedback), or None if usable
+        """
+        if parsed is None:
+            return "was not valid JSON"
+        results = parsed.get("results") if isinstance(parsed, dict) else parsed
+        if not isinstance(results, list):
+            return 'had no "results" array'
+        if len(results) != expected:
+            return f"had {len(results)} results for {expected} queries"
+        return None
+    
     def _validate_entities(self, entities: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and normalize extracted entities"""
         validated = {}
         
-        for key, value in entities.items():
-            if value is None or value == "null" or value == "":
-                continue
-            
-            # Normalize traveller type
-            if key == "traveller_type":
-                value = str(value).capitalize()
-                # Handle plural forms
-                if value == "Families":
-                    value = "Family"
-                elif value == "Couples":
-                    value = "Couple"
-                elif value == "Solos":
-                    value = "Solo"
-                # Handle "solo travelers" -> "Solo"
-                if "solo" in value.lower():
-                    value = "Solo"
-                elif "couple" in value.lower():
-                    value = "Couple"
-                elif "famil" in value.lower():
-                    value = "Family"
-                elif "business" in value.lower():
-                    value = "Business"
-                elif "group" in value.lower():
-                    value = "Group"
-                if value in self.TRAVELLER_TYPES:
+        # Fuzzy lookups for all names in this pass, one cdist call per vocabulary
+        self._state.partial_matches = self._batch_partial_matches(entities)
+        try:
+            for key, value in entities.items():
+                if value is None or value in ("", "null"):
+                    continue
+                
+                # Per-key normalizer; other string fields just get whitespace cleaned
+                value = self._validators.get(key, self._validate_string)(value)
+                if value is not None:
                     validated[key] = value
-            
-            # Convert numeric fields (including new ones for TrendAnalysis)
-            elif key in ["min_rating", "star_rating", "min_cleanliness", "min_comfort", 
-                        "min_value", "min_staff", "min_location", "min_facilities",
-                        "min_recent_score", "min_improvement", "min_value_score"]:
-                try:
-                    validated[key] = float(value)
-                except (ValueError, TypeError):
-                    pass
-            
-            # Convert limit to int
-            elif key == "limit":
-                try:
-                    validated[key] = int(value)
-                except (ValueError, TypeError):
-                    validated[key] = 10  # Default
-            
-            # Validate and normalize city names
-            elif key == "city":
-                normalized_city = self._normalize_city(str(value).strip())
-                if normalized_city:
-                    validated[key] = normalized_city
-            
-            # Validate and normalize country names
-            elif key in ["country", "from_country", "to_country"]:
-                normalized_country = self._normalize_country(str(value).strip())
-                if normalized_country:
-                    validated[key] = normalized_country
-            
-            # Hotel names and reference hotels - validate against known hotels
-            elif key in ["hotel_name", "reference_hotel"]:
-                normalized_hotel = self._normalize_hotel_name(str(value).strip())
-                if normalized_hotel:
-                    validated[key] = normalized_hotel
-                else:
-                    # If normalization fails, keep the original (fuzzy matching may not work offline)
-                    validated[key] = str(value).strip()
-            
-            # Other string fields - just clean whitespace
-            else:
-                validated[key] = str(value).strip()
+        finally:
+            self._state.partial_matches = None
         
         return validated
     
+    def _batch_partial_matches(self, entities: Dict[str, Any]) -> Optional[Dict[Tuple[int, str], Optional[str]]]:
+        """
+        Precompute the _partial_match results of a validate pass. Names that miss
+        the exact lookups are scored against their vocabulary in one
+        rapidfuzz.process.cdist call (e.g. from_country and to_country together),
+        instead of one extractOne scan each. Same rule as _partial_match:
+        partial_ratio of 100 (containment), first option on ties.
+        
+        Args:
+            entities: Raw entities about to be validated
+            
+        Returns:
+            {(id(options_lower), value_lower): match or None}, or None if nothing to batch
+        """
+        if fuzz_process is None:
+            return None
+        
+        pending: Dict[int, Tuple[tuple, List[str], List[str]]] = {}
+        for key, value in entities.items():
+            if not isinstance(value, str) or not value.strip():
+                continue
+            value_lower = value.lower().strip()
+            if key == "city":
+                if value_lower in self._CITY_EXACT or len(value_lower) < self.PARTIAL_MATCH_MIN_LENGTH:
+                    continue
+                vocab = (self._CITY_LOWER, self.VALID_CITIES)
+            elif key in ("country", "from_country", "to_country"):
+                if value_lower in self._COUNTRY_EXACT or len(value_lower) < self.PARTIAL_MATCH_MIN_LENGTH:
+                    continue
+                vocab = (self._COUNTRY_LOWER, self.VALID_COUNTRIES)
+            elif key in ("hotel_name", "reference_hotel") and EntityExtractor.VALID_HOTELS:
+                if self._hotel_trigram_index() is not None:
+                    continue  # Large list: each name is checked against its trigram shortlist instead
+                _, by_lower, by_no_the, hotels_lower = self._hotel_lookup()
+                if value_lower in by_lower or value_lower.replace("the ", "").strip() in by_no_the:
+                    continue
+                vocab = (hotels_lower, EntityExtractor.VALID_HOTELS)
+            else:
+                continue
+            entry = pending.setdefault(id(vocab[0]), (*vocab, []))
+            if value_lower not in entry[2]:
+                entry[2].append(value_lower)
+        
+        matches: Dict[Tuple[int, str], Optional[str]] = {}
+        for vocab_id, (options_lower, options, queries) in pending.items():
+            if len(queries) < 2 or not options_lower:
+                continue  # A single lookup is no cheaper batched
+            scores = fuzz_process.cdist(
+                queries, options_lower, scorer=fuzz.partial_ratio, score_cutoff=100, dtype=np.float64
+            )
+            # First containing option per row (same choice as extractOne)
+            best = scores.argmax(axis=1)
+            for row, query in enumerate(queries):
+                matches[(vocab_id, query)] = options[best[row]] if scores[row, best[row]] >= 100 else None
+        return matches or None
+    
+    def _validate_traveller_type(self, value: Any) -> Optional[str]:
+        """Map traveller type variants ("families", "solo travelers") to TRAVELLER_TYPES"""
+        value_lower = str(value).lower()
+        for marker, traveller_type in self._TRAVELLER_MARKERS:
+            if marker in value_lower:
+                return traveller_type
+        return None
+    
+    def _validate_number(self, value: Any) -> Optional[float]:
+        """Convert numeric fields (ratings and score thresholds) to float"""
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return None
+    
+    def _validate_limit(self, value: Any) -> int:
+        """Convert limit to int"""
+        try:
+            return int(value)
+        except (ValueError, TypeError):
+            return 10  # Default
+    
+    def _validate_city(self, value: Any) -> Optional[str]:
+        """Validate and normalize city names"""
+        return self._normalize_city(str(value).strip())
+    
+    def _validate_country(self, value: Any) -> Optional[str]:
+        """Validate and normalize country names"""
+        return self._normalize_country(str(value).strip())
+    
+    def _validate_hotel_name(self, value: Any) -> str:
+        """Hotel names and reference hotels - validate against known hotels"""
+        value = str(value).strip()
+        # If normalization fails, keep the original (fuzzy matching may not work offline)
+        return self._normalize_hotel_name(value) or value
+    
+    def _validate_string(self, value: Any) -> str:
+        """Other string fields - just clean whitespace"""
+        return str(value).strip()
+    
     def _normalize_city(self, city_input: str) -> Optional[str]:
         """
         Normalize city name to match valid cities from database.
@@ -669,16 +1492,15 @@ Use null for missing values.'''
         city_lower = city_input.lower().strip()
         
         # Exact match (case-insensitive)
-        for valid_city in self.VALID_CITIES:
-            if city_lower == valid_city.lower():
-                return valid_city
+        exact = self._CITY_EXACT.get(city_lower)
+        if exact is not None:
+            return exact
         
-        # Fuzzy match: check if input is contained in valid city or vice versa
-        for valid_city in self.VALID_CITIES:
-            valid_lower = valid_city.lower()
-            # Handle common patterns: "new york" matches "New York", "rio" matches "Rio de Janeiro"
-            if city_lower in valid_lower or valid_lower in city_lower:
-                return valid_city
+        # Containment: "new york city" -> "New York", "buenos" -> "Buenos Aires"
+        if len(city_lower) >= self.PARTIAL_MATCH_MIN_LENGTH:
+            partial = self._partial_match(city_lower, self._CITY_LOWER, self.VALID_CITIES)
+            if partial is not None:
+                return partial
         
         # Check for potential typos using edit distance + LLM validation
         closest_match = self._find_closest_match_with_llm(city_input, self.VALID_CITIES, "city")
@@ -704,39 +1526,53 @@ Use null for missing values.'''
         
         country_lower = country_input.lower().strip()
         
-        # Exact match (case-insensitive)
-        for valid_country in self.VALID_COUNTRIES:
-            if country_lower == valid_country.lower():
-                return valid_country
+        # Exact match or alias (case-insensitive)
+        exact = self._COUNTRY_EXACT.get(country_lower)
+        if exact is not None:
+            return exact
         
-        # Fuzzy match: check if input is contained in valid country or vice versa
-        for valid_country in self.VALID_COUNTRIES:
-            valid_lower = valid_country.lower()
-            if country_lower in valid_lower or valid_lower in country_lower:
-                return valid_country
+        # Containment: input contained in a valid country (or vice versa); close
+        # spellings ("Austria" vs "Australia") are left to the typo check below
+        if len(country_lower) >= self.PARTIAL_MATCH_MIN_LENGTH:
+            partial = self._partial_match(country_lower, self._COUNTRY_LOWER, self.VALID_COUNTRIES)
+            if partial is not None:
+                return partial
         
         # Check for potential typos using edit distance + LLM validation
         closest_match = self._find_closest_match_with_llm(country_input, self.VALID_COUNTRIES, "country")
         if closest_match:
             return closest_match
         
-        # Common aliases
-        aliases = {
-            "usa": "United States",
-            "america": "United States",
-            "us": "United States",
-            "uk": "United Kingdom",
-            "uae": "United Arab Emirates",
-            "korea": "South Korea",
-            "south korea": "South Korea"
-        }
-        
-        if country_lower in aliases:
-            return aliases[country_lower]
-        
         # No match found - return title case version as fallback
         return country_input.title()
     
+    def _partial_match(self, value_lower: str, options_lower: Tuple[str, ...], options: List[str]) -> Optional[str]:
+        """
+        Match a value that is not an exact option but one contains the other.
+        Uses RapidFuzz partial_ratio (100 means the shorter string occurs
+        verbatim in the longer one) when installed, else a plain containment scan.
+        
+        Args:
+            value_lower: Lowercase user value
+            options_lower: Lowercase options, aligned with options
+            options: Canonical options
+            
+        Returns:
+            First canonical option in list order that matches, or None
+        """
+        batched = getattr(self._state, "partial_matches", None)
+        if batched is not None and (id(options_lower), value_lower) in batched:
+            return batched[(id(options_lower), value_lower)]
+        
+        if fuzz_process is not None:
+            match = fuzz_process.extractOne(value_lower, options_lower, scorer=fuzz.partial_ratio, score_cutoff=100)
+            return options[match[2]] if match else None
+        
+        for valid_lower, option in zip(options_lower, options):
+            if value_lower in valid_lower or valid_lower in value_lower:
+                return option
+        return None
+    
     def _normalize_hotel_name(self, hotel_input: str) -> Optional[str]:
         """
         Normalize hotel name to match valid hotels from database.
@@ -755,23 +1591,29 @@ Use null for missing values.'''
         
         # If we have hotel list loaded, try to match against it
         if EntityExtractor.VALID_HOTELS and len(EntityExtractor.VALID_HOTELS) > 0:
+            _, by_lower, by_no_the, hotels_lower = self._hotel_lookup()
+            
             # Exact match (case-insensitive)
-            for valid_hotel in EntityExtractor.VALID_HOTELS:
-                if hotel_lower == valid_hotel.lower():
-                    return valid_hotel
+            if hotel_lower in by_lower:
+                return by_lower[hotel_lower]
             
             # Fuzzy match: remove "the" from both and compare
             hotel_no_the = hotel_lower.replace("the ", "").strip()
-            for valid_hotel in EntityExtractor.VALID_HOTELS:
-                valid_no_the = valid_hotel.lower().replace("the ", "").strip()
-                if hotel_no_the == valid_no_the:
-                    return valid_hotel
+            if hotel_no_the in by_no_the:
+                return by_no_the[hotel_no_the]
             
-            # Substring match (handles partial names)
-            for valid_hotel in EntityExtractor.VALID_HOTELS:
-                valid_lower = valid_hotel.lower()
-                if hotel_lower in valid_lower or valid_lower in hotel_lower:
-                    return valid_hotel
+            # Substring match (handles partial names); a partial_ratio of 100 means
+            # the shorter name occurs verbatim in the longer one
+            hotels = EntityExtractor.VALID_HOTELS
+            trigram_index = self._hotel_trigram_index()
+            if trigram_index is not None:
+                # Only names sharing all of the shorter string's trigrams can match
+                candidates = trigram_index.containment_candidates(hotel_lower)
+                hotels_lower = tuple(hotels_lower[i] for i in candidates)
+                hotels = [hotels[i] for i in candidates]
+            partial = self._partial_match(hotel_lower, hotels_lower, hotels)
+            if partial is not None:
+                return partial
             
             # If still no match, use fuzzy matching with LLM for typo correction
             closest_match = self._find_closest_match_with_llm(hotel_input, EntityExtractor.VALID_HOTELS, "hotel")
@@ -781,10 +1623,67 @@ Use null for missing values.'''
         # No match found or hotel list not loaded - return original as title case
         return hotel_input.title()
     
+    def _hotel_lookup(self) -> Tuple[List[str], Dict[str, str], Dict[str, str], Tuple[str, ...]]:
+        """
+        Get the hotel name lookups, rebuilding them if VALID_HOTELS was replaced
+        
+        Returns:
+            (hotels, lowercase -> name, lowercase without "the " -> name, lowercase names);
+            the first hotel wins when two names collide
+        """
+        hotels = EntityExtractor.VALID_HOTELS
+        cached = EntityExtractor._HOTEL_LOOKUP
+        if cached is None or cached[0] is not hotels:
+            by_lower: Dict[str, str] = {}
+            by_no_the: Dict[str, str] = {}
+            for hotel in hotels:
+                hotel_lower = hotel.lower()
+                by_lower.setdefault(hotel_lower, hotel)
+                by_no_the.setdefault(hotel_lower.replace("the ", "").strip(), hotel)
+            cached = (hotels, by_lower, by_no_the, tuple(hotel.lower() for hotel in hotels))
+            EntityExtractor._HOTEL_LOOKUP = cached
+        return cached
+    
+    def _hotel_trigram_index(self) -> Optional[TrigramIndex]:
+        """
+        Get the trigram index over VALID_HOTELS, rebuilding it if the list was replaced
+        
+        Returns:
+            TrigramIndex (positions in VALID_HOTELS), or None below TRIGRAM_INDEX_MIN_OPTIONS hotels
+        """
+        hotels = EntityExtractor.VALID_HOTELS
+        cached = EntityExtractor._HOTEL_TRIGRAMS
+        if cached is None or cached[0] is not hotels:
+            index = None
+            if len(hotels) >= self.TRIGRAM_INDEX_MIN_OPTIONS:
+                index = TrigramIndex(self._hotel_lookup()[3])
+            cached = (hotels, index)
+            EntityExtractor._HOTEL_TRIGRAMS = cached
+        return cached[1]
+    
+    def _fuzzy_index_for(self, valid_options: List[str], entity_type: str) -> FuzzyIndex:
+        """
+        Get the local typo index for a vocabulary, rebuilding it if the list changed
+        (VALID_HOTELS is replaced wholesale when reloaded from the database)
+        
+        Args:
+            valid_options: List of valid values
+            entity_type: 'city', 'country' or 'hotel'
+            
+        Returns:
+            FuzzyIndex over valid_options
+        """
+        cached = EntityExtractor._FUZZY_INDEXES.get(entity_type)
+        if cached is None or cached[0] is not valid_options:
+            cached = (valid_options, FuzzyIndex(valid_options))
+            EntityExtractor._FUZZY_INDEXES[entity_type] = cached
+        return cached[1]
+    
     def _find_closest_match_with_llm(self, user_input: str, valid_options: List[str], entity_type: str) -> Optional[str]:
         """
         Find closest match for potential typo using edit distance + LLM validation.
-        Only calls LLM when edit distance suggests a likely typo.
+        Small edit distances to a single candidate are corrected locally via
+        FuzzyIndex; the LLM is only consulted for looser similarity matches.
         
         Args:
             user_input: User's input (potentially misspelled)
@@ -795,19 +1694,38 @@ Use null for missing values.'''
             Corrected value if LLM confirms typo, None otherwise
         """
         user_lower = user_input.lower().strip()
+        if not valid_options:
+            return None
         
-        # Find closest matches by edit distance
-        matches_with_distance = []
-        for valid_option in valid_options:
-            # Calculate similarity ratio (0.0 to 1.0)
-            similarity = difflib.SequenceMatcher(None, user_lower, valid_option.lower()).ratio()
-            matches_with_distance.append((valid_option, similarity))
-        
-        # Sort by similarity (highest first)
-        matches_with_distance.sort(key=lambda x: x[1], reverse=True)
+        # Unambiguous near-miss (e.g. "Paaris", "Canda") - no LLM round-trip needed
+        local_match = self._fuzzy_index_for(valid_options, entity_type).lookup(user_lower)
+        if local_match:
+            if self.debug:
+                print(f"Typo corrected locally: '{user_input}' -> '{local_match}'")
+            return local_match
+        
+        # Large hotel lists: only score names sharing trigrams with the input
+        if entity_type == "hotel" and valid_options is EntityExtractor.VALID_HOTELS:
+            trigram_index = self._hotel_trigram_index()
+            if trigram_index is not None:
+                shortlist = trigram_index.shortlist(user_lower)
+                if shortlist:
+                    valid_options = [valid_options[i] for i in shortlist]
+        
+        # Find closest match by similarity ratio (0.0 to 1.0)
+        if fuzz_process is not None:
+            best_match, score, _ = fuzz_process.extractOne(
+                user_lower, valid_options, scorer=fuzz.ratio, processor=str.lower
+            )
+            best_similarity = score / 100.0
+        else:
+            best_match, best_similarity = max(
+                ((valid_option, difflib.SequenceMatcher(None, user_lower, valid_option.lower()).ratio())
+                 for valid_option in valid_options),
+                key=lambda x: x[1]
+            )
         
         # If best match has high similarity (0.7-0.95), it's likely a typo
-        best_match, best_similarity = matches_with_distance[0]
         
         # Perfect match already handled by earlier checks
         if best_similarity >= 0.95:
@@ -849,7 +1767,7 @@ Your answer (yes/no):'''
             
             # Use LLM client to generate response
             response = self.llm_client._client.chat.completions.create(
-                model=self.llm_client._model,
+                model=self.get_extraction_model(),  # Result is cached under this model's key
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.0,  # Deterministic
                 max_tokens=50  # Increased from 10 to allow full response
@@ -885,6 +1803,7 @@ Your answer (yes/no):'''
                 return None
                 
         except Exception as e:
+            self._state.llm_failed = True
             if self.debug:
                 print(f"LLM typo validation failed: {e}")
             # On error, be conservative and don't correct
@@ -906,60 +1825,24 @@ Your answer (yes/no):'''
         
         country_lower = country_input.lower().strip()
         
-        # Nationality adjectives to country names
-        nationality_map = {
-            "american": "United States",
-            "americans": "United States",
-            "british": "United Kingdom",
-            "french": "France",
-            "japanese": "Japan",
-            "german": "Germany",
-            "canadian": "Canada",
-            "canadians": "Canada",
-            "australian": "Australia",
-            "australians": "Australia",
-            "spanish": "Spain",
-            "italian": "Italy",
-            "chinese": "China",
-            "mexican": "Mexico",
-            "indian": "India",
-            "brazilian": "Brazil",
-            "russian": "Russia",
-            "egyptian": "Egypt",
-            "thai": "Thailand",
-            "turkish": "Turkey",
-            "dutch": "Netherlands",
-            "korean": "South Korea",
-            "south korean": "South Korea",
-            "emirati": "United Arab Emirates",
-            "singaporean": "Singapore",
-        }
-        
-        if country_lower in nationality_map:
-            return nationality_map[country_lower]
-        
-        # Common country name variations and abbreviations
-        country_aliases = {
-            "usa": "United States",
-            "us": "United States",
-            "america": "United States",
-            "uk": "United Kingdom",
-            "uae": "United Arab Emirates",
-            "korea": "South Korea",
-        }
-        
-        if country_lower in country_aliases:
-            return country_aliases[country_lower]
-        
-        # Check against valid countries
-        for valid_country in self.VALID_COUNTRIES:
-            if country_lower == valid_country.lower():
-                return valid_country
+        # Nationality, abbreviation or valid country (case-insensitive), then its plural
+        country = self._COUNTRY_ALIAS_MAP.get(country_lower)
+        if country is None and country_lower.endswith("s"):
+            country = self._COUNTRY_ALIAS_MAP.get(country_lower[:-1])
+        if country is not None:
+            return country
         
         # Return title case as fallback
         return country_input.title()
 
 
+# Convenience function for shared access
+@lru_cache(maxsize=1)
+def get_entity_extractor() -> EntityExtractor:
+    """Get a process-wide shared EntityExtractor instance (created on first use)"""
+    return EntityExtractor(llm_client=get_llm_client())
+
+
 if __name__ == "__main__":
     # Test entity extractor
     extractor = EntityExtractor(debug=True)  # Enable debug mode
@@ -0,0 +1,237 @@
+"""
+Fuzzy Index for Entity Typo Correction
+Local edit-distance lookup over closed vocabularies (cities, countries, hotels)
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Set
+
+
+def char_masks(word: str) -> Dict[str, int]:
+    """
+    Per-character match bitmasks for the bit-parallel distance: bit i of
+    masks[c] is set when word[i] == c
+
+    Args:
+        word: Pattern string
+
+    Returns:
+        Dictionary mapping each character to its position bitmask
+    """
+    masks: Dict[str, int] = {}
+    bit = 1
+    for char in word:
+        masks[char] = masks.get(char, 0) | bit
+        bit <<= 1
+    return masks
+
+
+def osa_distance_bp(masks: Dict[str, int], length: int, text: str, max_distance: Optional[int] = None) -> int:
+    """
+    Hyyro's bit-vector edit distance with adjacent transpositions (optimal
+    string alignment). The whole DP column for the pattern is packed into an
+    integer, so each character of text costs a handful of AND/OR/add ops
+    instead of a row of cell updates.
+
+    Args:
+        masks: char_masks() of the pattern
+        length: Length of the pattern
+        text: String to compare against the pattern
+        max_distance: Optional bound k; once the distance provably exceeds it
+            the scan stops and k + 1 is returned
+
+    Returns:
+        Edit distance between the pattern and text (k + 1 if it exceeds max_distance)
+    """
+    if max_distance is not None and abs(length - len(text)) > max_distance:
+        return max_distance + 1  # Length gap alone needs more than k edits
+    if not length:
+        return len(text)
+
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    vp, vn, d0, prev_pm = full, 0, 0, 0
+    dist = length
+    get = masks.get
+    # Each remaining text character can lower the distance by at most one,
+    # so stop once dist - remaining > k
+    remaining = len(text)
+    for char in text:
+        remaining -= 1
+        pm = get(char, 0)
+        tr = (((~d0) & pm) << 1) & prev_pm
+        d0 = ((((pm & vp) + vp) ^ vp) | pm | vn | tr) & full
+        hp = (vn | ~(d0 | vp)) & full
+        hn = d0 & vp
+        if hp & last:
+            dist += 1
+        elif hn & last:
+            dist -= 1
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = (hn | ~(d0 | hp)) & full
+        vn = d0 & hp
+        prev_pm = pm
+        if max_distance is not None and dist - remaining > max_distance:
+            return max_distance + 1
+    return dist
+
+
+def osa_distance(a: str, b: str) -> int:
+    """Optimal string alignment distance between two strings (bit-parallel)"""
+    return osa_distance_bp(char_masks(a), len(a), b)
+
+
+class FuzzyIndex:
+    """
+    Case-insensitive typo lookup that maps a misspelled entity back to its
+    canonical spelling when there is a single closest candidate.
+    Candidates are scored with the bit-parallel distance against match masks
+    precomputed once per vocabulary word; for closed vocabularies of this
+    size that is several times faster in CPython than walking a trie.
+    """
+
+    # Max edit distance accepted without LLM validation; short names get a
+    # tighter bound so e.g. "Austria" is never silently read as "Australia"
+    SHORT_WORD_LENGTH = 7
+    SHORT_WORD_MAX_DISTANCE = 1
+    MAX_DISTANCE = 2
+
+    def __init__(self, options: List[str]):
+        """
+        Build the index
+
+        Args:
+            options: Canonical spellings (e.g. VALID_CITIES)
+        """
+        self._canonical: Dict[str, str] = {}
+        for option in options:
+            self._canonical.setdefault(option.lower(), option)
+        self._entries = [(word, char_masks(word), len(word)) for word in self._canonical]
+
+    def __len__(self) -> int:
+        return len(self._canonical)
+
+    def max_distance_for(self, text: str) -> int:
+        """Edit-distance budget for a lookup string of this length"""
+        if len(text) <= self.SHORT_WORD_LENGTH:
+            return self.SHORT_WORD_MAX_DISTANCE
+        return self.MAX_DISTANCE
+
+    def lookup(self, text: str) -> Optional[str]:
+        """
+        Resolve a possibly misspelled value to a canonical option
+
+        Args:
+            text: User input
+
+        Returns:
+            Canonical option if exactly one candidate is closest within the
+            distance budget, None if nothing is close enough or it is ambiguous
+        """
+        text_lower = text.lower().strip()
+        if not text_lower:
+            return None
+
+        k = self.max_distance_for(text_lower)
+        text_length = len(text_lower)
+        matches = []
+        for word, masks, length in self._entries:
+            if abs(length - text_length) > k:
+                continue
+            d = osa_distance_bp(masks, length, text_lower, k)
+            if d <= k:
+                matches.append((d, word))
+        matches.sort()
+        if not matches:
+            return None
+        if len(matches) > 1 and matches[1][0] == matches[0][0]:
+            return None  # Tie between candidates - not safe to pick one locally
+        return self._canonical[matches[0][1]]
+
+
+def trigrams(text: str) -> Set[str]:
+    """Distinct character trigrams of a string (empty for strings shorter than 3)"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Inverted index from character trigrams to vocabulary positions, used to
+    shortlist candidates in large vocabularies (e.g. thousands of hotel names)
+    before any per-candidate string comparison.
+    """
+
+    def __init__(self, options_lower: Sequence[str]):
+        """
+        Build the index
+
+        Args:
+            options_lower: Lowercase vocabulary; results are positions in it
+        """
+        self._size = len(options_lower)
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._counts: List[int] = []
+        # Options without trigrams (under 3 characters) can be contained in
+        # anything, so they are always containment candidates
+        self._short: List[int] = []
+        for i, option in enumerate(options_lower):
+            grams = trigrams(option)
+            self._counts.append(len(grams))
+            if not grams:
+                self._short.append(i)
+            for gram in grams:
+                self._postings[gram].add(i)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def containment_candidates(self, text: str) -> List[int]:
+        """
+        Positions of options that may contain text or be contained in it.
+        Exact superset: a substring's trigrams are all trigrams of the longer string.
+
+        Args:
+            text: Lowercase lookup string
+
+        Returns:
+            Sorted positions (all positions if text is under 3 characters)
+        """
+        grams = trigrams(text)
+        if not grams:
+            return list(range(self._size))
+
+        shared = self._shared_counts(grams)
+        # text in option: option has every trigram of text;
+        # option in text: every trigram of the option occurs in text
+        candidates = {i for i, n in shared.items() if n == len(grams) or n == self._counts[i]}
+        candidates.update(self._short)
+        return sorted(candidates)
+
+    def shortlist(self, text: str, min_shared: Optional[int] = None) -> List[int]:
+        """
+        Positions of options sharing at least min_shared trigrams with text
+
+        Args:
+            text: Lowercase lookup string
+            min_shared: Minimum shared trigrams (default: min(2, half the text's trigrams), at least 1)
+
+        Returns:
+            Sorted positions (all positions if text is under 3 characters)
+        """
+        grams = trigrams(text)
+        if not grams:
+            return list(range(self._size))
+        if min_shared is None:
+            min_shared = max(1, min(2, len(grams) // 2))
+
+        shared = self._shared_counts(grams)
+        return sorted(i for i, n in shared.items() if n >= min_shared)
+
+    def _shared_counts(self, grams: Set[str]) -> Dict[int, int]:
+        """Number of the given trigrams each option contains (options with none are omitted)"""
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for i in self._postings.get(gram, ()):
+                shared[i] += 1
+        return shared
@@ -3,9 +3,13 @@ Intent Classifier for Graph-RAG Hotel Travel Assistant
 Classifies user queries into one of 7 intent types using hybrid rule-based + LLM classification
 """
 
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple, Union
+from collections import OrderedDict
+from functools import lru_cache
 import re
-from utils.llm_client import LLMClient
+import threading
+from utils.llm_client import LLMClient, get_llm_client
+from components.query_view import QueryView
 
 
 class IntentClassifier:
@@ -152,64 +156,263 @@ class IntentClassifier:
         "HotelSearch": ["review", "feedback"],
     }
     
-    def __init__(self):
+    # Category descriptions and matching rules shared by single and batched LLM prompts
+    CATEGORY_GUIDE = """Categories:
+1. HotelSearch - Finding hotels in a city/country OR filtering by rating/stars
+   Examples: "hotels in Cairo", "find hotels in Paris", "show me hotels in Egypt", "hotels with rating above 8", "highly rated hotels", "5-star hotels"
+
+2. HotelRecommendation - Asking for best/top hotels by traveler type
+   Examples: "best hotels for couples", "top hotels for families", "recommended hotels for business travelers"
+
+3. ReviewLookup - Requesting reviews/feedback for hotels
+   Examples: "reviews for Hilton", "what do guests say about this hotel", "show me feedback"
+
+4. LocationQuery - Asking about location scores/quality
+   Examples: "hotels with best location score", "which hotels have good location", "find hotels with best location"
+
+5. VisaQuestion - Visa requirements between countries
+   Examples: "do I need visa from USA to France", "visa requirements from Egypt to UK"
+
+6. AmenityFilter - Filtering by quality scores (cleanliness, comfort, value, staff)
+   Examples: "hotels with high cleanliness", "best comfort score", "good value for money"
+
+7. CasualConversation - Greetings, bot capabilities, small talk
+   Examples: "hi", "what can you do", "thank you", "goodbye"
+
+8. GeneralQuestionAnswering - Everything else
+
+MATCHING RULES:
+- City/country + hotels = HotelSearch
+- Rating/stars + hotels = HotelSearch (e.g., "rating above 8", "highly rated", "5-star")
+- "best"/"top" + traveler type (couples/families/business) = HotelRecommendation
+- "location score"/"best location" = LocationQuery
+- "reviews"/"feedback"/"ratings" = ReviewLookup
+- Cleanliness/comfort/value/staff scores = AmenityFilter
+
+- IMPORTANT: Do NOT classify based on literal example matching. Always classify based on the meaning (semantics) of the query, even if wording, phrasing, synonyms, or structure are different. Consider paraphrases and similar intent patterns.
+- ANY query involving cleanliness score, comfort score, value for money score, staff score, or any hotel quality metric MUST be classified as AmenityFilter, even if phrasing or wording is different (e.g., "high comfort score", "good value", "great staff reviews", "value for money", "good comfort"). This ALWAYS maps to AmenityFilter."""
+    
+    # Max queries sent to the LLM in one batched classification request
+    BATCH_SIZE = 32
+    
+    # Max entries in the in-memory LRU of classified queries
+    CLASSIFY_CACHE_SIZE = 4096
+    
+    def __init__(self, llm_client: Optional[LLMClient] = None):
         """
         Initialize hybrid intent classifier with rule-based and LLM components
+        
+        Args:
+            llm_client: Shared LLM client (default: the process-wide LLMClient)
         """
         try:
-            self.llm_client = LLMClient()
+            self.llm_client = llm_client or LLMClient()
         except Exception as e:
             raise RuntimeError(f"Failed to initialize LLM client for intent classification: {e}")
+        
+        # (model, normalized query) -> intent; only reliable results are stored
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
     
-    def classify(self, query: str) -> str:
+    def classify(self, query: Union[str, QueryView]) -> str:
         """
         Classify user query using hybrid approach: rule-based first, then LLM if needed
         
         Args:
-            query: User query string
+            query: User query string or precomputed QueryView
             
         Returns:
             Intent name (one of 7 types)
         """
-        if not query or not query.strip():
+        view = QueryView.of(query or "")
+        query = view.text
+        if not query.strip():
             return "GeneralQuestionAnswering"
         
+        intent = self._cache_lookup(view.lower)
+        if intent is not None:
+            return intent
+        
+        intent, reliable = self._classify_uncached(query, view.lower)
+        if reliable:
+            self._cache_store(view.lower, intent)
+        return intent
+    
+    def _cache_lookup(self, query_lower: str) -> Optional[str]:
+        """Return the cached intent for a lowercased query, if any"""
+        cache_key = (self.llm_client.model, " ".join(query_lower.split()))
+        with self._cache_lock:
+            intent = self._cache.get(cache_key)
+            if intent is not None:
+                self._cache.move_to_end(cache_key)
+            return intent
+    
+    def _cache_store(self, query_lower: str, intent: str):
+        """Cache a reliable intent for a lowercased query, evicting the least recently used"""
+        cache_key = (self.llm_client.model, " ".join(query_lower.split()))
+        with self._cache_lock:
+            self._cache[cache_key] = intent
+            self._cache.move_to_end(cache_key)
+            if len(self._cache) > self.CLASSIFY_CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
+    def classify_by_rules_cached(self, query: Union[str, QueryView]) -> Tuple[Optional[str], float]:
+        """
+        Classify without the LLM: the cached intent if there is one, else the rules
+        
+        Args:
+            query: Non-empty user query string or precomputed QueryView
+            
+        Returns:
+            Tuple of (intent, confidence); a cached intent has confidence 1.0
+        """
+        view = QueryView.of(query)
+        intent = self._cache_lookup(view.lower)
+        if intent is not None:
+            return intent, 1.0
+        return self._classify_by_rules(view.text, view.lower)
+    
+    def remember(self, query: Union[str, QueryView], intent: str):
+        """Cache an intent decided outside classify() (e.g. by QueryAnalyzer's fused call)"""
+        self._cache_store(QueryView.of(query).lower, intent)
+    
+    def _classify_uncached(self, query: str, query_lower: str) -> Tuple[str, bool]:
+        """
+        Run the rule + LLM classification pipeline
+        
+        Args:
+            query: Non-empty user query
+            query_lower: Lowercased query
+            
+        Returns:
+            Tuple of (intent, reliable) where reliable is False if the LLM
+            failed and a fallback intent was used (not worth caching)
+        """
         # Stage 1: Try rule-based classification
-        rule_intent, confidence = self._classify_by_rules(query)
+        rule_intent, confidence = self._classify_by_rules(query, query_lower)
         
         # High confidence (>= 0.9) - use rule result directly
         if confidence >= 0.9:
-            return rule_intent
+            return rule_intent, True
         
         # Medium confidence (0.5-0.9) - use LLM with hint
         if confidence >= 0.5:
             intent = self._classify_by_llm(query, hint_intent=rule_intent, hint_confidence=confidence)
             if intent and intent in self.INTENTS:
-                return intent
+                return intent, True
             # LLM failed, use rule result
-            return rule_intent
+            return rule_intent, False
         
         # Low confidence (< 0.5) - pure LLM classification
         intent = self._classify_by_llm(query)
         if intent and intent in self.INTENTS:
-            return intent
+            return intent, True
         
         # All failed - use rule result if available, otherwise fallback
         if rule_intent:
-            return rule_intent
-        return "GeneralQuestionAnswering"
+            return rule_intent, False
+        return "GeneralQuestionAnswering", False
     
-    def _classify_by_rules(self, query: str) -> Tuple[Optional[str], float]:
+    def classify_many(self, queries: List[Union[str, QueryView]]) -> List[str]:
+        """
+        Classify many queries, batching LLM work into few API calls.
+        Rules run per query exactly as in classify(); ambiguous queries are
+        sent to the LLM in chunks of BATCH_SIZE as one JSON-array request.
+        
+        Args:
+            queries: User query strings or QueryViews
+            
+        Returns:
+            List of intent names aligned with queries
+        """
+        results: List[str] = ["GeneralQuestionAnswering"] * len(queries)
+        pending = []  # (index, query, rule_intent, confidence)
+        
+        for i, query in enumerate(queries):
+            view = QueryView.of(query or "")
+            query = view.text
+            if not query.strip():
+                continue
+            rule_intent, confidence = self._classify_by_rules(query, view.lower)
+            if confidence >= 0.9:
+                results[i] = rule_intent
+            else:
+                pending.append((i, query, rule_intent, confidence))
+        
+        for start in range(0, len(pending), self.BATCH_SIZE):
+            chunk = pending[start:start + self.BATCH_SIZE]
+            llm_intents = self._classify_batch_by_llm(chunk)
+            for (i, _, rule_intent, _), intent in zip(chunk, llm_intents):
+                if intent and intent in self.INTENTS:
+                    results[i] = intent
+                elif rule_intent:
+                    results[i] = rule_intent
+        
+        return results
+    
+    def _classify_batch_by_llm(self, items: List[Tuple[int, str, Optional[str], float]]) -> List[Optional[str]]:
+        """
+        Classify several queries with a single LLM call
+        
+        Args:
+            items: List of (index, query, rule_intent, confidence) tuples
+            
+        Returns:
+            List of intent names (or None) aligned with items
+        """
+        if len(items) == 1:
+            return self._classify_each_by_llm(items)
+        
+        lines = []
+        for n, (_, query, rule_intent, confidence) in enumerate(items, 1):
+            hint = f" (rule hint: {rule_intent}, {confidence:.0%} confidence)" if confidence >= 0.5 else ""
+            lines.append(f'{n}. "{query}"{hint}')
+        queries_text = "\n".join(lines)
+        
+        prompt = f"""You are an intent classifier. Classify EACH numbered query into ONE category. Rule hints are suggestions only; make your own judgment based on the full query context.
+
+{self.CATEGORY_GUIDE}
+
+
+Queries:
+{queries_text}
+
+Respond ONLY with a JSON array of {len(items)} category names in query order (e.g., ["HotelSearch", "LocationQuery"])."""
+        
+        try:
+            parsed = self.llm_client.generate_json(prompt, temperature=0.0, max_tokens=16 * len(items) + 50)
+        except Exception as e:
+            print(f"Error in batched LLM classification: {e}")
+            parsed = None
+        
+        if not isinstance(parsed, list) or len(parsed) != len(items):
+            # Batch response unusable - fall back to one call per query
+            return self._classify_each_by_llm(items)
+        
+        return [intent if intent in self.INTENTS else None for intent in parsed]
+    
+    def _classify_each_by_llm(self, items: List[Tuple[int, str, Optional[str], float]]) -> List[Optional[str]]:
+        """Classify items one LLM call at a time, using the same hinting policy as classify()"""
+        intents = []
+        for _, query, rule_intent, confidence in items:
+            if confidence >= 0.5:
+                intents.append(self._classify_by_llm(query, hint_intent=rule_intent, hint_confidence=confidence))
+            else:
+                intents.append(self._classify_by_llm(query))
+        return intents
+    
+    def _classify_by_rules(self, query: str, query_lower: Optional[str] = None) -> Tuple[Optional[str], float]:
         """
         Rule-based classification with confidence scoring
         
         Args:
             query: User query string
+            query_lower: Optional precomputed lowercase query
             
         Returns:
             Tuple of (intent, confidence) where confidence is 0.0-1.0
         """
-        query_lower = query.lower().strip()
+        query_lower = (query_lower if query_lower is not None else query.lower()).strip()
         intent_scores = {}
         
         # Check exact matches first
@@ -284,40 +487,7 @@ class IntentClassifier:
             
             prompt = f"""You are an intent classifier. Classify this query into ONE category.{hint_text}
 
-Categories:
-1. HotelSearch - Finding hotels in a city/country OR filtering by rating/stars
-   Examples: "hotels in Cairo", "find hotels in Paris", "show me hotels in Egypt", "hotels with rating above 8", "highly rated hotels", "5-star hotels"
-
-2. HotelRecommendation - Asking for best/top hotels by traveler type
-   Examples: "best hotels for couples", "top hotels for families", "recommended hotels for business travelers"
-
-3. ReviewLookup - Requesting reviews/feedback for hotels
-   Examples: "reviews for Hilton", "what do guests say about this hotel", "show me feedback"
-
-4. LocationQuery - Asking about location scores/quality
-   Examples: "hotels with best location score", "which hotels have good location", "find hotels with best location"
-
-5. VisaQuestion - Visa requirements between countries
-   Examples: "do I need visa from USA to France", "visa requirements from Egypt to UK"
-
-6. AmenityFilter - Filtering by quality scores (cleanliness, comfort, value, staff)
-   Examples: "hotels with high cleanliness", "best comfort score", "good value for money"
-
-7. CasualConversation - Greetings, bot capabilities, small talk
-   Examples: "hi", "what can you do", "thank you", "goodbye"
-
-8. GeneralQuestionAnswering - Everything else
-
-MATCHING RULES:
-- City/country + hotels = HotelSearch
-- Rating/stars + hotels = HotelSearch (e.g., "rating above 8", "highly rated", "5-star")
-- "best"/"top" + traveler type (couples/families/business) = HotelRecommendation
-- "location score"/"best location" = LocationQuery
-- "reviews"/"feedback"/"ratings" = ReviewLookup
-- Cleanliness/comfort/value/staff scores = AmenityFilter
-
-- IMPORTANT: Do NOT classify based on literal example matching. Always classify based on the meaning (semantics) of the query, even if wording, phrasing, synonyms, or structure are different. Consider paraphrases and similar intent patterns.
-- ANY query involving cleanliness score, comfort score, value for money score, staff score, or any hotel quality metric MUST be classified as AmenityFilter, even if phrasing or wording is different (e.g., "high comfort score", "good value", "great staff reviews", "value for money", "good comfort"). This ALWAYS maps to AmenityFilter.
+{self.CATEGORY_GUIDE}
 
 
 Query: "{query}"
@@ -349,6 +519,13 @@ Answer with ONLY the category name (e.g., "LocationQuery")."""
         return self.INTENTS.copy()
 
 
+# Convenience function for shared access
+@lru_cache(maxsize=1)
+def get_intent_classifier() -> IntentClassifier:
+    """Get a process-wide shared IntentClassifier instance (created on first use)"""
+    return IntentClassifier(llm_client=get_llm_client())
+
+
 # Test the classifier
 if __name__ == "__main__":
     print("=" * 80)
@@ -3,14 +3,17 @@ Intent Classifier for Graph-RAG Hotel Travel Assistant
 Classifies user queries into one of 7 intent types using LLM-based classification
 """
 
-from typing import Optional
+import re
+from typing import List, Optional
 from utils.llm_client import LLMClient
 
 
 class IntentClassifier:
     """
     Classify user query into one of 7 intents using LLM.
-    Strategy: Pure LLM-based classification with knowledge of available query types.
+    Strategy: Pure LLM-based classification with knowledge of available query types
+    (the baseline the hybrid classifier is compared against). An optional regex
+    fast path can be enabled to skip the LLM for unambiguous queries.
     """
     
     # 8 intent types (added Casual conversation)
@@ -62,35 +65,121 @@ class IntentClassifier:
         ]
     }
     
-    def __init__(self):
+    # Category descriptions and matching rules shared by single and batched prompts
+    CATEGORY_GUIDE = """Categories:
+1. HotelSearch - Finding hotels in a city/country
+   Examples: "hotels in Cairo", "find hotels in Paris", "show me hotels in Egypt"
+
+2. HotelRecommendation - Asking for best/top hotels by traveler type
+   Examples: "best hotels for couples", "top hotels for families", "recommended hotels for business travelers"
+
+3. ReviewLookup - Requesting reviews/feedback for hotels
+   Examples: "reviews for Hilton", "what do guests say about this hotel", "show me feedback"
+
+4. LocationQuery - Asking about location scores/quality
+   Examples: "hotels with best location score", "which hotels have good location", "find hotels with best location"
+
+5. VisaQuestion - Visa requirements between countries
+   Examples: "do I need visa from USA to France", "visa requirements from Egypt to UK"
+
+6. AmenityFilter - Filtering by quality scores (cleanliness, comfort, value, staff)
+   Examples: "hotels with high cleanliness", "best comfort score", "good value for money"
+
+7. CasualConversation - Greetings, bot capabilities, small talk
+   Examples: "hi", "what can you do", "thank you", "goodbye"
+
+8. GeneralQuestionAnswering - Everything else
+
+MATCHING RULES:
+- City/country + hotels = HotelSearch
+- "best"/"top" + traveler type (couples/families/business) = HotelRecommendation
+- "location score"/"best location" = LocationQuery
+- "reviews"/"feedback"/"ratings" = ReviewLookup
+- Cleanliness/comfort/value/staff scores = AmenityFilter"""
+    
+    # Static instructions sent as the system message; identical on every call so the
+    # provider can reuse the cached prompt prefix, with only the user message varying
+    SYSTEM_PROMPT = f"""You are an intent classifier. Classify each query into ONE category.
+
+{CATEGORY_GUIDE}"""
+    
+    # Unambiguous surface patterns answered without an LLM call when fast_path is
+    # on; a query is short-circuited only when exactly one intent's pattern matches
+    FAST_PATH_PATTERNS = (
+        ("CasualConversation", re.compile(
+            r"^(?:hi|hello|hey(?: there)?|good (?:morning|afternoon|evening)|thanks(?: a lot)?"
+            r"|thank you(?: so much)?|bye|goodbye|see you(?: later)?|help)[\s!.?]*$"
+        )),
+        ("ReviewLookup", re.compile(r"\breviews? (?:for|of|on|about)\b")),
+        ("VisaQuestion", re.compile(r"\bvisas?\b.*\bfrom\b.+\bto\b|\bfrom\b.+\bto\b.*\bvisas?\b")),
+    )
+    
+    # Maximum queries sent in one batched LLM request
+    BATCH_SIZE = 10
+    
+    def __init__(self, fast_path: bool = False):
         """
         Initialize LLM-based intent classifier
+        
+        Args:
+            fast_path: If True, answer queries matching FAST_PATH_PATTERNS without
+                the LLM (off by default so the classifier stays LLM-only)
         """
+        self.fast_path = fast_path
         try:
             self.llm_client = LLMClient()
         except Exception as e:
             raise RuntimeError(f"Failed to initialize LLM client for intent classification: {e}")
     
-    def classify(self, query: str) -> str:
+    def classify(self, query: str, fallback: Optional[str] = "GeneralQuestionAnswering") -> Optional[str]:
         """
         Classify user query into one of 7 intents using LLM
         
         Args:
             query: User query string
+            fallback: Returned when the LLM call fails or gives no valid intent
+                (pass None to tell failures apart from real predictions)
             
         Returns:
-            Intent name (one of 7 types)
+            Intent name (one of 7 types), or fallback
+            
+        Raises:
+            Exception: Rate-limit (429) errors from the LLM, so callers can back off and retry
         """
         if not query or not query.strip():
             return "GeneralQuestionAnswering"
         
+        intent = self.classify_fast_path(query) if self.fast_path else None
+        if intent:
+            return intent
+        
         intent = self._classify_by_llm(query)
         
         if intent and intent in self.INTENTS:
             return intent
         
         # Default fallback
-        return "GeneralQuestionAnswering"
+        return fallback
+    
+    def classify_fast_path(self, query: str) -> Optional[str]:
+        """
+        Deterministic pre-filter for queries whose intent is obvious from surface
+        patterns (used by classify() when fast_path is on; no LLM call)
+        
+        Args:
+            query: User query string
+            
+        Returns:
+            Intent name if exactly one pattern matches, None otherwise
+        """
+        query_lower = query.lower().strip()
+        matched = None
+        for intent, pattern in self.FAST_PATH_PATTERNS:
+            if pattern.search(query_lower):
+                if matched:
+                    return None  # Conflicting signals - let the LLM decide
+                matched = intent
+        return matched
     
     def _classify_by_llm(self, query: str) -> Optional[str]:
         """
@@ -100,72 +189,127 @@ class IntentClassifier:
             query: User query string
             
         Returns:
-            Intent name or None if LLM call fails
+            Intent name or None if LLM call fails (rate-limit errors are re-raised)
         """
         try:
-            # Build capabilities description from query library
-            capabilities_desc = ""
-            for intent, capabilities in self.INTENT_QUERY_CAPABILITIES.items():
-                capabilities_desc += f"\n{intent}:\n"
-                for cap in capabilities:
-                    capabilities_desc += f"  - {cap}\n"
-            
-            prompt = f"""You are an intent classifier. Classify this query into ONE category.
-
-Categories:
-1. HotelSearch - Finding hotels in a city/country
-   Examples: "hotels in Cairo", "find hotels in Paris", "show me hotels in Egypt"
-
-2. HotelRecommendation - Asking for best/top hotels by traveler type
-   Examples: "best hotels for couples", "top hotels for families", "recommended hotels for business travelers"
-
-3. ReviewLookup - Requesting reviews/feedback for hotels
-   Examples: "reviews for Hilton", "what do guests say about this hotel", "show me feedback"
-
-4. LocationQuery - Asking about location scores/quality
-   Examples: "hotels with best location score", "which hotels have good location", "find hotels with best location"
-
-5. VisaQuestion - Visa requirements between countries
-   Examples: "do I need visa from USA to France", "visa requirements from Egypt to UK"
-
-6. AmenityFilter - Filtering by quality scores (cleanliness, comfort, value, staff)
-   Examples: "hotels with high cleanliness", "best comfort score", "good value for money"
-
-7. CasualConversation - Greetings, bot capabilities, small talk
-   Examples: "hi", "what can you do", "thank you", "goodbye"
-
-8. GeneralQuestionAnswering - Everything else
-
-MATCHING RULES:
-- City/country + hotels = HotelSearch
-- "best"/"top" + traveler type (couples/families/business) = HotelRecommendation
-- "location score"/"best location" = LocationQuery
-- "reviews"/"feedback"/"ratings" = ReviewLookup
-- Cleanliness/comfort/value/staff scores = AmenityFilter
-
-Query: "{query}"
+            prompt = f"""Query: "{query}"
 
 Answer with ONLY the category name (e.g., "LocationQuery")."""
 
-            response = self.llm_client.generate(prompt, temperature=0.0, max_tokens=50)
+            response = self.llm_client.generate(
+                prompt, temperature=0.0, max_tokens=50, system_prompt=self.SYSTEM_PROMPT
+            )
             
-            # Extract intent from response
-            intent = response.strip().strip('"').strip("'")
+            return self._parse_intent(response)
             
-            # Validate intent is one of the 7 types
-            if intent in self.INTENTS:
-                return intent
+        except Exception as e:
+            if self.is_rate_limit_error(e):
+                raise
+            print(f"Error in LLM classification: {e}")
+            return None
+    
+    def classify_batch(self, queries: List[str], fallback: Optional[str] = "GeneralQuestionAnswering") -> List[Optional[str]]:
+        """
+        Classify several queries, sending up to BATCH_SIZE per LLM request
+        
+        Args:
+            queries: User query strings
+            fallback: Used for queries the LLM failed to classify (see classify)
             
-            # Try to find intent in response if LLM added explanation
-            for valid_intent in self.INTENTS:
-                if valid_intent in response:
-                    return valid_intent
+        Returns:
+            List of intent names (or fallback) aligned with queries
             
-            return None
+        Raises:
+            Exception: Rate-limit (429) errors from the LLM (see classify)
+        """
+        results = [fallback] * len(queries)
+        pending = []
+        for i, query in enumerate(queries):
+            if not query or not query.strip():
+                results[i] = "GeneralQuestionAnswering"
+                continue
+            intent = self.classify_fast_path(query) if self.fast_path else None
+            if intent:
+                results[i] = intent
+            else:
+                pending.append((i, query))
+        
+        for start in range(0, len(pending), self.BATCH_SIZE):
+            chunk = pending[start:start + self.BATCH_SIZE]
+            if len(chunk) == 1:
+                intents = [self._classify_by_llm(chunk[0][1])]
+            else:
+                intents = self._classify_batch_by_llm([query for _, query in chunk])
+            for (i, _), intent in zip(chunk, intents):
+                if intent and intent in self.INTENTS:
+                    results[i] = intent
+        
+        return results
+    
+    def _classify_batch_by_llm(self, queries: List[str]) -> List[Optional[str]]:
+        """
+        Classify several queries with a single LLM call
+        
+        Args:
+            queries: User query strings
             
+        Returns:
+            List of intent names (or None) aligned with queries
+        """
+        queries_text = "\n".join(f'{n}. "{query}"' for n, query in enumerate(queries, 1))
+        
+        prompt = f"""Classify EACH numbered query.
+
+Queries:
+{queries_text}
+
+Return a JSON list of intents, one per query, in order (e.g., ["HotelSearch", "LocationQuery"])."""
+        
+        try:
+            parsed = self.llm_client.generate_json(
+                prompt, temperature=0.0, max_tokens=16 * len(queries) + 50, system_prompt=self.SYSTEM_PROMPT
+            )
         except Exception as e:
-            print(f"Error in LLM classification: {e}")
-            return None
+            if self.is_rate_limit_error(e):
+                raise
+            print(f"Error in batched LLM classification: {e}")
+            parsed = None
+        
+        if not isinstance(parsed, list) or len(parsed) != len(queries):
+            # Batch response unusable - fall back to one call per query
+            return [self._classify_by_llm(query) for query in queries]
+        
+        return [self._parse_intent(intent) if isinstance(intent, str) else None for intent in parsed]
+    
+    @staticmethod
+    def is_rate_limit_error(error: Exception) -> bool:
+        """Check whether an exception is a provider rate-limit (429) response"""
+        error_msg = str(error).lower()
+        return 'rate_limit' in error_msg or 'rate limit' in error_msg or '429' in error_msg
+    
+    def _parse_intent(self, response: str) -> Optional[str]:
+        """
+        Extract an intent name from a raw LLM answer
+        
+        Args:
+            response: LLM response text
+            
+        Returns:
+            Intent name or None if no valid intent is found
+        """
+        # Extract intent from response
+        intent = response.strip().strip('"').strip("'")
+        
+        # Validate intent is one of the 7 types
+        if intent in self.INTENTS:
+            return intent
+        
+        # Try to find intent in response if LLM added explanation
+        for valid_intent in self.INTENTS:
+            if valid_intent in response:
+                return valid_intent
+        
+        return None
     
     def get_available_intents(self) -> list:
         """Get list of all available intent types"""
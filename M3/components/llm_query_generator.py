@@ -60,10 +60,14 @@ Common Query Patterns:
    MATCH (from:Country {name: 'USA'})-[v:NEEDS_VISA]->(to:Country {name: 'France'})
 """
     
-    def __init__(self):
-        """Initialize LLM query generator"""
+    def __init__(self, llm_client: Optional[LLMClient] = None):
+        """Initialize LLM query generator
+        
+        Args:
+            llm_client: Shared LLM client (default: the process-wide LLMClient)
+        """
         try:
-            self.llm_client = LLMClient()
+            self.llm_client = llm_client or LLMClient()
         except Exception as e:
             raise RuntimeError(f"Failed to initialize LLM client for query generation: {e}")
     
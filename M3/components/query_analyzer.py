@@ -0,0 +1,149 @@
+"""
+Query Analyzer for Graph-RAG Hotel Travel Assistant
+Classifies intent and extracts entities with at most one LLM call per query
+"""
+
+from functools import lru_cache
+from typing import Dict, Any, Optional, Union
+
+from components.intent_classifier import IntentClassifier, get_intent_classifier
+from components.entity_extractor import EntityExtractor, get_entity_extractor
+from components.query_view import QueryView
+
+
+class QueryAnalyzer:
+    """
+    Fused intent classification + entity extraction.
+    Rules run first exactly as in IntentClassifier; when they settle the
+    intent, entity extraction proceeds as usual (at most one LLM call).
+    When they don't, a single JSON request returns both the intent and the
+    entities for it, instead of one classification call followed by one
+    extraction call.
+    """
+
+    def __init__(self, classifier: Optional[IntentClassifier] = None, extractor: Optional[EntityExtractor] = None):
+        """
+        Initialize query analyzer
+
+        Args:
+            classifier: Intent classifier (default: shared instance)
+            extractor: Entity extractor (default: shared instance)
+        """
+        self.classifier = classifier or get_intent_classifier()
+        self.extractor = extractor or get_entity_extractor()
+        self.llm_client = self.classifier.llm_client
+        self._field_guide = self._build_field_guide()
+
+    def analyze(self, query: Union[str, QueryView]) -> Dict[str, Any]:
+        """
+        Classify the query and extract its entities
+
+        Args:
+            query: User query string or precomputed QueryView
+
+        Returns:
+            Dictionary with "intent" and "entities"
+        """
+        view = QueryView.of(query or "")
+        if not view.text.strip():
+            return {"intent": "GeneralQuestionAnswering", "entities": {}}
+
+        # Intent already known (cached or conclusive rules) - only extraction is left
+        intent, confidence = self.classifier.classify_by_rules_cached(view)
+        if confidence >= 0.9:
+            return {"intent": intent, "entities": self.extractor.extract(view, intent)}
+
+        fused = self._analyze_with_llm(view.text, intent, confidence)
+        if fused is None:
+            # Fused response unusable - fall back to the separate calls
+            intent = self.classifier.classify(view)
+            return {"intent": intent, "entities": self.extractor.extract(view, intent)}
+
+        intent, llm_entities = fused
+        self.classifier.remember(view, intent)
+        return {"intent": intent, "entities": self.extractor.extract_with_llm_entities(view, intent, llm_entities)}
+
+    def _analyze_with_llm(self, query: str, hint_intent: Optional[str], hint_confidence: float) -> Optional[tuple]:
+        """
+        Classify and extract in one LLM call
+
+        Args:
+            query: User query string
+            hint_intent: Intent suggested by rules (if any)
+            hint_confidence: Rule confidence for hint_intent
+
+        Returns:
+            Tuple of (intent, entities), or None if the call fails or the
+            response has no valid intent
+        """
+        hint_text = ""
+        if hint_intent and hint_confidence >= 0.5:
+            hint_text = f"\n\nNOTE: Rule-based pre-classification suggests '{hint_intent}' with {hint_confidence:.0%} confidence. Consider this hint but make your own judgment based on the full query context."
+
+        prompt = f"""You are a query analyzer for a hotel travel assistant. Classify the query into ONE category, then extract the entities listed for that category.{hint_text}
+
+{self.classifier.CATEGORY_GUIDE}
+
+Entities to extract per category:
+{self._field_guide}
+
+Query: "{query}"
+
+Respond ONLY with JSON: {{"intent": "<category name>", "entities": {{...}}}} where entities uses the keys listed for the chosen category."""
+
+        try:
+            # Extraction model, since the entities are cached under its key
+            parsed = self.llm_client.generate_json(
+                prompt, temperature=0.0, max_tokens=300, model=self.extractor.get_extraction_model()
+            )
+        except Exception as e:
+            print(f"Error in fused query analysis: {e}")
+            return None
+
+        if not isinstance(parsed, dict) or parsed.get("intent") not in self.classifier.INTENTS:
+            return None
+
+        intent = parsed["intent"]
+        guide = self.extractor.llm_field_guide(intent)
+        if guide is None:
+            return intent, {}
+
+        # Keep only the schema keys for the chosen intent, like the per-intent extraction call
+        entities = {key: None for key in guide[1]}
+        if isinstance(parsed.get("entities"), dict):
+            entities.update((key, value) for key, value in parsed["entities"].items() if key in entities)
+        return intent, entities
+
+    def _build_field_guide(self) -> str:
+        """Per-intent entity instructions for the fused prompt (built once)"""
+        sections = []
+        for intent in self.classifier.INTENTS:
+            guide = self.extractor.llm_field_guide(intent)
+            if guide is None:
+                sections.append(f"### {intent}\nNo entities (use {{}}).")
+            else:
+                sections.append(f"### {intent}\n{guide[0]}")
+        return "\n\n".join(sections)
+
+
+# Convenience function for shared access
+@lru_cache(maxsize=1)
+def get_query_analyzer() -> QueryAnalyzer:
+    """Get a process-wide shared QueryAnalyzer instance (created on first use)"""
+    return QueryAnalyzer()
+
+
+if __name__ == "__main__":
+    # Test query analyzer
+    analyzer = get_query_analyzer()
+
+    print("=== Query Analyzer Test ===\n")
+    for test_query in [
+        "hotels in Paris",
+        "which place would suit a honeymoon with spotless rooms?",
+        "do Egyptians need a visa for France",
+    ]:
+        result = analyzer.analyze(test_query)
+        print(f"Query: {test_query}")
+        print(f"  Intent: {result['intent']}")
+        print(f"  Entities: {result['entities']}\n")
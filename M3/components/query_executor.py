@@ -3,7 +3,7 @@ Query Executor for Graph-RAG Hotel Travel Assistant
 Executes Cypher queries on Neo4j database
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from utils.neo4j_client import Neo4jClient
 
 
@@ -46,6 +46,18 @@ class QueryExecutor:
             print(f"Query: {cypher[:200]}...")
             print(f"Params: {params}")
             raise
+    
+    def execute_many(self, queries: List[Tuple[str, Optional[Dict[str, Any]]]]) -> List[List[Dict[str, Any]]]:
+        """
+        Execute independent Cypher queries concurrently
+        
+        Args:
+            queries: List of (cypher, params) tuples
+            
+        Returns:
+            List of result record lists in query order ([] for a query that failed)
+        """
+        return self.neo4j_client.run_queries(queries)
 
 
 if __name__ == "__main__":
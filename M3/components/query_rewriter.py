@@ -13,9 +13,13 @@ class QueryRewriter:
     Rewrite queries to resolve references using conversation context
     """
     
-    def __init__(self):
-        """Initialize query rewriter with LLM client"""
-        self.llm_client = LLMClient()
+    def __init__(self, llm_client: Optional[LLMClient] = None):
+        """Initialize query rewriter with LLM client
+        
+        Args:
+            llm_client: Shared LLM client (default: the process-wide LLMClient)
+        """
+        self.llm_client = llm_client or LLMClient()
         self.config = ConfigLoader()
     
     def needs_rewriting(self, query: str) -> bool:
@@ -0,0 +1,34 @@
+"""
+Query View for Graph-RAG Hotel Travel Assistant
+Precomputed string forms of a user query shared across components
+"""
+
+from dataclasses import dataclass
+from typing import Union
+
+
+@dataclass(frozen=True, slots=True)
+class QueryView:
+    """
+    Immutable view of a user query with its lowercase form computed once.
+    Can be passed to IntentClassifier.classify and EntityExtractor.extract
+    in place of a raw string so both reuse the same preprocessing.
+    """
+    
+    text: str
+    lower: str
+    
+    @classmethod
+    def of(cls, query: Union[str, "QueryView"]) -> "QueryView":
+        """
+        Build a view for a raw query (views are returned unchanged)
+        
+        Args:
+            query: Raw query string or existing QueryView
+            
+        Returns:
+            QueryView for the query
+        """
+        if isinstance(query, cls):
+            return query
+        return cls(query, query.lower())
@@ -0,0 +1,240 @@
+"""
+Semantic Cache for Graph-RAG Hotel Travel Assistant
+Reuses LLM results for paraphrased queries via nearest-neighbour search on query embeddings
+"""
+
+import os
+import pickle
+import atexit
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from components.embedding_generator import EmbeddingGenerator
+from utils.config_loader import ConfigLoader
+
+try:
+    import faiss
+except ImportError:
+    # faiss is optional here; buckets are small enough for a brute-force NumPy scan
+    faiss = None
+
+
+class _Bucket:
+    """Entries that may answer each other: query vectors, their values, and an HNSW index"""
+
+    def __init__(self, dimension: int):
+        self.vectors = np.empty((0, dimension), dtype=np.float32)
+        self.values: List[Any] = []
+        self.index = None
+
+    def build_index(self, hnsw_m: int):
+        """(Re)build the HNSW index over the current vectors"""
+        if faiss is None:
+            return
+        self.index = faiss.IndexHNSWFlat(self.vectors.shape[1], hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        if len(self.vectors):
+            self.index.add(self.vectors)
+
+
+class SemanticCache:
+    """
+    Cache of (query embedding -> response) pairs.
+    A lookup returns the stored response of the most similar earlier query
+    when its cosine similarity reaches the threshold. Entries are grouped
+    into buckets (e.g. per intent) and only compared within their bucket,
+    so results for different schemas or contexts never answer each other.
+    """
+
+    DEFAULT_THRESHOLD = 0.95
+    MAX_ENTRIES_PER_BUCKET = 2048
+    HNSW_M = 32
+    CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "semantic"
+
+    def __init__(
+        self,
+        name: str,
+        threshold: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        persist: bool = True,
+        embedder: Optional[EmbeddingGenerator] = None
+    ):
+        """
+        Initialize semantic cache
+
+        Args:
+            name: Cache name (file name under CACHE_DIR)
+            threshold: Minimum cosine similarity for a hit (default: DEFAULT_THRESHOLD)
+            max_entries: Max entries per bucket before the oldest half is dropped
+            persist: If True, load from and save to CACHE_DIR
+            embedder: Embedding generator for queries (default: configured model)
+        """
+        self.name = name
+        self.threshold = threshold if threshold is not None else self.DEFAULT_THRESHOLD
+        self.max_entries = max_entries or self.MAX_ENTRIES_PER_BUCKET
+        self.embedder = embedder or EmbeddingGenerator()
+        self.path = self.CACHE_DIR / f"{name}.pkl" if persist else None
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        if self.path is not None:
+            self._load()
+            atexit.register(self.save)
+
+    def lookup(self, bucket: str, query: str) -> Optional[Any]:
+        """
+        Find the cached value of the most similar earlier query
+
+        Args:
+            bucket: Bucket key (only entries stored under it are compared)
+            query: User query
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        with self._lock:
+            entries = self._buckets.get(bucket)
+            if entries is None or not entries.values:
+                return None
+
+        vector = self._embed(query)
+        if vector is None:
+            return None
+
+        with self._lock:
+            if entries.index is not None:
+                scores, ids = entries.index.search(vector.reshape(1, -1), 1)
+                best, score = int(ids[0][0]), float(scores[0][0])
+            else:
+                similarities = entries.vectors @ vector
+                best = int(np.argmax(similarities))
+                score = float(similarities[best])
+            if best < 0 or score < self.threshold:
+                return None
+            return entries.values[best]
+
+    def store(self, bucket: str, query: str, value: Any):
+        """
+        Add a query and its value to the cache
+
+        Args:
+            bucket: Bucket key
+            query: User query
+            value: Value to return for similar queries (must be picklable)
+        """
+        vector = self._embed(query)
+        if vector is None:
+            return
+
+        with self._lock:
+            entries = self._buckets.get(bucket)
+            if entries is None:
+                entries = self._buckets[bucket] = _Bucket(len(vector))
+                entries.build_index(self.HNSW_M)
+
+            entries.vectors = np.vstack([entries.vectors, vector.reshape(1, -1)])
+            entries.values.append(value)
+            if entries.index is not None:
+                entries.index.add(vector.reshape(1, -1))
+
+            # HNSW has no deletion: drop the oldest half and rebuild
+            if len(entries.values) > self.max_entries:
+                keep = self.max_entries // 2
+                entries.vectors = entries.vectors[-keep:]
+                entries.values = entries.values[-keep:]
+                entries.build_index(self.HNSW_M)
+            self._dirty = True
+
+    def clear(self):
+        """Remove all entries (the file on disk is rewritten on the next save)"""
+        with self._lock:
+            self._buckets.clear()
+            self._dirty = True
+
+    def save(self):
+        """Write the cache to disk if it changed (errors are non-fatal)"""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {
+                "model": self.embedder.get_model_name(),
+                "buckets": {key: (entries.vectors, entries.values) for key, entries in self._buckets.items()}
+            }
+            self._dirty = False
+
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)  # Atomic, so a crash never leaves a partial file
+        except (OSError, pickle.PicklingError) as e:
+            print(f"⚠ Could not save semantic cache '{self.name}': {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def size(self) -> int:
+        """Total number of cached entries"""
+        with self._lock:
+            return sum(len(entries.values) for entries in self._buckets.values())
+
+    def _load(self):
+        """Load entries saved by an earlier run with the same embedding model"""
+        try:
+            with open(self.path, "rb") as f:
+                payload = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return
+        if not isinstance(payload, dict) or payload.get("model") != self.embedder.get_model_name():
+            # Vectors from another model are not comparable
+            return
+
+        for key, (vectors, values) in payload.get("buckets", {}).items():
+            entries = _Bucket(vectors.shape[1])
+            entries.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+            entries.values = list(values)
+            entries.build_index(self.HNSW_M)
+            self._buckets[key] = entries
+        print(f"✓ Loaded semantic cache '{self.name}' ({self.size()} entries)")
+
+    def _embed(self, query: str) -> Optional[np.ndarray]:
+        """Unit-length float32 embedding of a query, or None if it cannot be embedded"""
+        try:
+            embedding = self.embedder.embed(" ".join(query.split()).lower())
+        except Exception as e:
+            print(f"⚠ Semantic cache embedding failed: {e}")
+            return None
+        if not embedding:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+
+@lru_cache(maxsize=None)
+def get_semantic_cache(name: str) -> Optional[SemanticCache]:
+    """
+    Get the process-wide semantic cache with this name
+
+    Args:
+        name: Cache name (e.g. "entities", "answers")
+
+    Returns:
+        SemanticCache, or None when semantic_cache.enabled is false in config
+    """
+    config = ConfigLoader()
+    if not config.get('semantic_cache.enabled', False):
+        return None
+    return SemanticCache(
+        name,
+        threshold=config.get('semantic_cache.threshold', SemanticCache.DEFAULT_THRESHOLD),
+        max_entries=config.get('semantic_cache.max_entries', SemanticCache.MAX_ENTRIES_PER_BUCKET)
+    )
@@ -5,11 +5,19 @@ Performs vector similarity search using FAISS indexes
 
 import json
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import faiss
 from components.query_executor import QueryExecutor
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    # orjson is optional; the stdlib parser gives identical results, just slower
+    _loads = json.loads
+
 
 class VectorSearcher:
     """
@@ -18,6 +26,18 @@ class VectorSearcher:
     and enriches results with full node data from Neo4j.
     """
     
+    # Searchable indexes; each has matching <name>_index / <name>_mapping attributes
+    INDEX_NAMES = ("hotel", "visa", "review")
+    
+    # Inverted lists probed per query for IVF indexes (create_embeddings.py builds
+    # the review index as IVF); ignored for flat indexes
+    IVF_NPROBE = 16
+    
+    # Memory-map index data instead of copying it into RAM: loading is near
+    # instant and worker processes share the kernel page cache. IO_FLAG_MMAP_IFC
+    # (faiss >= 1.9) also maps flat codes; older builds only map IVF lists.
+    MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+    
     def __init__(self, index_dir: Optional[str] = None):
         """
         Initialize vector searcher
@@ -51,9 +71,8 @@ class VectorSearcher:
             hotel_mapping_path = self.index_dir / "hotel_id_mapping.json"
             
             if hotel_index_path.exists() and hotel_mapping_path.exists():
-                self.hotel_index = faiss.read_index(str(hotel_index_path))
-                with open(hotel_mapping_path, 'r') as f:
-                    self.hotel_mapping = json.load(f)
+                self.hotel_index = self._read_index(hotel_index_path)
+                self.hotel_mapping = self._load_mapping(hotel_mapping_path)
                 print(f"✓ Loaded hotel index: {self.hotel_index.ntotal} vectors")
             else:
                 print(f"Warning: Hotel FAISS index not found at {hotel_index_path}")
@@ -63,9 +82,8 @@ class VectorSearcher:
             visa_mapping_path = self.index_dir / "visa_id_mapping.json"
             
             if visa_index_path.exists() and visa_mapping_path.exists():
-                self.visa_index = faiss.read_index(str(visa_index_path))
-                with open(visa_mapping_path, 'r') as f:
-                    self.visa_mapping = json.load(f)
+                self.visa_index = self._read_index(visa_index_path)
+                self.visa_mapping = self._load_mapping(visa_mapping_path)
                 print(f"✓ Loaded visa index: {self.visa_index.ntotal} vectors")
             else:
                 print(f"Warning: Visa FAISS index not found at {visa_index_path}")
@@ -75,9 +93,8 @@ class VectorSearcher:
             review_mapping_path = self.index_dir / "review_id_mapping.json"
             
             if review_index_path.exists() and review_mapping_path.exists():
-                self.review_index = faiss.read_index(str(review_index_path))
-                with open(review_mapping_path, 'r') as f:
-                    self.review_mapping = json.load(f)
+                self.review_index = self._read_index(review_index_path)
+                self.review_mapping = self._load_mapping(review_mapping_path)
                 print(f"✓ Loaded review index: {self.review_index.ntotal} vectors")
             else:
                 print(f"Warning: Review FAISS index not found at {review_index_path}")
@@ -99,9 +116,8 @@ class VectorSearcher:
             hotel_mapping_path = self.index_dir / f"hotel_id_mapping{model_suffix}.json"
             
             if hotel_index_path.exists() and hotel_mapping_path.exists():
-                self.hotel_index = faiss.read_index(str(hotel_index_path))
-                with open(hotel_mapping_path, 'r') as f:
-                    self.hotel_mapping = json.load(f)
+                self.hotel_index = self._read_index(hotel_index_path)
+                self.hotel_mapping = self._load_mapping(hotel_mapping_path)
                 print(f"✓ Loaded hotel index ({model_suffix or 'default'}): {self.hotel_index.ntotal} vectors")
             else:
                 print(f"Warning: Hotel FAISS index not found for {model_suffix or 'default'} model")
@@ -111,9 +127,8 @@ class VectorSearcher:
             visa_mapping_path = self.index_dir / f"visa_id_mapping{model_suffix}.json"
             
             if visa_index_path.exists() and visa_mapping_path.exists():
-                self.visa_index = faiss.read_index(str(visa_index_path))
-                with open(visa_mapping_path, 'r') as f:
-                    self.visa_mapping = json.load(f)
+                self.visa_index = self._read_index(visa_index_path)
+                self.visa_mapping = self._load_mapping(visa_mapping_path)
                 print(f"✓ Loaded visa index ({model_suffix or 'default'}): {self.visa_index.ntotal} vectors")
             else:
                 print(f"Warning: Visa FAISS index not found for {model_suffix or 'default'} model")
@@ -123,9 +138,8 @@ class VectorSearcher:
             review_mapping_path = self.index_dir / f"review_id_mapping{model_suffix}.json"
             
             if review_index_path.exists() and review_mapping_path.exists():
-                self.review_index = faiss.read_index(str(review_index_path))
-                with open(review_mapping_path, 'r') as f:
-                    self.review_mapping = json.load(f)
+                self.review_index = self._read_index(review_index_path)
+                self.review_mapping = self._load_mapping(review_mapping_path)
                 print(f"✓ Loaded review index ({model_suffix or 'default'}): {self.review_index.ntotal} vectors")
             else:
                 print(f"Warning: Review FAISS index not found for {model_suffix or 'default'} model")
@@ -152,6 +166,40 @@ class VectorSearcher:
         print(f"✓ FAISS indexes reloaded successfully\n")
     
 
+    def _load_mapping(self, mapping_path) -> Dict[str, str]:
+        """
+        Load a FAISS position -> node ID mapping file
+        
+        Args:
+            mapping_path: Path to the JSON mapping
+            
+        Returns:
+            Mapping dictionary (string keys, as written by create_embeddings.py)
+        """
+        with open(mapping_path, 'rb') as f:
+            return _loads(f.read())
+    
+    def _read_index(self, index_path) -> faiss.Index:
+        """
+        Read a FAISS index from disk (memory-mapped when supported) and apply
+        query-time settings. Mapped files must be replaced, not rewritten in
+        place, while a searcher is running.
+        
+        Args:
+            index_path: Path to the .faiss file
+            
+        Returns:
+            Loaded FAISS index
+        """
+        try:
+            index = faiss.read_index(str(index_path), self.MMAP_FLAGS)
+        except RuntimeError:
+            # Index type without mmap support - read it into memory
+            index = faiss.read_index(str(index_path))
+        if hasattr(index, "nprobe"):
+            index.nprobe = self.IVF_NPROBE
+        return index
+    
     def load_index(self, index_path: str):
         """
         Load hotel FAISS index from disk
@@ -160,7 +208,7 @@ class VectorSearcher:
             index_path: Path to hotel FAISS index file
         """
         try:
-            self.hotel_index = faiss.read_index(index_path)
+            self.hotel_index = self._read_index(index_path)
             print(f"✓ Loaded hotel index from {index_path}")
         except Exception as e:
             print(f"Error loading index from {index_path}: {e}")
@@ -318,7 +366,7 @@ class VectorSearcher:
             # Search with more results to filter by threshold
             distances, indices = index.search(query_vector, limit * 2)
             
-            results = []
+            candidates = []  # (similarity, node_id) in FAISS rank order
             for dist, idx in zip(distances[0], indices[0]):
                 # Convert L2 distance to cosine similarity (approximate)
                 # For normalized vectors: similarity = 1 - (distance^2 / 2)
@@ -332,9 +380,13 @@ class VectorSearcher:
                 if not node_id:
                     continue
                 
-                # Fetch full node details from Neo4j
-                node_details = self._fetch_node_from_neo4j(node_id, node_type)
-                
+                candidates.append((similarity, node_id))
+            
+            # Fetch full node details from Neo4j for all candidates concurrently
+            details = self._fetch_nodes_from_neo4j([node_id for _, node_id in candidates], node_type)
+            
+            results = []
+            for (similarity, _), node_details in zip(candidates, details):
                 if node_details:
                     node_details['similarity_score'] = float(similarity)
                     node_details['node_type'] = node_type
@@ -374,17 +426,30 @@ class VectorSearcher:
         query_vector = np.array([embedding], dtype=np.float32)
         all_results = {}  # Key: node_id, Value: aggregated result
         
-        # Search each requested index
+        # Search each requested index (get more than limit to allow filtering)
+        searches = []  # (index_name, index, mapping)
         for index_name in indexes:
-            if index_name == "hotel" and self.hotel_index is not None:
-                index_results = self._search_index(
-                    self.hotel_index,
-                    self.hotel_mapping,
-                    query_vector,
-                    limit * 2,  # Get more to allow filtering
-                    threshold,
-                    "hotel"
-                )
+            if index_name not in self.INDEX_NAMES:
+                continue
+            index = getattr(self, f"{index_name}_index")
+            if index is not None:
+                searches.append((index_name, index, getattr(self, f"{index_name}_mapping")))
+        
+        def run(search):
+            index_name, index, mapping = search
+            return self._search_index(index, mapping, query_vector, limit * 2, threshold, index_name)
+        
+        if len(searches) > 1:
+            # FAISS releases the GIL during search and the per-hit Neo4j lookups
+            # are I/O bound, so the selected indexes run concurrently
+            with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+                searched = list(executor.map(run, searches))
+        else:
+            searched = [run(search) for search in searches]
+        
+        # Merge in request order so score boosting is deterministic
+        for (index_name, _, _), index_results in zip(searches, searched):
+            if index_name == "hotel":
                 for result in index_results:
                     node_id = result.get('hotel_id')
                     if node_id:
@@ -395,29 +460,13 @@ class VectorSearcher:
                             all_results[node_id]['similarity_score'] += result.get('similarity_score', 0) * 0.5
                             all_results[node_id]['search_indexes'] = all_results[node_id].get('search_indexes', []) + [index_name]
             
-            elif index_name == "visa" and self.visa_index is not None:
-                index_results = self._search_index(
-                    self.visa_index,
-                    self.visa_mapping,
-                    query_vector,
-                    limit * 2,
-                    threshold,
-                    "visa"
-                )
+            elif index_name == "visa":
                 for result in index_results:
                     node_id = f"{result.get('from_country')}_to_{result.get('to_country')}"
                     if node_id not in all_results:
                         all_results[node_id] = result
             
-            elif index_name == "review" and self.review_index is not None:
-                index_results = self._search_index(
-                    self.review_index,
-                    self.review_mapping,
-                    query_vector,
-                    limit * 2,
-                    threshold,
-                    "review"
-                )
+            elif index_name == "review":
                 for result in index_results:
                     node_id = result.get('hotel_id')
                     if node_id:
@@ -449,70 +498,116 @@ class VectorSearcher:
             Node details dictionary or None
         """
         try:
-            if node_type == "hotel":
-                cypher = """
-                MATCH (h:Hotel {hotel_id: $hotel_id})
-                OPTIONAL MATCH (h)-[:LOCATED_IN]->(c:City)-[:LOCATED_IN]->(country:Country)
-                RETURN h.hotel_id AS hotel_id,
-                       h.name AS hotel_name,
-                       h.star_rating AS star_rating,
-                       h.average_reviews_score AS avg_score,
-                       h.cleanliness_base AS cleanliness,
-                       h.comfort_base AS comfort,
-                       h.facilities_base AS facilities,
-                       h.location_base AS location,
-                       h.staff_base AS staff,
-                       h.value_for_money_base AS value,
-                       c.name AS city,
-                       country.name AS country
-                """
-                # Convert node_id to string as hotel_id is stored as string in Neo4j
-                params = {"hotel_id": str(node_id)}
-            elif node_type == "review":
-                # For reviews, node_id is actually the hotel_id from the review embedding mapping
-                # Fetch hotel details (same as hotel node_type)
-                cypher = """
-                MATCH (h:Hotel {hotel_id: $hotel_id})
-                OPTIONAL MATCH (h)-[:LOCATED_IN]->(c:City)-[:LOCATED_IN]->(country:Country)
-                RETURN h.hotel_id AS hotel_id,
-                       h.name AS hotel_name,
-                       h.star_rating AS star_rating,
-                       h.average_reviews_score AS avg_score,
-                       h.cleanliness_base AS cleanliness,
-                       h.comfort_base AS comfort,
-                       h.facilities_base AS facilities,
-                       h.location_base AS location,
-                       h.staff_base AS staff,
-                       h.value_for_money_base AS value,
-                       c.name AS city,
-                       country.name AS country
-                """
-                params = {"hotel_id": str(node_id)}
-            elif node_type == "visa":
-                # Parse visa_id like "Egypt_to_France"
-                parts = node_id.split("_to_")
-                if len(parts) == 2:
-                    from_country, to_country = parts[0], parts[1]
-                    cypher = """
-                    MATCH (from:Country {name: $from_country})-[v:NEEDS_VISA]->(to:Country {name: $to_country})
-                    RETURN from.name AS from_country,
-                           to.name AS to_country,
-                           v.visa_type AS visa_type,
-                           true AS visa_required
-                    """
-                    params = {"from_country": from_country, "to_country": to_country}
-                else:
-                    return None
-            else:
+            query = self._node_query(node_id, node_type)
+            if query is None:
                 return None
             
-            results = self.query_executor.execute(cypher, params)
+            results = self.query_executor.execute(*query)
             return results[0] if results else None
             
         except Exception as e:
             print(f"Error fetching {node_type} {node_id} from Neo4j: {e}")
             return None
     
+    def _fetch_nodes_from_neo4j(self, node_ids: List[str], node_type: str) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch full node details for several nodes with concurrent Neo4j queries
+        
+        Args:
+            node_ids: Node IDs in result order
+            node_type: "hotel", "visa", or "review"
+            
+        Returns:
+            Node details dictionaries (None where a node was not found) in node_ids order
+        """
+        details = [None] * len(node_ids)
+        positions, queries = [], []
+        for position, node_id in enumerate(node_ids):
+            query = self._node_query(node_id, node_type)
+            if query is not None:
+                positions.append(position)
+                queries.append(query)
+        
+        try:
+            results = self.query_executor.execute_many(queries)
+        except Exception as e:
+            print(f"Error fetching {node_type} nodes from Neo4j: {e}")
+            return details
+        
+        for position, records in zip(positions, results):
+            details[position] = records[0] if records else None
+        return details
+    
+    def _node_query(self, node_id: str, node_type: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Build the Cypher query that fetches one node's details
+        
+        Args:
+            node_id: Node ID (hotel_id, visa_id like "Egypt_to_France", or hotel_id for reviews)
+            node_type: "hotel", "visa", or "review"
+            
+        Returns:
+            (cypher, params) tuple, or None if the node ID or type is not recognized
+        """
+        if node_type == "hotel":
+            cypher = """
+            MATCH (h:Hotel {hotel_id: $hotel_id})
+            OPTIONAL MATCH (h)-[:LOCATED_IN]->(c:City)-[:LOCATED_IN]->(country:Country)
+            RETURN h.hotel_id AS hotel_id,
+                   h.name AS hotel_name,
+                   h.star_rating AS star_rating,
+                   h.average_reviews_score AS avg_score,
+                   h.cleanliness_base AS cleanliness,
+                   h.comfort_base AS comfort,
+                   h.facilities_base AS facilities,
+                   h.location_base AS location,
+                   h.staff_base AS staff,
+                   h.value_for_money_base AS value,
+                   c.name AS city,
+                   country.name AS country
+            """
+            # Convert node_id to string as hotel_id is stored as string in Neo4j
+            params = {"hotel_id": str(node_id)}
+        elif node_type == "review":
+            # For reviews, node_id is actually the hotel_id from the review embedding mapping
+            # Fetch hotel details (same as hotel node_type)
+            cypher = """
+            MATCH (h:Hotel {hotel_id: $hotel_id})
+            OPTIONAL MATCH (h)-[:LOCATED_IN]->(c:City)-[:LOCATED_IN]->(country:Country)
+            RETURN h.hotel_id AS hotel_id,
+                   h.name AS hotel_name,
+                   h.star_rating AS star_rating,
+                   h.average_reviews_score AS avg_score,
+                   h.cleanliness_base AS cleanliness,
+                   h.comfort_base AS comfort,
+                   h.facilities_base AS facilities,
+                   h.location_base AS location,
+                   h.staff_base AS staff,
+                   h.value_for_money_base AS value,
+                   c.name AS city,
+                   country.name AS country
+            """
+            params = {"hotel_id": str(node_id)}
+        elif node_type == "visa":
+            # Parse visa_id like "Egypt_to_France"
+            parts = node_id.split("_to_")
+            if len(parts) == 2:
+                from_country, to_country = parts[0], parts[1]
+                cypher = """
+                MATCH (from:Country {name: $from_country})-[v:NEEDS_VISA]->(to:Country {name: $to_country})
+                RETURN from.name AS from_country,
+                       to.name AS to_country,
+                       v.visa_type AS visa_type,
+                       true AS visa_required
+                """
+                params = {"from_country": from_country, "to_country": to_country}
+            else:
+                return None
+        else:
+            return None
+        
+        return cypher, params
+    
     def get_index_stats(self) -> Dict[str, Any]:
         """Get statistics about loaded indexes"""
         return {
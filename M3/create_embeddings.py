@@ -12,6 +12,65 @@ from utils.neo4j_client import Neo4jClient
 from utils.embedding_client import EmbeddingClient
 
 
+# Review index settings: IVF with 256 inverted lists, 16 probed per query (see
+# VectorSearcher.IVF_NPROBE), storing vectors as 8-bit scalar-quantized codes
+# (1 byte per dimension instead of 4; use QT_fp16 for 2 bytes and near-exact scores).
+# Hotels and visas are small enough to stay flat float32.
+REVIEW_IVF_NLIST = 256
+REVIEW_TRAIN_SAMPLE = 10000
+REVIEW_QUANTIZER = faiss.ScalarQuantizer.QT_8bit
+
+
+def build_review_index(embeddings_array: np.ndarray) -> faiss.Index:
+    """
+    Build the review FAISS index: a scalar-quantized inverted-file index when
+    there are enough vectors to train it, a scalar-quantized flat index otherwise
+    
+    Args:
+        embeddings_array: float32 array of shape (n, dimension)
+        
+    Returns:
+        Populated FAISS index (L2 metric, like the flat indexes)
+    """
+    count, dimension = embeddings_array.shape
+    # FAISS wants ~39 training points per centroid
+    min_train = REVIEW_IVF_NLIST * 39
+    
+    if count < min_train:
+        print(f"  Using flat scalar-quantized index ({count} vectors, IVF needs at least {min_train})")
+        index = faiss.IndexScalarQuantizer(dimension, REVIEW_QUANTIZER, faiss.METRIC_L2)
+        index.train(embeddings_array)
+        index.add(embeddings_array)
+        return index
+    
+    quantizer = faiss.IndexFlatL2(dimension)
+    index = faiss.IndexIVFScalarQuantizer(
+        quantizer, dimension, REVIEW_IVF_NLIST, REVIEW_QUANTIZER, faiss.METRIC_L2
+    )
+    
+    rng = np.random.default_rng(0)
+    sample_ids = rng.choice(count, size=min(count, REVIEW_TRAIN_SAMPLE), replace=False)
+    print(f"  Training IVF-SQ index on {len(sample_ids)} vectors (nlist={REVIEW_IVF_NLIST})...")
+    index.train(embeddings_array[sample_ids])
+    index.add(embeddings_array)
+    return index
+
+
+def write_index(index: faiss.Index, faiss_path: str):
+    """
+    Save a FAISS index by writing a temporary file and renaming it over the
+    old one, so running searchers that memory-map the old file keep a
+    consistent copy instead of seeing it rewritten underneath them
+    
+    Args:
+        index: FAISS index to save
+        faiss_path: Destination .faiss path
+    """
+    tmp_path = f"{faiss_path}.tmp"
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, faiss_path)
+
+
 def fetch_hotels_from_neo4j(neo4j_client: Neo4jClient) -> List[Dict]:
     """
     Fetch all hotels with their properties and visa requirements from Neo4j
@@ -116,21 +175,11 @@ def create_hotel_embeddings(
     
     # Build feature strings and generate embeddings
     print("Generating embeddings...")
-    hotel_ids = []
-    embeddings = []
+    hotel_ids = [hotel['hotel_id'] for hotel in hotels]
+    feature_strings = [build_hotel_feature_string(hotel) for hotel in hotels]
     
-    for i, hotel in enumerate(hotels):
-        hotel_id = hotel['hotel_id']
-        feature_string = build_hotel_feature_string(hotel)
-        
-        # Generate embedding
-        embedding = embedding_client.encode(feature_string)
-        
-        hotel_ids.append(hotel_id)
-        embeddings.append(embedding)
-        
-        if (i + 1) % 10 == 0:
-            print(f"  Processed {i + 1}/{len(hotels)} hotels...")
+    # Generate embeddings in batched forward passes
+    embeddings = embedding_client.encode_batch(feature_strings)
     
     print(f"✓ Generated embeddings for {len(embeddings)} hotels")
     
@@ -148,7 +197,7 @@ def create_hotel_embeddings(
     
     # Save FAISS index
     faiss_path = os.path.join(output_dir, "hotel_embeddings.faiss")
-    faiss.write_index(index, faiss_path)
+    write_index(index, faiss_path)
     print(f"✓ Saved FAISS index to {faiss_path}")
     
     # Create mapping: faiss_index -> hotel_id
@@ -236,22 +285,12 @@ def create_visa_embeddings(
     
     # Build feature strings and generate embeddings
     print("Generating embeddings...")
-    visa_ids = []
-    embeddings = []
+    # Create unique ID from country pair
+    visa_ids = [f"{visa_rel['from_country']}_to_{visa_rel['to_country']}" for visa_rel in visa_rels]
+    feature_strings = [build_visa_feature_string(visa_rel) for visa_rel in visa_rels]
     
-    for i, visa_rel in enumerate(visa_rels):
-        # Create unique ID from country pair
-        visa_id = f"{visa_rel['from_country']}_to_{visa_rel['to_country']}"
-        feature_string = build_visa_feature_string(visa_rel)
-        
-        # Generate embedding
-        embedding = embedding_client.encode(feature_string)
-        
-        visa_ids.append(visa_id)
-        embeddings.append(embedding)
-        
-        if (i + 1) % 10 == 0:
-            print(f"  Processed {i + 1}/{len(visa_rels)} visa relationships...")
+    # Generate embeddings in batched forward passes
+    embeddings = embedding_client.encode_batch(feature_strings)
     
     print(f"✓ Generated embeddings for {len(embeddings)} visa relationships")
     
@@ -269,7 +308,7 @@ def create_visa_embeddings(
     
     # Save FAISS index
     faiss_path = os.path.join(output_dir, "visa_embeddings.faiss")
-    faiss.write_index(index, faiss_path)
+    write_index(index, faiss_path)
     print(f"✓ Saved FAISS index to {faiss_path}")
     
     # Create mapping: faiss_index -> visa_id
@@ -392,21 +431,11 @@ def create_review_embeddings(
     
     # Build feature strings and generate embeddings
     print("Generating embeddings...")
-    hotel_ids = []  # Map each review embedding to its hotel_id
-    embeddings = []
+    hotel_ids = [review['hotel_id'] for review in reviews]  # Map to hotel_id, not review_id
+    feature_strings = [build_review_feature_string(review) for review in reviews]
     
-    for i, review in enumerate(reviews):
-        hotel_id = review['hotel_id']  # Map to hotel_id, not review_id
-        feature_string = build_review_feature_string(review)
-        
-        # Generate embedding
-        embedding = embedding_client.encode(feature_string)
-        
-        hotel_ids.append(hotel_id)
-        embeddings.append(embedding)
-        
-        if (i + 1) % 50 == 0:
-            print(f"  Processed {i + 1}/{len(reviews)} reviews...")
+    # Generate embeddings in batched forward passes
+    embeddings = embedding_client.encode_batch(feature_strings)
     
     print(f"✓ Generated embeddings for {len(embeddings)} reviews")
     
@@ -416,15 +445,14 @@ def create_review_embeddings(
     
     print(f"  Embedding dimension: {dimension}")
     
-    # Create FAISS index
-    index = faiss.IndexFlatL2(dimension)
-    index.add(embeddings_array)
+    # Create FAISS index (scalar-quantized IVF for large review collections)
+    index = build_review_index(embeddings_array)
     
     print(f"✓ Created FAISS index with {index.ntotal} vectors")
     
     # Save FAISS index
     faiss_path = os.path.join(output_dir, "review_embeddings.faiss")
-    faiss.write_index(index, faiss_path)
+    write_index(index, faiss_path)
     print(f"✓ Saved FAISS index to {faiss_path}")
     
     # Create mapping: faiss_index -> hotel_id (each review maps back to its hotel for result retrieval)
@@ -11,6 +11,7 @@ import numpy as np
 import faiss
 from utils.neo4j_client import Neo4jClient
 from utils.embedding_client import EmbeddingClient
+from create_embeddings import build_review_index, write_index
 
 
 def fetch_hotels_from_neo4j(neo4j_client: Neo4jClient) -> List[Dict]:
@@ -114,21 +115,11 @@ def create_hotel_embeddings(
     
     # Build feature strings and generate embeddings
     print("Generating embeddings...")
-    hotel_ids = []
-    embeddings = []
+    hotel_ids = [hotel['hotel_id'] for hotel in hotels]
+    feature_strings = [build_hotel_feature_string(hotel) for hotel in hotels]
     
-    for i, hotel in enumerate(hotels):
-        hotel_id = hotel['hotel_id']
-        feature_string = build_hotel_feature_string(hotel)
-        
-        # Generate embedding
-        embedding = embedding_client.encode(feature_string)
-        
-        hotel_ids.append(hotel_id)
-        embeddings.append(embedding)
-        
-        if (i + 1) % 10 == 0:
-            print(f"  Processed {i + 1}/{len(hotels)} hotels...")
+    # Generate embeddings in batched forward passes
+    embeddings = embedding_client.encode_batch(feature_strings)
     
     print(f"✓ Generated embeddings for {len(embeddings)} hotels")
     
@@ -146,7 +137,7 @@ def create_hotel_embeddings(
     
     # Save FAISS index with _mpnet suffix
     faiss_path = os.path.join(output_dir, "hotel_embeddings_mpnet.faiss")
-    faiss.write_index(index, faiss_path)
+    write_index(index, faiss_path)
     print(f"✓ Saved FAISS index to {faiss_path}")
     
     # Create mapping: faiss_index -> hotel_id
@@ -234,22 +225,12 @@ def create_visa_embeddings(
     
     # Build feature strings and generate embeddings
     print("Generating embeddings...")
-    visa_ids = []
-    embeddings = []
+    # Create unique ID from country pair
+    visa_ids = [f"{visa_rel['from_country']}_to_{visa_rel['to_country']}" for visa_rel in visa_rels]
+    feature_strings = [build_visa_feature_string(visa_rel) for visa_rel in visa_rels]
     
-    for i, visa_rel in enumerate(visa_rels):
-        # Create unique ID from country pair
-        visa_id = f"{visa_rel['from_country']}_to_{visa_rel['to_country']}"
-        feature_string = build_visa_feature_string(visa_rel)
-        
-        # Generate embedding
-        embedding = embedding_client.encode(feature_string)
-        
-        visa_ids.append(visa_id)
-        embeddings.append(embedding)
-        
-        if (i + 1) % 10 == 0:
-            print(f"  Processed {i + 1}/{len(visa_rels)} visa relationships...")
+    # Generate embeddings in batched forward passes
+    embeddings = embedding_client.encode_batch(feature_strings)
     
     print(f"✓ Generated embeddings for {len(embeddings)} visa relationships")
     
@@ -267,7 +248,7 @@ def create_visa_embeddings(
     
     # Save FAISS index with _mpnet suffix
     faiss_path = os.path.join(output_dir, "visa_embeddings_mpnet.faiss")
-    faiss.write_index(index, faiss_path)
+    write_index(index, faiss_path)
     print(f"✓ Saved FAISS index to {faiss_path}")
     
     # Create mapping: faiss_index -> visa_id
@@ -390,21 +371,11 @@ def create_review_embeddings(
     
     # Build feature strings and generate embeddings
     print("Generating embeddings...")
-    hotel_ids = []  # Map each review embedding to its hotel_id
-    embeddings = []
+    hotel_ids = [review['hotel_id'] for review in reviews]  # Map to hotel_id, not review_id
+    feature_strings = [build_review_feature_string(review) for review in reviews]
     
-    for i, review in enumerate(reviews):
-        hotel_id = review['hotel_id']  # Map to hotel_id, not review_id
-        feature_string = build_review_feature_string(review)
-        
-        # Generate embedding
-        embedding = embedding_client.encode(feature_string)
-        
-        hotel_ids.append(hotel_id)
-        embeddings.append(embedding)
-        
-        if (i + 1) % 50 == 0:
-            print(f"  Processed {i + 1}/{len(reviews)} reviews...")
+    # Generate embeddings in batched forward passes
+    embeddings = embedding_client.encode_batch(feature_strings)
     
     print(f"✓ Generated embeddings for {len(embeddings)} reviews")
     
@@ -414,15 +385,14 @@ def create_review_embeddings(
     
     print(f"  Embedding dimension: {dimension}")
     
-    # Create FAISS index
-    index = faiss.IndexFlatL2(dimension)
-    index.add(embeddings_array)
+    # Create FAISS index (scalar-quantized IVF for large review collections)
+    index = build_review_index(embeddings_array)
     
     print(f"✓ Created FAISS index with {index.ntotal} vectors")
     
     # Save FAISS index with _mpnet suffix
     faiss_path = os.path.join(output_dir, "review_embeddings_mpnet.faiss")
-    faiss.write_index(index, faiss_path)
+    write_index(index, faiss_path)
     print(f"✓ Saved FAISS index to {faiss_path}")
     
     # Create mapping: faiss_index -> hotel_id (each review maps back to its hotel for result retrieval)
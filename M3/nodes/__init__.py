@@ -7,6 +7,7 @@ from .input_node import input_node
 from .conversational_input_node import conversational_input_node
 from .intent_node import intent_node
 from .entity_node import entity_node
+from .analyze_node import analyze_node
 from .baseline_query_node import baseline_query_node
 from .embedding_query_node import embedding_query_node
 from .llm_query_node import llm_query_node
@@ -21,6 +22,7 @@ __all__ = [
     'conversational_input_node',
     'intent_node',
     'entity_node',
+    'analyze_node',
     'baseline_query_node',
     'embedding_query_node',
     'llm_query_node',
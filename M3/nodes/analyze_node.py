@@ -0,0 +1,42 @@
+"""
+Analyze Node - Classify intent and extract entities in one step
+Drop-in replacement for intent_node + entity_node; the workflows keep the
+separate nodes until the fused path is measured (run the intent and entity
+evaluations with --analyze)
+"""
+
+from state.graph_state import GraphState
+from components.query_analyzer import get_query_analyzer
+
+# Initialize analyzer once
+analyzer = get_query_analyzer()
+
+
+def analyze_node(state: GraphState) -> GraphState:
+    """
+    Classify user query intent and extract its entities (one fused LLM call at most)
+    
+    Args:
+        state: Current graph state
+        
+    Returns:
+        Updated state with intent and entities
+    """
+    query = state.get("user_query", "")
+    result = analyzer.analyze(query)
+    
+    # Return only changed fields
+    return {"intent": result["intent"], "entities": result["entities"]}
+
+
+if __name__ == "__main__":
+    # Test analyze node
+    test_state: GraphState = {
+        "user_query": "Find hotels in Paris"
+    }
+    
+    result = analyze_node(test_state)
+    print("Analyze Node Test:")
+    print(f"Query: {test_state['user_query']}")
+    print(f"Intent: {result.get('intent')}")
+    print(f"Entities: {result.get('entities')}")
@@ -4,9 +4,26 @@ Answer Node - Generate final answer from context using LLM
 
 from state.graph_state import GraphState
 from components.answer_generator import AnswerGenerator
+from utils.llm_client import get_llm_client
+
+try:
+    from langgraph.config import get_stream_writer
+except ImportError:
+    # Older langgraph has no custom stream mode; the answer is then returned in one piece
+    get_stream_writer = None
 
 # Initialize generator once
-generator = AnswerGenerator()
+generator = AnswerGenerator(llm_client=get_llm_client())
+
+
+def _stream_writer():
+    """LangGraph stream writer for the running graph, or None outside a graph run"""
+    if get_stream_writer is None:
+        return None
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return None
 
 
 def answer_node(state: GraphState) -> GraphState:
@@ -41,8 +58,14 @@ def answer_node(state: GraphState) -> GraphState:
     print(f"Intent: {intent}")
     print(f"Context length: {len(context)} characters")
     
-    # Generate answer
-    answer = generator.generate(query, context, intent)
+    # Generate answer, forwarding chunks to stream_mode="custom" consumers (e.g. chat_stream)
+    writer = _stream_writer()
+    chunks = []
+    for chunk in generator.generate_stream(query, context, intent):
+        chunks.append(chunk)
+        if writer is not None:
+            writer({"answer_chunk": chunk})
+    answer = "".join(chunks).strip()
     
     print(f"✓ Generated answer ({len(answer)} characters)")
     
@@ -24,7 +24,7 @@ def conversation_update_node(state: GraphState) -> GraphState:
     entities = state.get("entities", {})
     
     # Get existing history or initialize
-    chat_history = state.get("chat_history", []).copy()
+    chat_history = list(state.get("chat_history") or [])
     
     # Add user message
     if user_query:
@@ -68,6 +68,33 @@ def conversation_update_node(state: GraphState) -> GraphState:
     }
 
 
+def recent_messages(chat_history, last_n: int) -> list:
+    """
+    Last last_n messages of the history, keeping a leading summary message
+    (see ConversationSummarizer) even when it falls outside that range
+    
+    Args:
+        chat_history: Conversation messages, oldest first
+        last_n: Number of most recent messages to keep
+        
+    Returns:
+        List of messages
+    """
+    chat_history = list(chat_history or [])
+    recent = chat_history[-last_n:] if last_n > 0 else chat_history
+    if chat_history and chat_history[0].get("role") == "system" and recent and recent[0] is not chat_history[0]:
+        recent.insert(0, chat_history[0])
+    return recent
+
+
+def format_role(msg: dict) -> str:
+    """Speaker label used when rendering a history message into a prompt"""
+    role = msg.get("role")
+    if role == "system":
+        return "Earlier conversation (summary)"
+    return "User" if role == "user" else "Assistant"
+
+
 def conversation_context_node(state: GraphState) -> GraphState:
     """
     Format conversation history as context string for LLM
@@ -85,14 +112,14 @@ def conversation_context_node(state: GraphState) -> GraphState:
         return {}  # No changes if no history
     
     # Format last few messages
-    recent = chat_history[-6:]  # Last 3 turns (6 messages)
+    recent = recent_messages(chat_history, 6)  # Last 3 turns (6 messages)
     context_lines = ["Recent conversation:"]
     
     for msg in recent:
-        role = "User" if msg.get("role") == "user" else "Assistant"
+        role = format_role(msg)
         content = msg.get("content", "")
-        # Truncate long messages
-        if len(content) > 150:
+        # Truncate long messages (the summary is already short)
+        if len(content) > 150 and msg.get("role") != "system":
             content = content[:150] + "..."
         context_lines.append(f"{role}: {content}")
     
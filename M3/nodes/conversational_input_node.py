@@ -5,9 +5,11 @@ Used only in conversational_hybrid_workflow
 
 from state.graph_state import GraphState
 from components.query_rewriter import QueryRewriter
+from utils.llm_client import get_llm_client
+from nodes.conversation_nodes import recent_messages, format_role
 
 # Initialize query rewriter
-rewriter = QueryRewriter()
+rewriter = QueryRewriter(llm_client=get_llm_client())
 
 
 def conversational_input_node(state: GraphState) -> GraphState:
@@ -60,13 +62,13 @@ def conversational_input_node(state: GraphState) -> GraphState:
 
 def _format_history(chat_history: list, last_n: int = 4) -> str:
     """Format chat history for context"""
-    recent = chat_history[-last_n:] if last_n > 0 else chat_history
+    recent = recent_messages(chat_history, last_n)
     if not recent:
         return ""
     
     lines = ["Previous conversation:"]
     for msg in recent:
-        role = "User" if msg.get("role") == "user" else "Assistant"
+        role = format_role(msg)
         content = msg.get("content", "")
         lines.append(f"{role}: {content}")
     
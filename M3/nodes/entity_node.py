@@ -3,10 +3,10 @@ Entity Node - Extract entities from query
 """
 
 from state.graph_state import GraphState
-from components.entity_extractor import EntityExtractor
+from components.entity_extractor import get_entity_extractor
 
 # Initialize extractor once
-extractor = EntityExtractor()
+extractor = get_entity_extractor()
 
 
 def entity_node(state: GraphState) -> GraphState:
@@ -5,9 +5,10 @@ Integrated query rewriting for conversation context
 
 from state.graph_state import GraphState
 from components.query_rewriter import QueryRewriter
+from utils.llm_client import get_llm_client
 
 # Initialize query rewriter
-rewriter = QueryRewriter()
+rewriter = QueryRewriter(llm_client=get_llm_client())
 
 
 def input_node(state: GraphState) -> GraphState:
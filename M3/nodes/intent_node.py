@@ -3,10 +3,10 @@ Intent Node - Classify user query intent
 """
 
 from state.graph_state import GraphState
-from components.intent_classifier import IntentClassifier
+from components.intent_classifier import get_intent_classifier
 
 # Initialize classifier once
-classifier = IntentClassifier()
+classifier = get_intent_classifier()
 
 
 def intent_node(state: GraphState) -> GraphState:
@@ -5,9 +5,10 @@ LLM Query Node - LLM generates Cypher and executes it
 from state.graph_state import GraphState
 from components.llm_query_generator import LLMQueryGenerator
 from components.query_executor import QueryExecutor
+from utils.llm_client import get_llm_client
 
 # Initialize components once
-generator = LLMQueryGenerator()
+generator = LLMQueryGenerator(llm_client=get_llm_client())
 executor = QueryExecutor()
 
 
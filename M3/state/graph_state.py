@@ -3,7 +3,7 @@ GraphState TypedDict definition for LangGraph workflows
 Supports all 4 workflow modes with optional fields
 """
 
-from typing import TypedDict, Optional, List, Dict, Any
+from typing import TypedDict, Optional, List, Dict, Any, Sequence
 
 
 class GraphState(TypedDict, total=False):
@@ -39,7 +39,7 @@ class GraphState(TypedDict, total=False):
     llm_response: Optional[str]
     
     # Conversation context (for multi-turn dialogue)
-    chat_history: Optional[List[Dict[str, Any]]]  # Previous conversation turns
+    chat_history: Optional[Sequence[Dict[str, Any]]]  # Previous conversation turns (read-only)
     conversation_context: Optional[str]  # Formatted context string
     
     # Output
@@ -0,0 +1,49 @@
+"""
+Shared pytest fixtures for the LLM-backed evaluation harness
+Components are built once per session (per worker under pytest-xdist)
+and reused by every test instead of being re-created per script
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Make M3 packages and the Evaluations helpers importable
+M3_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(M3_DIR))
+sys.path.insert(0, str(M3_DIR / "Evaluations"))
+
+
+@pytest.fixture(scope="session")
+def llm_client():
+    """LLM client singleton; skips LLM-backed tests when dependencies or the API key are missing"""
+    try:
+        from utils.llm_client import get_llm_client
+    except ImportError as e:
+        pytest.skip(f"LLM dependencies not installed: {e}")
+    client = get_llm_client()
+    if not client.get_config()['initialized']:
+        pytest.skip("LLM client not initialized - set GROQ_API_KEY to run evaluation tests")
+    return client
+
+
+@pytest.fixture(scope="session")
+def old_classifier(llm_client):
+    """OLD LLM-only intent classifier shared across the session"""
+    from components.intent_classifier_old_LLM_only import IntentClassifier
+    return IntentClassifier()
+
+
+@pytest.fixture(scope="session")
+def extractor(llm_client):
+    """Entity extractor (debug output on) shared across the session"""
+    from components.entity_extractor import EntityExtractor
+    return EntityExtractor(debug=True)
+
+
+@pytest.fixture(scope="session")
+def classifier(llm_client):
+    """Hybrid intent classifier shared across the session"""
+    from components.intent_classifier import IntentClassifier
+    return IntentClassifier()
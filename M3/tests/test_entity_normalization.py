@@ -0,0 +1,64 @@
+"""
+City/country normalization in the entity extractor (offline: the LLM typo
+check is stubbed to decline, so no API key is needed)
+"""
+
+import pytest
+
+entity_extractor = pytest.importorskip("components.entity_extractor", reason="extractor dependencies not installed")
+EntityExtractor = entity_extractor.EntityExtractor
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    monkeypatch.setattr(EntityExtractor, "_load_valid_hotels", lambda self, refresh=False: None)
+    monkeypatch.setattr(EntityExtractor, "_validate_typo_with_llm", lambda self, *args: None)
+    return EntityExtractor(use_cache=False)
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("Austria", "Austria"),  # Close to "Australia", but a different country
+    ("Arab", "Arab"),
+    ("south africa republic", "South Africa"),
+    ("uk", "United Kingdom"),
+])
+def test_normalize_country(extractor, value, expected):
+    assert extractor._normalize_country(value) == expected
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("New", "New"),
+    ("Town", "Town"),
+    ("rio", "Rio de Janeiro"),
+    ("new york city", "New York"),
+    ("buenos", "Buenos Aires"),
+])
+def test_normalize_city(extractor, value, expected):
+    assert extractor._normalize_city(value) == expected
+
+
+def _containment_baseline(value):
+    """Pre-RapidFuzz rule: exact name or alias, else the first country either containing or contained in the value"""
+    value_lower = value.lower().strip()
+    if value_lower in EntityExtractor._COUNTRY_EXACT:
+        return EntityExtractor._COUNTRY_EXACT[value_lower]
+    if len(value_lower) >= EntityExtractor.PARTIAL_MATCH_MIN_LENGTH:
+        for country in EntityExtractor.VALID_COUNTRIES:
+            if value_lower in country.lower() or country.lower() in value_lower:
+                return country
+    return value.title()
+
+
+@pytest.mark.parametrize("from_country,to_country", [
+    ("Austria", "Republic of South Africa"),
+    ("Arab", "Thailandia"),
+    ("zealand", "kingdom"),
+    ("Austria", "Austria"),
+])
+def test_batched_validation_matches_baseline(extractor, from_country, to_country):
+    # Two country names in one pass take the batched cdist path
+    validated = extractor._validate_entities({"from_country": from_country, "to_country": to_country})
+    assert validated == {
+        "from_country": _containment_baseline(from_country),
+        "to_country": _containment_baseline(to_country),
+    }
@@ -0,0 +1,64 @@
+"""
+Local typo-correction index used by the entity extractor
+"""
+
+import pytest
+
+fuzzy_index = pytest.importorskip("components.fuzzy_index", reason="components package dependencies not installed")
+
+CITIES = ["Paris", "London", "Rome", "Barcelona", "Amsterdam"]
+COUNTRIES = ["Spain", "Canada", "Japan", "Australia", "Nigeria"]
+
+
+@pytest.mark.parametrize("a,b,expected", [
+    ("paris", "paris", 0),
+    ("paaris", "paris", 1),
+    ("londan", "london", 1),
+    ("ab", "ba", 1),
+    ("ca", "abc", 3),   # Restricted transpositions: no edits inside a swapped pair
+    ("", "rome", 4),
+    ("x" * 70 + "ab", "x" * 70 + "ba", 1),
+])
+def test_osa_distance_bit_parallel(a, b, expected):
+    assert fuzzy_index.osa_distance(a, b) == expected
+    assert fuzzy_index.osa_distance(b, a) == expected
+
+
+@pytest.mark.parametrize("a,b,k,expected", [
+    ("paaris", "paris", 2, 1),
+    ("rome", "barcelona", 2, 3),        # Rejected on length difference alone
+    ("london", "lisbon", 1, 2),         # Early exit once the bound is exceeded
+    ("amsterdam", "amstredam", 2, 1),
+])
+def test_osa_distance_bounded(a, b, k, expected):
+    assert fuzzy_index.osa_distance_bp(fuzzy_index.char_masks(a), len(a), b, k) == expected
+
+
+@pytest.mark.parametrize("options,user_input,expected", [
+    (CITIES, "Paaris", "Paris"),
+    (CITIES, "Londan", "London"),
+    (CITIES, "Barcelnoa", "Barcelona"),
+    (COUNTRIES, "Span", "Spain"),
+    (COUNTRIES, "Canda", "Canada"),
+    (COUNTRIES, "Austria", None),   # Distance 2 on a short name is left to the LLM
+    (COUNTRIES, "Germany", None),
+])
+def test_fuzzy_index_lookup(options, user_input, expected):
+    assert fuzzy_index.FuzzyIndex(options).lookup(user_input) == expected
+
+
+def test_trigram_containment_candidates_cover_brute_force():
+    hotels = ["the grand hotel", "grand palace", "hotel ab", "ab", "royal inn", "park plaza tower"]
+    index = fuzzy_index.TrigramIndex(hotels)
+    for query in ["grand", "the grand hotel paris", "hotel", "inn", "ab", "plaza", "xyz"]:
+        expected = [i for i, hotel in enumerate(hotels) if query in hotel or hotel in query]
+        candidates = index.containment_candidates(query)
+        assert set(expected) <= set(candidates)
+        assert candidates == sorted(candidates)
+
+
+def test_trigram_shortlist():
+    index = fuzzy_index.TrigramIndex(["grand palace", "royal inn", "park plaza"])
+    assert index.shortlist("grnd palace") == [0]
+    assert index.shortlist("zzzz") == []
+    assert index.shortlist("ab") == [0, 1, 2]  # Too short to filter
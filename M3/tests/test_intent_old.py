@@ -0,0 +1,71 @@
+"""
+OLD intent classifier (LLM-only) accuracy over the shared cases
+Same cases as Evaluations/test_intent_classifier_old.py; the baseline is
+expected to miss some of them, so only an aggregate floor is asserted
+"""
+
+import re
+
+import pytest
+
+from shared_test_cases import load_intent_test_cases
+
+CASES = [(case["query"], case["expected"]) for case in load_intent_test_cases()]
+
+# Recorded baseline: 74.07% (Evaluations/intent_classifier_old_results.txt), minus LLM run-to-run noise
+MIN_ACCURACY = 0.70
+
+
+def test_accuracy_floor(old_classifier):
+    misses = []
+    for query, expected in CASES:
+        predicted = old_classifier.classify(query)
+        if predicted != expected:
+            misses.append((query, expected, predicted))
+    accuracy = 1 - len(misses) / len(CASES)
+    assert accuracy >= MIN_ACCURACY, f"accuracy {accuracy:.2%} below {MIN_ACCURACY:.0%}; misses: {misses}"
+
+
+class _RateLimitedClient:
+    """LLM client stub answering 429 for the first `failures` calls, then a fixed intent"""
+    
+    model = "stub-model"
+    
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+    
+    def _call(self, answer):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise Exception("Error code: 429 - rate_limit_exceeded")
+        return answer
+    
+    def generate(self, prompt, **kwargs):
+        return self._call("HotelSearch")
+    
+    def generate_json(self, prompt, **kwargs):
+        # One intent per numbered query line in the batched prompt
+        return self._call(["HotelSearch"] * len(re.findall(r'^\d+\. ', prompt, re.MULTILINE)))
+
+
+def test_rate_limit_is_retried(tmp_path, monkeypatch):
+    tester_module = pytest.importorskip("test_intent_classifier_old", reason="classifier dependencies not installed")
+    tester_cls = tester_module.IntentClassifierTester
+    monkeypatch.setattr(tester_cls, "CLASSIFY_CACHE_DIR", tmp_path)
+    tester = tester_cls(max_workers=1, requests_per_minute=0)
+    client = _RateLimitedClient(failures=2)
+    tester.classifier.llm_client = client
+    monkeypatch.setattr(tester, "_retry_delay", lambda error, attempt: 0.0)
+    
+    tester._open_cache()
+    try:
+        outcomes = tester._classify_chunk([0, 1, 2])
+        cached = dict(tester._cache)
+    finally:
+        tester._close_cache()
+    
+    # Both 429s were retried rather than recorded as fallback predictions
+    assert client.calls == 3
+    assert [predicted for _, predicted, _ in outcomes] == ["HotelSearch"] * 3
+    assert len(cached) == 3
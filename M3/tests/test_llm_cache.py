@@ -0,0 +1,45 @@
+"""
+LLM response cache used by the entity extractor
+"""
+
+import pytest
+
+llm_cache = pytest.importorskip("utils.llm_cache", reason="utils package dependencies not installed")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return llm_cache.LLMCache(path=tmp_path / "llm.sqlite")
+
+
+def test_get_returns_copy(cache):
+    cache.set("k", {"city": "Paris"})
+    cache.get("k")["city"] = "Rome"
+    assert cache.get("k") == {"city": "Paris"}
+
+
+def test_survives_restart(tmp_path):
+    llm_cache.LLMCache(path=tmp_path / "llm.sqlite").set("k", {"city": "Paris"})
+    assert llm_cache.LLMCache(path=tmp_path / "llm.sqlite").get("k") == {"city": "Paris"}
+
+
+def test_expired_entries_miss(cache):
+    cache.set("k", {"city": "Paris"}, ttl=-1)
+    assert cache.get("k") is None
+
+
+def test_memory_lru_falls_back_to_disk(tmp_path):
+    cache = llm_cache.LLMCache(path=tmp_path / "llm.sqlite", memory_size=1)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert "a" not in cache._memory
+    assert cache.get("a") == 1
+
+
+def test_disk_store_is_bounded(tmp_path):
+    cache = llm_cache.LLMCache(path=tmp_path / "llm.sqlite", memory_size=1, max_entries=2)
+    cache.PRUNE_INTERVAL = 1
+    for n, key in enumerate("abc"):
+        cache.set(key, n, ttl=100 + n)
+    assert cache.get("a") is None  # Soonest to expire
+    assert cache.get("c") == 2
@@ -0,0 +1,39 @@
+"""
+Constrained-decoding fallback in the LLM client (no API calls)
+"""
+
+import pytest
+
+llm_client = pytest.importorskip("utils.llm_client", reason="LLM dependencies not installed")
+LLMClient = llm_client.LLMClient
+
+RESPONSE_FORMAT = {"type": "json_object"}
+SCHEMA = {"city": "string or null"}
+
+
+class _BadRequest(Exception):
+    status_code = 400
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(LLMClient, "_response_format_unsupported", set())
+    return object.__new__(LLMClient)
+
+
+def test_validation_failure_keeps_response_format(client):
+    error = _BadRequest("Error code: 400 - {'error': {'code': 'json_validate_failed'}}")
+    assert client._response_format_rejected(RESPONSE_FORMAT, error, "m")
+    assert client._response_format(SCHEMA, "m") is not None
+
+
+def test_unsupported_response_format_is_remembered(client):
+    error = _BadRequest("Error code: 400 - response_format `json_schema` is not supported with this model")
+    assert client._response_format_rejected(RESPONSE_FORMAT, error, "m")
+    assert client._response_format(SCHEMA, "m") is None
+
+
+def test_other_bad_requests_propagate(client):
+    error = _BadRequest("Error code: 400 - context_length_exceeded")
+    assert not client._response_format_rejected(RESPONSE_FORMAT, error, "m")
+    assert client._response_format(SCHEMA, "m") is not None
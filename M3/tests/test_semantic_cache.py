@@ -0,0 +1,59 @@
+"""
+Semantic cache used by the entity extractor and answer generator
+"""
+
+import pytest
+
+semantic_cache = pytest.importorskip("components.semantic_cache", reason="components package dependencies not installed")
+
+VOCAB = ["hotels", "hotel", "in", "paris", "rome", "cheap", "find", "me", "show", "quiet"]
+
+
+class WordEmbedder:
+    """Bag-of-words embedder: queries with the same words get identical vectors"""
+
+    def embed(self, text):
+        words = text.split()
+        return [float(words.count(word)) for word in VOCAB]
+
+    def get_model_name(self):
+        return "bag-of-words"
+
+
+@pytest.fixture
+def cache():
+    return semantic_cache.SemanticCache("test", threshold=0.95, persist=False, embedder=WordEmbedder())
+
+
+def test_hit_for_same_words(cache):
+    cache.store("HotelSearch", "cheap hotels in Paris", {"city": "Paris"})
+    assert cache.lookup("HotelSearch", "Hotels in  paris cheap") == {"city": "Paris"}
+
+
+def test_miss_below_threshold(cache):
+    cache.store("HotelSearch", "cheap hotels in Paris", {"city": "Paris"})
+    assert cache.lookup("HotelSearch", "quiet hotel in Rome") is None
+
+
+def test_buckets_are_isolated(cache):
+    cache.store("HotelSearch", "hotels in Paris", {"city": "Paris"})
+    assert cache.lookup("HotelRecommendation", "hotels in Paris") is None
+
+
+def test_eviction_keeps_newest(cache):
+    cache.max_entries = 4
+    for n in range(5):
+        cache.store("b", "hotels in paris " + "me " * n, n)
+    assert cache.size() == 2
+    assert cache.lookup("b", "hotels in paris me me me me") == 4
+    assert cache.lookup("b", "hotels in paris") is None
+
+
+def test_save_and_load(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic_cache.SemanticCache, "CACHE_DIR", tmp_path)
+    first = semantic_cache.SemanticCache("disk", embedder=WordEmbedder())
+    first.store("HotelSearch", "hotels in Rome", {"city": "Rome"})
+    first.save()
+
+    second = semantic_cache.SemanticCache("disk", embedder=WordEmbedder())
+    assert second.lookup("HotelSearch", "Rome hotels in") == {"city": "Rome"}
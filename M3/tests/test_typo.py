@@ -0,0 +1,27 @@
+"""
+Typo validation checks from Evaluations/test_typo_debug.py and
+Evaluations/test_typo_fixes.py as pytest tests
+"""
+
+import pytest
+
+from shared_test_cases import TYPO_FIX_CASES
+
+
+@pytest.mark.parametrize("user_input,valid_attr,entity_type,expected", [
+    ("Paaris", "VALID_CITIES", "city", "Paris"),
+])
+def test_closest_match_with_llm(extractor, user_input, valid_attr, entity_type, expected):
+    valid_options = getattr(extractor, valid_attr)
+    assert extractor._find_closest_match_with_llm(user_input, valid_options, entity_type) == expected
+
+
+@pytest.mark.parametrize("query,expected", TYPO_FIX_CASES)
+def test_typo_fix(classifier, extractor, query, expected):
+    extracted = extractor.extract(query, classifier.classify(query))
+    for key, value in expected.items():
+        assert key in extracted
+        if isinstance(value, float):
+            assert abs(extracted[key] - value) <= 0.01
+        else:
+            assert extracted[key] == value
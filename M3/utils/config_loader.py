@@ -110,6 +110,7 @@ class ConfigLoader:
             'llm': {
                 'provider': 'groq',
                 'default_model': 'openai/gpt-oss-120b',
+                'extraction_model': None,
                 'available_models': [
                     {
                         'name': 'openai/gpt-oss-120b',
@@ -162,7 +163,19 @@ class ConfigLoader:
                     }
                 ],
                 'cache_embeddings': True,
-                'batch_size': 32
+                'batch_size': 32,
+                'backend': 'torch',
+                'onnx_file': 'onnx/model_quint8_avx2.onnx'
+            },
+            'semantic_cache': {
+                'enabled': False,
+                'threshold': 0.95,
+                'max_entries': 2048
+            },
+            'llm_cache': {
+                'enabled': True,
+                'ttl_days': 7,
+                'max_entries': 50000
             },
             'neo4j': {
                 'uri': None,
@@ -3,6 +3,9 @@ Embedding client for Graph-RAG Hotel Travel Assistant
 Manages sentence-transformer models for generating embeddings
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import List, Optional, Union, Dict, Any
 from sentence_transformers import SentenceTransformer
 import numpy as np
@@ -18,7 +21,14 @@ class EmbeddingClient:
     _model: Optional[SentenceTransformer] = None
     _model_name: str = "all-MiniLM-L6-v2"
     _dimension: int = 384
-    _cache: dict = {}
+    _backend: str = "torch"
+    # Quantized ONNX export shipped in the sentence-transformers model repos
+    # (int8 weights, AVX2 kernels); used when embedding.backend is "onnx"
+    DEFAULT_ONNX_FILE = "onnx/model_quint8_avx2.onnx"
+    # LRU of single-text embeddings keyed by content hash (see _cache_key)
+    _cache: "OrderedDict[str, List[float]]" = OrderedDict()
+    _cache_lock = threading.Lock()
+    CACHE_SIZE = 1024
     
     def __new__(cls, model_name: Optional[str] = None):
         if cls._instance is None:
@@ -56,20 +66,54 @@ class EmbeddingClient:
         """
         try:
             print(f"Loading embedding model: {model_name}...")
-            self._model = SentenceTransformer(model_name)
+            self._model = self._load_sentence_transformer(model_name)
             self._model_name = model_name
             
             # Get embedding dimension
             test_embedding = self._model.encode("test")
             self._dimension = len(test_embedding)
             
-            print(f"✓ Embedding model loaded: {model_name} ({self._dimension} dimensions)")
+            print(f"✓ Embedding model loaded: {model_name} ({self._dimension} dimensions, {self._backend} backend)")
             return True
             
         except Exception as e:
             print(f"✗ Failed to load embedding model {model_name}: {e}")
             self._model = None
             return False
+    
+    def _load_sentence_transformer(self, model_name: str) -> SentenceTransformer:
+        """
+        Build the SentenceTransformer on the configured inference backend.
+        embedding.backend "onnx" runs a quantized ONNX Runtime export of the
+        same encoder (same encode() API, 2-4x faster on CPU); anything that
+        prevents it from loading falls back to the PyTorch fp32 model.
+        
+        Args:
+            model_name: Model identifier from sentence-transformers
+            
+        Returns:
+            Loaded SentenceTransformer
+        """
+        from .config_loader import ConfigLoader
+        config = ConfigLoader()
+        backend = config.get('embedding.backend', 'torch')
+        
+        if backend == "onnx":
+            onnx_file = config.get('embedding.onnx_file', self.DEFAULT_ONNX_FILE)
+            try:
+                # backend= needs sentence-transformers >= 3.2 and optimum[onnxruntime]
+                model = SentenceTransformer(
+                    model_name,
+                    backend="onnx",
+                    model_kwargs={"file_name": onnx_file}
+                )
+                self._backend = "onnx"
+                return model
+            except Exception as e:
+                print(f"⚠️  ONNX backend unavailable for {model_name} ({e}), using PyTorch")
+        
+        self._backend = "torch"
+        return SentenceTransformer(model_name)
 
     def reload_model(self, model_name: str):
         """
@@ -115,8 +159,13 @@ class EmbeddingClient:
         
         try:
             # Check cache for single string
-            if isinstance(text, str) and text in self._cache:
-                return self._cache[text]
+            if isinstance(text, str):
+                cache_key = self._cache_key(text, normalize)
+                with self._cache_lock:
+                    cached = self._cache.get(cache_key)
+                    if cached is not None:
+                        self._cache.move_to_end(cache_key)
+                        return cached
             
             # Generate embeddings
             embeddings = self._model.encode(
@@ -129,9 +178,11 @@ class EmbeddingClient:
             # Convert to list format for JSON serialization
             if isinstance(text, str):
                 result = embeddings.tolist()
-                # Cache single embedding
-                if len(self._cache) < 1000:  # Limit cache size
-                    self._cache[text] = result
+                # Cache single embedding, evicting the least recently used
+                with self._cache_lock:
+                    self._cache[cache_key] = result
+                    if len(self._cache) > self.CACHE_SIZE:
+                        self._cache.popitem(last=False)
                 return result
             else:
                 return [emb.tolist() for emb in embeddings]
@@ -140,12 +191,30 @@ class EmbeddingClient:
             print(f"Error generating embeddings: {e}")
             raise
     
+    def _cache_key(self, text: str, normalize: bool) -> str:
+        """
+        Content hash for the embedding cache. Repeated turns that differ only
+        in surrounding or repeated whitespace share an entry; case is kept
+        because not every model is uncased.
+        
+        Args:
+            text: Text to embed
+            normalize: Whether the embedding is unit-normalized
+            
+        Returns:
+            Hex digest identifying the cache entry
+        """
+        key = f"{self._model_name}\0{int(normalize)}\0{' '.join(text.split())}"
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    
     def encode_batch(
         self,
         texts: List[str],
         batch_size: int = 32,
-        normalize: bool = True
-    ) -> List[List[float]]:
+        normalize: bool = True,
+        show_progress: bool = True,
+        as_numpy: bool = False
+    ) -> Union[List[List[float]], np.ndarray]:
         """
         Generate embeddings for batch of texts efficiently
         
@@ -153,9 +222,11 @@ class EmbeddingClient:
             texts: List of text strings
             batch_size: Batch size for encoding
             normalize: Normalize embeddings
+            show_progress: Show progress bar (off for small query batches)
+            as_numpy: Return one float32 (len(texts), dimension) array instead of lists
             
         Returns:
-            List of embedding vectors
+            List of embedding vectors, or a 2-D array if as_numpy
         """
         if self._model is None:
             raise RuntimeError("Embedding model not loaded")
@@ -165,10 +236,12 @@ class EmbeddingClient:
                 texts,
                 batch_size=batch_size,
                 normalize_embeddings=normalize,
-                show_progress_bar=True,
+                show_progress_bar=show_progress,
                 convert_to_numpy=True
             )
             
+            if as_numpy:
+                return np.asarray(embeddings, dtype=np.float32)
             return [emb.tolist() for emb in embeddings]
             
         except Exception as e:
@@ -229,6 +302,7 @@ class EmbeddingClient:
         return {
             'model_name': self._model_name,
             'dimension': self._dimension,
+            'backend': self._backend,
             'loaded': self._model is not None,
             'cache_size': len(self._cache)
         }
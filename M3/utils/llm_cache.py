@@ -0,0 +1,187 @@
+"""
+LLM response cache for Graph-RAG Hotel Travel Assistant
+Persistent store of LLM-backed results (entity extractions): in-memory LRU in front of SQLite
+"""
+
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+from utils.config_loader import ConfigLoader
+
+
+class LLMCache:
+    """
+    Cache of LLM-backed results under caller-built keys, which must hash
+    everything that determines the result (model, versions, inputs). Hot keys
+    are served from memory; everything else from a SQLite file that survives
+    restarts, with one TTL and a size limit for all entries. Only results of
+    deterministic (temperature 0) calls should be cached.
+    """
+
+    DEFAULT_TTL = 7 * 86400  # Seconds
+    MEMORY_SIZE = 1024
+    MAX_ENTRIES = 50000  # On disk; expired and then soonest-expiring entries are evicted beyond this
+    PRUNE_INTERVAL = 256  # Writes between eviction passes
+    CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "llm_responses.sqlite"
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttl: Optional[float] = None,
+        memory_size: Optional[int] = None,
+        max_entries: Optional[int] = None
+    ):
+        """
+        Initialize LLM response cache
+
+        Args:
+            path: SQLite file (default: CACHE_PATH); ":memory:" keeps nothing on disk
+            ttl: Seconds an entry stays valid (default: DEFAULT_TTL)
+            memory_size: Entries kept in the in-process LRU (default: MEMORY_SIZE)
+            max_entries: Entries kept on disk (default: MAX_ENTRIES)
+        """
+        self.path = path or self.CACHE_PATH
+        self.ttl = ttl if ttl is not None else self.DEFAULT_TTL
+        self.memory_size = memory_size or self.MEMORY_SIZE
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, json text)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db = self._connect()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Cache key
+
+        Returns:
+            A fresh copy of the cached value, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    return json.loads(entry[1])
+                del self._memory[key]
+
+            if self._db is None:
+                return None
+            try:
+                row = self._db.execute(
+                    "SELECT expires_at, value FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[0] <= now:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    row = None
+            except sqlite3.Error as e:
+                print(f"⚠ LLM cache read failed: {e}")
+                return None
+            if row is None:
+                return None
+            self._remember(key, row[0], row[1])
+        return json.loads(row[1])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Store a response (must be JSON-serializable; storage errors are non-fatal)
+
+        Args:
+            key: Cache key
+            value: JSON-serializable result
+            ttl: Seconds the entry stays valid (default: the cache's ttl)
+        """
+        try:
+            text = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+
+        with self._lock:
+            self._remember(key, expires_at, text)
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, expires_at, value) VALUES (?, ?, ?)",
+                    (key, expires_at, text)
+                )
+                self._writes += 1
+                if self._writes % self.PRUNE_INTERVAL == 0:
+                    self._prune()
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠ LLM cache write failed: {e}")
+
+    def clear(self):
+        """Remove all entries from memory and disk"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM responses")
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠ LLM cache clear failed: {e}")
+
+    def _prune(self):
+        """Drop expired entries, then the soonest-expiring ones beyond max_entries (caller holds the lock)"""
+        self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        excess = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY expires_at LIMIT ?)", (excess,)
+            )
+
+    def _remember(self, key: str, expires_at: float, text: str):
+        """Add an entry to the in-memory LRU (caller holds the lock)"""
+        self._memory[key] = (expires_at, text)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite store, or None (memory only) if it cannot be opened"""
+        try:
+            if str(self.path) != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            # Shared across threads; every access goes through self._lock
+            db = sqlite3.connect(str(self.path), check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)")
+            self._db = db
+            self._prune()  # Start from a bounded store
+            db.commit()
+            return db
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠ LLM cache unavailable on disk, using memory only: {e}")
+            return None
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> Optional[LLMCache]:
+    """
+    Get the process-wide LLM response cache
+
+    Returns:
+        LLMCache, or None when llm_cache.enabled is false in config
+    """
+    config = ConfigLoader()
+    if not config.get('llm_cache.enabled', True):
+        return None
+    ttl_days = config.get('llm_cache.ttl_days', 7)
+    return LLMCache(ttl=ttl_days * 86400, max_entries=config.get('llm_cache.max_entries'))
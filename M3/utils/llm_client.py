@@ -5,10 +5,24 @@ Provides unified interface for LLM inference using Groq API
 
 import os
 import json
-from typing import Any, Dict, List, Optional
+import asyncio
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Optional
 from groq import Groq
 from dotenv import load_dotenv
 
+try:
+    import tiktoken
+except ImportError:
+    # tiktoken is optional; token counts fall back to a characters-per-token estimate
+    tiktoken = None
+
+try:
+    from groq import AsyncGroq
+except ImportError:
+    # Older groq SDKs have no async client; agenerate runs generate in a worker thread
+    AsyncGroq = None
+
 
 class LLMClient:
     """
@@ -22,8 +36,44 @@ class LLMClient:
     _model: str = "openai/gpt-oss-120b"  # Default fallback
     _temperature: float = 0.7
     _max_tokens: int = 500
+    # Set on the instance after the first __init__, so later LLMClient() calls (every
+    # component constructor) skip reloading .env and rebuilding the Groq client even
+    # when that first attempt failed; the UI model switch resets _instance to redo it
+    _initialized: bool = False
+    
+    # Models with JSON-schema structured outputs -> whether strict mode is supported;
+    # other models get JSON mode ({"type": "json_object"})
+    STRUCTURED_OUTPUT_MODELS = MappingProxyType({
+        "openai/gpt-oss-120b": True,
+        "openai/gpt-oss-20b": True,
+        "moonshotai/kimi-k2-instruct-0905": False,
+        "meta-llama/llama-4-maverick-17b-128e-instruct": False,
+        "meta-llama/llama-4-scout-17b-16e-instruct": False,
+    })
+    _JSON_TYPES = MappingProxyType({
+        "string": "string",
+        "number": "number",
+        "integer": "integer",
+        "boolean": "boolean",
+        "null": "null",
+    })
+    # Models that answered a response_format request with a 400 (prompt-only JSON from then on)
+    _response_format_unsupported: set = set()
+    # 400 error text: a single generation that missed the schema vs. a model without support
+    _JSON_VALIDATION_MARKERS = ("json_validate_failed", "failed to validate json")
+    _RESPONSE_FORMAT_MARKERS = ("response_format", "response format", "json_schema", "json_object")
+    
+    # Tokenizer for prompt budgeting (o200k is the gpt-oss encoding family; a
+    # close approximation for the other hosted models)
+    TOKEN_ENCODING = "o200k_base"
+    CHARS_PER_TOKEN = 4  # Estimate used when tiktoken is not installed
+    _encoding = None
     
-    def __new__(cls):
+    # Shared async client (one httpx connection pool) and the event loop it is bound to
+    _async_client = None
+    _async_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
@@ -42,7 +92,8 @@ class LLMClient:
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens in response
         """
-        if self._client is None:
+        if not self._initialized:
+            self._initialized = True
             # Load default model from config if not specified
             if model is None:
                 from .config_loader import ConfigLoader
@@ -82,13 +133,43 @@ class LLMClient:
             print(f"✗ Failed to initialize Groq client: {e}")
             self._client = None
     
+    def _get_async_client(self):
+        """
+        Get the shared AsyncGroq client for the running event loop.
+        The client keeps one keep-alive connection pool for all concurrent
+        calls; it is recreated only when called from a different event loop
+        (e.g. successive asyncio.run calls), since the pool is bound to its loop.
+        
+        Returns:
+            AsyncGroq client, or None if the SDK has no async client
+        """
+        if AsyncGroq is None or not self._api_key:
+            return None
+        
+        loop = asyncio.get_running_loop()
+        if LLMClient._async_client is None or LLMClient._async_loop is not loop:
+            LLMClient._async_client = AsyncGroq(api_key=self._api_key)
+            LLMClient._async_loop = loop
+        return LLMClient._async_client
+    
+    @staticmethod
+    def _usage_dict(response, model: str) -> Dict[str, Any]:
+        """Token usage of a chat completion response"""
+        return {
+            'prompt_tokens': response.usage.prompt_tokens if hasattr(response, 'usage') else 0,
+            'completion_tokens': response.usage.completion_tokens if hasattr(response, 'usage') else 0,
+            'total_tokens': response.usage.total_tokens if hasattr(response, 'usage') else 0,
+            'model': model
+        }
+    
     def generate(
         self,
         prompt: str,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         system_prompt: Optional[str] = None,
-        return_usage: bool = False
+        return_usage: bool = False,
+        model: Optional[str] = None
     ) -> str:
         """
         Generate text completion from prompt
@@ -99,6 +180,7 @@ class LLMClient:
             max_tokens: Max tokens in response (overrides default)
             system_prompt: Optional system message
             return_usage: If True, return tuple of (text, usage_dict)
+            model: Model for this call only (default: the client's model)
             
         Returns:
             Generated text response, or (text, usage_dict) if return_usage=True
@@ -110,6 +192,7 @@ class LLMClient:
         if self._client is None:
             raise RuntimeError("LLM client not initialized - check API key")
         
+        model = model or self._model
         temperature = temperature if temperature is not None else self._temperature
         max_tokens = max_tokens if max_tokens is not None else self._max_tokens
         
@@ -120,6 +203,122 @@ class LLMClient:
         
         try:
             response = self._client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            
+            text = response.choices[0].message.content
+            
+            if return_usage:
+                return text, self._usage_dict(response, model)
+            
+            return text
+            
+        except Exception as e:
+            print(f"Error in LLM generation: {e}")
+            raise
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Generate text completion from prompt, yielding pieces as the model produces them
+        
+        Args:
+            prompt: User prompt/query
+            temperature: Sampling temperature (overrides default)
+            max_tokens: Max tokens in response (overrides default)
+            system_prompt: Optional system message
+            
+        Yields:
+            Text chunks in order (joined they form the full response)
+            
+        Raises:
+            RuntimeError: If client not initialized
+            Exception: If API call fails
+        """
+        if self._client is None:
+            raise RuntimeError("LLM client not initialized - check API key")
+        
+        temperature = temperature if temperature is not None else self._temperature
+        max_tokens = max_tokens if max_tokens is not None else self._max_tokens
+        
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        try:
+            stream = self._client.chat.completions.create(
+                model=self._model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    yield text
+            
+        except Exception as e:
+            print(f"Error in LLM generation: {e}")
+            raise
+    
+    async def agenerate(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None,
+        return_usage: bool = False
+    ) -> str:
+        """
+        Async variant of generate() - many calls can run concurrently with
+        asyncio.gather, so total latency is the slowest call rather than the sum
+        
+        Args:
+            prompt: User prompt/query
+            temperature: Sampling temperature (overrides default)
+            max_tokens: Max tokens in response (overrides default)
+            system_prompt: Optional system message
+            return_usage: If True, return tuple of (text, usage_dict)
+            
+        Returns:
+            Generated text response, or (text, usage_dict) if return_usage=True
+            
+        Raises:
+            RuntimeError: If client not initialized
+            Exception: If API call fails
+        """
+        if self._client is None:
+            raise RuntimeError("LLM client not initialized - check API key")
+        
+        async_client = self._get_async_client()
+        if async_client is None:
+            return await asyncio.to_thread(
+                self.generate, prompt, temperature, max_tokens, system_prompt, return_usage
+            )
+        
+        temperature = temperature if temperature is not None else self._temperature
+        max_tokens = max_tokens if max_tokens is not None else self._max_tokens
+        
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        try:
+            response = await async_client.chat.completions.create(
                 model=self._model,
                 messages=messages,
                 temperature=temperature,
@@ -129,13 +328,7 @@ class LLMClient:
             text = response.choices[0].message.content
             
             if return_usage:
-                usage = {
-                    'prompt_tokens': response.usage.prompt_tokens if hasattr(response, 'usage') else 0,
-                    'completion_tokens': response.usage.completion_tokens if hasattr(response, 'usage') else 0,
-                    'total_tokens': response.usage.total_tokens if hasattr(response, 'usage') else 0,
-                    'model': self._model
-                }
-                return text, usage
+                return text, self._usage_dict(response, self._model)
             
             return text
             
@@ -148,7 +341,8 @@ class LLMClient:
         prompt: str,
         schema: Dict[str, Any],
         temperature: Optional[float] = None,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        model: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate structured output (JSON) from prompt
@@ -158,6 +352,7 @@ class LLMClient:
             schema: JSON schema for expected output structure
             temperature: Sampling temperature
             system_prompt: Optional system message
+            model: Model for this call only (default: the client's model)
             
         Returns:
             Parsed JSON object matching schema
@@ -173,8 +368,164 @@ class LLMClient:
         if self._client is None:
             raise RuntimeError("LLM client not initialized - check API key")
         
+        model = model or self._model
         temperature = temperature if temperature is not None else self._temperature
+        messages = self._structured_messages(prompt, schema, system_prompt)
+        response_format = self._response_format(schema, model)
+        
+        try:
+            try:
+                response = self._client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=self._max_tokens,
+                    **({"response_format": response_format} if response_format else {})
+                )
+            except Exception as e:
+                if not self._response_format_rejected(response_format, e, model):
+                    raise
+                response = self._client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=self._max_tokens
+                )
+            
+            return self._parse_structured(response.choices[0].message.content, schema)
+                
+        except Exception as e:
+            print(f"Error in structured generation: {e}")
+            raise
+    
+    async def agenerate_structured(
+        self,
+        prompt: str,
+        schema: Dict[str, Any],
+        temperature: Optional[float] = None,
+        system_prompt: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of generate_structured()
         
+        Args:
+            prompt: User prompt/query
+            schema: JSON schema for expected output structure
+            temperature: Sampling temperature
+            system_prompt: Optional system message
+            model: Model for this call only (default: the client's model)
+            
+        Returns:
+            Parsed JSON object matching schema
+        """
+        if self._client is None:
+            raise RuntimeError("LLM client not initialized - check API key")
+        
+        async_client = self._get_async_client()
+        if async_client is None:
+            return await asyncio.to_thread(
+                self.generate_structured, prompt, schema, temperature, system_prompt, model
+            )
+        
+        model = model or self._model
+        temperature = temperature if temperature is not None else self._temperature
+        messages = self._structured_messages(prompt, schema, system_prompt)
+        response_format = self._response_format(schema, model)
+        
+        try:
+            try:
+                response = await async_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=self._max_tokens,
+                    **({"response_format": response_format} if response_format else {})
+                )
+            except Exception as e:
+                if not self._response_format_rejected(response_format, e, model):
+                    raise
+                response = await async_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=self._max_tokens
+                )
+            
+            return self._parse_structured(response.choices[0].message.content, schema)
+                
+        except Exception as e:
+            print(f"Error in structured generation: {e}")
+            raise
+    
+    def _response_format(self, schema: Dict[str, Any], model: str) -> Optional[Dict[str, Any]]:
+        """
+        Constrained-decoding request for a structured call: a JSON schema for
+        models with structured outputs, plain JSON mode for the rest
+        
+        Args:
+            schema: Schema dict in the prompt format ({"city": "string or null", ...})
+            model: Model the call goes to
+            
+        Returns:
+            response_format value, or None if the model rejected it before
+        """
+        if model in LLMClient._response_format_unsupported:
+            return None
+        
+        strict = self.STRUCTURED_OUTPUT_MODELS.get(model)
+        if strict is None:
+            return {"type": "json_object"}
+        
+        json_schema = {"name": "extraction", "schema": self._to_json_schema(schema)}
+        if strict:
+            json_schema["strict"] = True
+        return {"type": "json_schema", "json_schema": json_schema}
+    
+    def _response_format_rejected(self, response_format: Optional[Dict[str, Any]], error: Exception, model: str) -> bool:
+        """
+        Check whether a failed call was a 400 caused by response_format, so the
+        caller can retry it without. Only an "unsupported" error stops sending
+        response_format to this model; a generation that failed JSON validation
+        is retried once unconstrained and the model keeps constrained decoding.
+        """
+        if response_format is None or getattr(error, "status_code", None) != 400:
+            return False
+        message = str(error).lower()
+        if any(marker in message for marker in self._JSON_VALIDATION_MARKERS):
+            print(f"⚠ Model {model} output failed JSON validation; retrying this call with prompt-only JSON")
+            return True
+        if "support" not in message or not any(marker in message for marker in self._RESPONSE_FORMAT_MARKERS):
+            return False
+        print(f"⚠ Model {model} rejected response_format ({error}); using prompt-only JSON")
+        LLMClient._response_format_unsupported.add(model)
+        return True
+    
+    @classmethod
+    def _to_json_schema(cls, schema: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a prompt-style schema ({"city": "string or null"}) to JSON Schema
+        ({"type": "object", "properties": {"city": {"type": ["string", "null"]}}, ...}).
+        Nested dicts become nested objects; unrecognized specs become string or null.
+        """
+        properties = {}
+        for key, spec in schema.items():
+            if isinstance(spec, dict):
+                properties[key] = cls._to_json_schema(spec)
+                continue
+            names = [name.strip() for name in str(spec).lower().split(" or ")]
+            types = [cls._JSON_TYPES[name] for name in names if name in cls._JSON_TYPES] or ["string", "null"]
+            properties[key] = {"type": types[0] if len(types) == 1 else types}
+        return {
+            "type": "object",
+            "properties": properties,
+            "required": list(properties),
+            "additionalProperties": False
+        }
+    
+    @staticmethod
+    def _structured_messages(prompt: str, schema: Dict[str, Any], system_prompt: Optional[str]) -> List[Dict[str, str]]:
+        """Chat messages for a structured request (schema instruction appended to the prompt)"""
         # Add JSON schema instruction to prompt
         schema_str = json.dumps(schema, indent=2)
         enhanced_prompt = f"{prompt}\n\nRespond ONLY with valid JSON matching this schema:\n{schema_str}"
@@ -188,41 +539,125 @@ class LLMClient:
                 "content": "You are a helpful assistant that always responds with valid JSON."
             })
         messages.append({"role": "user", "content": enhanced_prompt})
-        
+        return messages
+    
+    @staticmethod
+    def _parse_structured(content: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse a structured response, filling schema keys the model left out with None"""
         try:
-            response = self._client.chat.completions.create(
-                model=self._model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=self._max_tokens
-            )
+            # Remove markdown code blocks if present
+            if "```json" in content:
+                content = content.split("```json")[1].split("```")[0].strip()
+            elif "```" in content:
+                content = content.split("```")[1].split("```")[0].strip()
+            
+            parsed = json.loads(content)
+            
+            # Validate that parsed result has all schema keys (set missing ones to None)
+            result = {key: None for key in schema.keys()}
+            result.update(parsed)
+            return result
             
-            content = response.choices[0].message.content
+        except json.JSONDecodeError as e:
+            print(f"Warning: Failed to parse JSON response: {e}")
+            print(f"Raw response: {content[:200]}...")  # Print first 200 chars to avoid spam
+            # Return empty dict matching schema keys
+            return {key: None for key in schema.keys()}
+    
+    def generate_json(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> Any:
+        """
+        Generate a free-form JSON value (object or array) from prompt
+        
+        Used for batched requests where the model returns one JSON array
+        covering several inputs at once.
+        
+        Args:
+            prompt: User prompt describing the expected JSON
+            temperature: Sampling temperature
+            max_tokens: Max tokens in response (overrides default)
+            system_prompt: Optional system message
+            model: Model for this call only (default: the client's model)
             
-            # Try to parse JSON
+        Returns:
+            Parsed JSON value, or None if the response is not valid JSON
+        """
+        content = self.generate(
+            prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            system_prompt=system_prompt or "You are a helpful assistant that always responds with valid JSON.",
+            model=model
+        )
+        
+        # Remove markdown code blocks if present
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0].strip()
+        elif "```" in content:
+            content = content.split("```")[1].split("```")[0].strip()
+        
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError as e:
+            print(f"Warning: Failed to parse JSON response: {e}")
+            print(f"Raw response: {content[:200]}...")
+            return None
+    
+    @classmethod
+    def _get_encoding(cls):
+        """Load the tokenizer once (None if tiktoken is unavailable)"""
+        if cls._encoding is None and tiktoken is not None:
             try:
-                # Remove markdown code blocks if present
-                if "```json" in content:
-                    content = content.split("```json")[1].split("```")[0].strip()
-                elif "```" in content:
-                    content = content.split("```")[1].split("```")[0].strip()
-                
-                parsed = json.loads(content)
-                
-                # Validate that parsed result has all schema keys (set missing ones to None)
-                result = {key: None for key in schema.keys()}
-                result.update(parsed)
-                return result
-                
-            except json.JSONDecodeError as e:
-                print(f"Warning: Failed to parse JSON response: {e}")
-                print(f"Raw response: {content[:200]}...")  # Print first 200 chars to avoid spam
-                # Return empty dict matching schema keys
-                return {key: None for key in schema.keys()}
-                
-        except Exception as e:
-            print(f"Error in structured generation: {e}")
-            raise
+                cls._encoding = tiktoken.get_encoding(cls.TOKEN_ENCODING)
+            except Exception as e:
+                print(f"⚠ Could not load tokenizer {cls.TOKEN_ENCODING}: {e}")
+                return None
+        return cls._encoding
+    
+    def count_tokens(self, text: str) -> int:
+        """
+        Count prompt tokens in text
+        
+        Args:
+            text: Text to measure
+            
+        Returns:
+            Token count (estimated from length when tiktoken is not installed)
+        """
+        encoding = self._get_encoding()
+        if encoding is None:
+            return -(-len(text) // self.CHARS_PER_TOKEN)
+        return len(encoding.encode(text, disallowed_special=()))
+    
+    def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        """
+        Cut text to at most max_tokens tokens
+        
+        Args:
+            text: Text to cut
+            max_tokens: Token limit
+            
+        Returns:
+            Text prefix within the limit
+        """
+        if max_tokens <= 0:
+            return ""
+        encoding = self._get_encoding()
+        if encoding is None:
+            return text[:max_tokens * self.CHARS_PER_TOKEN]
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    
+    @property
+    def model(self) -> str:
+        """Model used for generation (property)"""
+        return self._model
     
     def set_model(self, model: str):
         """Change the model used for generation"""
@@ -4,10 +4,24 @@ Provides singleton connection and query execution for Neo4j database
 """
 
 import os
-from typing import List, Dict, Any, Optional
+import asyncio
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 from neo4j import GraphDatabase, Driver, Session
 from pathlib import Path
 
+try:
+    from neo4j import AsyncGraphDatabase
+except ImportError:
+    # neo4j < 5 has no async driver; run_queries falls back to sequential queries
+    AsyncGraphDatabase = None
+
+try:
+    import uvloop
+except ImportError:
+    # uvloop is optional; the default asyncio loop works the same, just slower
+    uvloop = None
+
 
 class Neo4jClient:
     """
@@ -21,6 +35,11 @@ class Neo4jClient:
     _username: Optional[str] = None
     _password: Optional[str] = None
     
+    # Async driver and the background event loop it lives on (used by run_queries)
+    _async_driver = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _loop_lock = threading.Lock()
+    
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -137,12 +156,86 @@ class Neo4jClient:
             print(f"Params: {params}")
             raise
     
+    def run_queries(self, queries: List[Tuple[str, Optional[Dict[str, Any]]]]) -> List[List[Dict[str, Any]]]:
+        """
+        Execute independent Cypher queries concurrently on the async driver.
+        Falls back to running them one by one when the async driver is unavailable.
+        
+        Args:
+            queries: List of (cypher, params) tuples
+            
+        Returns:
+            List of result record lists in query order ([] for a query that failed)
+        """
+        if not queries:
+            return []
+        
+        if AsyncGraphDatabase is None or not all([self._uri, self._username, self._password]):
+            return [self._run_query_safe(cypher, params) for cypher, params in queries]
+        
+        future = asyncio.run_coroutine_threadsafe(self._gather_queries(queries), self._get_loop())
+        return future.result()
+    
+    def _run_query_safe(self, cypher: str, params: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """run_query that reports failures as an empty result"""
+        try:
+            return self.run_query(cypher, params)
+        except Exception:
+            return []
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Start (once) the background event loop that owns the async driver"""
+        with self._loop_lock:
+            if Neo4jClient._loop is None:
+                loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="neo4j-async", daemon=True)
+                thread.start()
+                Neo4jClient._loop = loop
+            return Neo4jClient._loop
+    
+    async def _gather_queries(self, queries: List[Tuple[str, Optional[Dict[str, Any]]]]) -> List[List[Dict[str, Any]]]:
+        """Run all queries on the event loop and collect results in order"""
+        if Neo4jClient._async_driver is None:
+            Neo4jClient._async_driver = AsyncGraphDatabase.driver(
+                self._uri,
+                auth=(self._username, self._password)
+            )
+        results = await asyncio.gather(
+            *(self._arun_query(cypher, params or {}) for cypher, params in queries),
+            return_exceptions=True
+        )
+        records = []
+        for (cypher, params), result in zip(queries, results):
+            if isinstance(result, Exception):
+                print(f"Error executing query: {result}")
+                print(f"Query: {cypher}")
+                print(f"Params: {params}")
+                result = []
+            records.append(result)
+        return records
+    
+    async def _arun_query(self, cypher: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Execute one Cypher query on the async driver"""
+        async with Neo4jClient._async_driver.session() as session:
+            result = await session.run(cypher, params)
+            return [dict(record) async for record in result]
+    
     def close(self):
         """Close Neo4j connection"""
         if self._driver is not None:
             self._driver.close()
             self._driver = None
             print("✓ Neo4j connection closed")
+        if Neo4jClient._loop is not None:
+            loop = Neo4jClient._loop
+            if Neo4jClient._async_driver is not None and loop.is_running():
+                try:
+                    asyncio.run_coroutine_threadsafe(Neo4jClient._async_driver.close(), loop).result(timeout=5)
+                except Exception:
+                    pass
+            Neo4jClient._async_driver = None
+            loop.call_soon_threadsafe(loop.stop)
+            Neo4jClient._loop = None
     
     def __del__(self):
         """Cleanup on deletion"""
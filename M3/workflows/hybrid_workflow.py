@@ -78,8 +78,9 @@ def create_hybrid_workflow():
     workflow.add_edge("entity", "embedding_query")
     
     # Both branches converge at merge
-    workflow.add_edge("baseline_query", "merge")
-    workflow.add_edge("embedding_query", "merge")
+    # Explicit join: merge waits for both branches and runs exactly once, even if
+    # the branches ever take a different number of steps
+    workflow.add_edge(["baseline_query", "embedding_query"], "merge")
     
     # Answer generation and output
     workflow.add_edge("merge", "answer")